@@ -16,11 +16,33 @@ if __name__ == "__main__":
     license = "{{cookiecutter.open_source_license}}"
     use_celery = "{{cookiecutter.use_celery}}"
     use_docker = "{{cookiecutter.use_docker}}"
+    use_auditlog = "{{cookiecutter.use_auditlog}}"
+    use_channels = "{{cookiecutter.use_channels}}"
+    use_minio = "{{cookiecutter.use_minio}}"
 
     if license == "Not open source":
         delete_resource("LICENSE")
     if use_celery == "n":
         delete_resource(f"{project_slug}/celery.py")
+        delete_resource("apps/base/tasks.py")
+        delete_resource("apps/users/tasks.py")
+    if use_auditlog == "n":
+        delete_resource("apps/base/audit.py")
+        delete_resource("apps/base/tests/test_audit.py")
+        delete_resource("apps/base/history.py")
+        delete_resource("apps/base/tests/test_history.py")
+        delete_resource("apps/base/management/commands/audit_partitions.py")
+    if use_channels == "n":
+        delete_resource("apps/base/websocket.py")
+        delete_resource("apps/api/routing.py")
+        delete_resource("apps/users/consumers.py")
+        delete_resource("apps/users/routing.py")
+        delete_resource("apps/users/tests/test_user_feed.py")
+    if use_minio == "n":
+        delete_resource("apps/base/attachments.py")
+        delete_resource("apps/base/enums.py")
+        delete_resource("apps/base/urls.py")
+        delete_resource("apps/base/tests/test_attachments.py")
     if use_docker == "n":
         delete_resource(f"docker/")
         delete_resource(f"docker-compose.yml")
@@ -0,0 +1,8 @@
+from channels.routing import URLRouter
+from django.urls import path
+
+from apps.users.routing import websocket_urlpatterns as users_websocket_urlpatterns
+
+websocket_urlpatterns = [
+    path('ws/users/', URLRouter(users_websocket_urlpatterns)),
+]
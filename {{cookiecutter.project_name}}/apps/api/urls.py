@@ -1,5 +1,12 @@
 from django.urls import path, include
 
+from apps.base.files import FileUploadView, FileView
+
 urlpatterns = [
-    path('users/', include(('apps.users.urls', 'users')))
+    path('files/', FileUploadView.as_view(), name='files'),
+    path('files/<path:name>', FileView.as_view(), name='file'),
+    path('users/', include(('apps.users.urls', 'users'))),
+{%- if cookiecutter.use_minio == 'y' %}
+    path('attachments/', include(('apps.base.urls', 'attachments'))),
+{%- endif %}
 ]
@@ -1,3 +1,39 @@
 from django.contrib import admin
+{%- if cookiecutter.use_auditlog == 'y' %}
+from auditlog.admin import LogEntryAdmin
+from auditlog.models import LogEntry
+{%- endif %}
 
-# Register your models here.
+from .models import Tenant
+{%- if cookiecutter.use_auditlog == 'y' %}
+from .history import recent_entries
+{%- endif %}
+
+
+@admin.register(Tenant)
+class TenantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'created_at')
+    search_fields = ('name', 'slug')
+{%- if cookiecutter.use_auditlog == 'y' %}
+
+
+class RecentLogEntryAdmin(LogEntryAdmin):
+    """
+    Lists the entries of the last AUDITLOG_ADMIN_MONTHS months until a date is picked in the date hierarchy, and
+    skips the count of the whole table, so the changelist only reads the recent partitions.
+    """
+
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        url_name = getattr(request.resolver_match, 'url_name', None) or ''
+        picked = any(key.startswith(f'{self.date_hierarchy}__') for key in request.GET)
+        if not url_name.endswith('_changelist') or picked:
+            return queryset
+        return recent_entries(queryset)
+
+
+admin.site.unregister(LogEntry)
+admin.site.register(LogEntry, RecentLogEntryAdmin)
+{%- endif %}
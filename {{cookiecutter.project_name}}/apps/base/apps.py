@@ -1,6 +1,27 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class InfrastructureConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.base'
+
+    def ready(self):
+        from .db import apply_postgres_ddl
+
+        post_migrate.connect(apply_postgres_ddl, dispatch_uid='apps.base.apply_postgres_ddl')
+{%- if cookiecutter.use_minio == 'y' %}
+
+        from django.db.models.signals import post_delete
+
+        from .attachments import delete_stored_object
+        from .models import Attachment
+
+        post_delete.connect(delete_stored_object, sender=Attachment, dispatch_uid='apps.base.delete_stored_object')
+{%- endif %}
+{%- if cookiecutter.use_auditlog == 'y' %}
+
+        from .history import register_partitioning
+
+        register_partitioning()
+{%- endif %}
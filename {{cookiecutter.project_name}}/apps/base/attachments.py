@@ -0,0 +1,302 @@
+import math
+import uuid
+from functools import lru_cache
+from typing import Type
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.db import transaction
+from django.utils.text import get_valid_filename
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+
+from .enums import AttachmentStatusEnum
+from .exceptions import ConflictError, NotFoundError
+from .models import Attachment, BaseModel
+from .registry import resolve
+from .repositories import BaseRepository
+from .serializers import BaseModelSerializer
+from .responses import Response
+from .services import BaseService
+from .views import BaseViewSet
+
+# S3 caps multipart uploads at 10000 parts, every part but the last must be at least 5 MiB
+MAX_PARTS = 10_000
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+# region STORAGE ---------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def get_client(public: bool = False):
+    """
+    S3 client for the bucket. Presigned URLs are signed with the public one, for MINIO_EXPOSE_URL, since the
+    signature covers the host the client will connect to.
+    """
+    return boto3.client(
+        's3',
+        endpoint_url=settings.MINIO_EXPOSE_URL if public else settings.AWS_S3_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION_NAME,
+        config=Config(signature_version='s3v4', s3={'addressing_style': 'path'}),
+    )
+
+
+def _presign(method: str, **params) -> str:
+    return get_client(public=True).generate_presigned_url(
+        method, Params={'Bucket': settings.AWS_STORAGE_BUCKET_NAME, **params}, ExpiresIn=settings.MINIO_EXPIRE_IN,
+    )
+
+
+def presign_upload(key: str, content_type: str, size: int) -> str:
+    # the signed Content-Length makes the bucket refuse bodies of any other size
+    return _presign('put_object', Key=key, ContentType=content_type, ContentLength=size)
+
+
+def presign_download(key: str, filename: str) -> str:
+    return _presign('get_object', Key=key, ResponseContentDisposition=f'attachment; filename="{filename}"')
+
+
+def presign_part(key: str, upload_id: str, part_number: int, size: int) -> str:
+    return _presign('upload_part', Key=key, UploadId=upload_id, PartNumber=part_number, ContentLength=size)
+
+
+def start_multipart_upload(key: str, content_type: str) -> str:
+    response = get_client().create_multipart_upload(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key, ContentType=content_type,
+    )
+    return response['UploadId']
+
+
+def complete_multipart_upload(key: str, upload_id: str, parts: list[dict]) -> None:
+    get_client().complete_multipart_upload(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key, UploadId=upload_id,
+        MultipartUpload={'Parts': [
+            {'PartNumber': part['part_number'], 'ETag': part['etag']}
+            for part in sorted(parts, key=lambda part: part['part_number'])
+        ]},
+    )
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> None:
+    get_client().abort_multipart_upload(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key, UploadId=upload_id)
+
+
+def delete_object(key: str) -> None:
+    get_client().delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+
+
+def delete_stored_object(sender, instance: Attachment, **kwargs) -> None:
+    """post_delete receiver: removes the object of a hard deleted attachment, e.g. by purge_soft_deleted."""
+    transaction.on_commit(lambda: delete_object(instance.key))
+
+
+def head_object(key: str) -> dict | None:
+    try:
+        return get_client().head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+    except ClientError as error:
+        if error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+
+# endregion --------------------------------------------------------------------
+
+
+# region SERIALIZERS -----------------------------------------------------------
+
+class AttachmentSerializer(BaseModelSerializer):
+    class Meta:
+        model = Attachment
+        fields = ('id', 'filename', 'content_type', 'size', 'status', 'created_at', 'updated_at')
+        read_only_fields = fields
+
+
+class AttachmentUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    multipart = serializers.BooleanField(default=False)
+
+    def validate_size(self, size):
+        if size > settings.ATTACHMENT_MAX_SIZE:
+            raise serializers.ValidationError(f'files are limited to {settings.ATTACHMENT_MAX_SIZE} bytes')
+        return size
+
+    def validate_filename(self, filename):
+        filename = get_valid_filename(filename.rsplit('/', 1)[-1])
+        if not filename:
+            raise serializers.ValidationError('invalid file name')
+        return filename
+
+
+class UploadedPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1, max_value=MAX_PARTS)
+    etag = serializers.CharField(max_length=255)
+
+
+class CompleteUploadSerializer(serializers.Serializer):
+    parts = UploadedPartSerializer(many=True, required=False)
+
+# endregion --------------------------------------------------------------------
+
+
+class AttachmentRepository(BaseRepository):
+
+    def _get_model(self) -> Type[BaseModel]:
+        return Attachment
+
+    def _get_serializer(self) -> Type[BaseModelSerializer]:
+        return AttachmentSerializer
+
+    def create_pending(self, **fields) -> Attachment:
+        return self._model.objects.create(status=AttachmentStatusEnum.PENDING.value, **fields)
+
+    def mark_uploaded(self, attachment: Attachment, size: int, etag: str) -> Attachment:
+        attachment.size = size
+        attachment.etag = etag
+        attachment.upload_id = ''
+        attachment.status = AttachmentStatusEnum.UPLOADED.value
+        attachment.save()
+        return attachment
+
+
+class AttachmentService(BaseService):
+    """
+    Upload flow: ``start_upload`` records a pending attachment and returns presigned URLs, the client sends the
+    bytes straight to the bucket, then ``complete_upload`` checks the object and marks the attachment uploaded.
+    """
+
+    def _get_repository(self) -> BaseRepository:
+        return resolve(AttachmentRepository)
+
+    def start_upload(self, owner, data: dict) -> tuple[Attachment, dict]:
+        serializer = AttachmentUploadSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        key = f'attachments/{uuid.uuid4().hex}/{data["filename"]}'
+        if not data['multipart']:
+            attachment = self._repository.create_pending(
+                owner=owner, key=key, filename=data['filename'], content_type=data['content_type'], size=data['size'],
+            )
+            upload = {
+                'method': 'PUT',
+                'url': presign_upload(key, data['content_type'], data['size']),
+                'headers': {'Content-Type': data['content_type']},
+            }
+            return attachment, upload
+
+        part_size = max(MIN_PART_SIZE, settings.ATTACHMENT_PART_SIZE, math.ceil(data['size'] / MAX_PARTS))
+        upload_id = start_multipart_upload(key, data['content_type'])
+        attachment = self._repository.create_pending(
+            owner=owner, key=key, filename=data['filename'], content_type=data['content_type'], size=data['size'],
+            upload_id=upload_id,
+        )
+        parts = math.ceil(data['size'] / part_size)
+        upload = {
+            'method': 'PUT',
+            'part_size': part_size,
+            'parts': [
+                {
+                    'part_number': number,
+                    'url': presign_part(
+                        key, upload_id, number, part_size if number < parts else data['size'] - part_size * (parts - 1),
+                    ),
+                }
+                for number in range(1, parts + 1)
+            ],
+        }
+        return attachment, upload
+
+    def complete_upload(self, attachment: Attachment, data: dict) -> Attachment:
+        if attachment.status != AttachmentStatusEnum.PENDING.value:
+            raise ConflictError('The upload is already complete.')
+        serializer = CompleteUploadSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        if attachment.upload_id:
+            parts = serializer.validated_data.get('parts')
+            if not parts:
+                raise serializers.ValidationError({'parts': 'The uploaded parts and their ETags are required.'})
+            try:
+                complete_multipart_upload(attachment.key, attachment.upload_id, parts)
+            except ClientError as error:
+                raise ConflictError(f'The multipart upload could not be completed: {error}')
+        head = head_object(attachment.key)
+        if head is None:
+            raise ConflictError('The file has not been uploaded yet.')
+        if head['ContentLength'] != attachment.size:
+            # stores that do not check the signed Content-Length, the client can upload again
+            delete_object(attachment.key)
+            raise ConflictError('The uploaded file does not have the declared size.')
+        return self._repository.mark_uploaded(attachment, head['ContentLength'], head['ETag'].strip('"'))
+
+    def get_download_url(self, attachment: Attachment) -> str:
+        if attachment.status != AttachmentStatusEnum.UPLOADED.value:
+            raise ConflictError('The file has not been uploaded yet.')
+        return presign_download(attachment.key, attachment.filename)
+
+    def _on_delete(self, attachment: Attachment) -> None:
+        if attachment.upload_id:
+            abort_multipart_upload(attachment.key, attachment.upload_id)
+        else:
+            # soft deleted attachments can not be downloaded again, their bytes are not kept until the purge
+            transaction.on_commit(lambda: delete_object(attachment.key))
+
+
+class AttachmentViewSet(BaseViewSet):
+    serializer_class = AttachmentSerializer
+    permission_classes = [IsAuthenticated]
+
+    def _get_service(self) -> BaseService:
+        return resolve(AttachmentService)
+
+    def get_attachment(self, id) -> Attachment:
+        attachment = self._service.get_by_id(id)
+        if attachment.owner_id != self.request.user.id and not self.request.user.is_staff:
+            raise NotFoundError()
+        return attachment
+
+    def create(self, request, *args, **kwargs):
+        attachment, upload = self._service.start_upload(request.user, request.data)
+        return Response(
+            data={
+                'attachment': self.get_serializer(attachment).data,
+                'upload': upload,
+            }, message='upload started', status=status.HTTP_201_CREATED
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        attachment = self.get_attachment(kwargs.get('pk'))
+        return Response(
+            data={
+                'attachment': self.get_serializer(attachment).data
+            }, message='the attachment', meta={}
+        )
+
+    @action(detail=True, methods=['post'], url_path='complete')
+    def complete(self, request, *args, **kwargs):
+        attachment = self._service.complete_upload(self.get_attachment(kwargs.get('pk')), request.data)
+        return Response(
+            data={
+                'attachment': self.get_serializer(attachment).data
+            }, message='upload completed', status=status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=['get'], url_path='download')
+    def download(self, request, *args, **kwargs):
+        url = self._service.get_download_url(self.get_attachment(kwargs.get('pk')))
+        return Response(
+            data={
+                'url': url,
+                'expires_in': settings.MINIO_EXPIRE_IN,
+            }, message='download url', meta={}
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        self._service.delete(self.get_attachment(kwargs.get('pk')).pk)
+        return Response(
+            data={}, message='attachment deleted successfully', status=status.HTTP_200_OK
+        )
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import contextlib
+import copy
+import json
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+
+from auditlog.cid import get_cid, set_cid
+from auditlog.context import auditlog_disabled
+from auditlog.diff import model_instance_diff
+from auditlog.middleware import AuditlogMiddleware
+from auditlog.models import LogEntry
+from auditlog.receivers import check_disable
+from auditlog.registry import AuditlogModelRegistry, AuditLogRegistrationError, auditlog as default_auditlog
+from auditlog.signals import pre_log
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.encoding import smart_str
+from django.utils.module_loading import import_string
+
+_buffer: ContextVar[list | None] = ContextVar('audit_buffer', default=None)
+_request: ContextVar = ContextVar('audit_request', default=None)
+_muted: ContextVar = ContextVar('audit_muted', default=None)
+
+
+# region BACKENDS --------------------------------------------------------------
+
+class BaseAuditBackend:
+    """Destination for audit entries once their transaction has committed."""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def write(self, entries: list[LogEntry]) -> None:
+        raise NotImplementedError
+
+
+class DatabaseAuditBackend(BaseAuditBackend):
+    """Stores the whole batch with a single ``bulk_create``."""
+
+    def write(self, entries):
+        LogEntry.objects.bulk_create(entries, batch_size=self.options.get('batch_size', 500))
+
+
+class FileAuditBackend(BaseAuditBackend):
+    """Appends entries as JSON lines to a local file for later ingestion."""
+
+    def write(self, entries):
+        lines = ''.join(json.dumps(entry_to_dict(entry), cls=DjangoJSONEncoder) + '\n' for entry in entries)
+        with open(self.options['path'], 'a', encoding='utf-8') as file:
+            file.write(lines)
+{%- if cookiecutter.use_celery == 'y' %}
+
+
+class CeleryAuditBackend(BaseAuditBackend):
+    """Ships entries to a celery queue, the worker does the ``bulk_create``."""
+
+    def write(self, entries):
+        from .tasks import write_audit_entries
+
+        rows = json.loads(json.dumps([entry_to_dict(entry) for entry in entries], cls=DjangoJSONEncoder))
+        write_audit_entries.apply_async(args=(rows,), queue=self.options.get('queue'))
+{%- endif %}
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> BaseAuditBackend:
+    config = getattr(settings, 'AUDITLOG_SINK', {})
+    backend_class = import_string(config.get('BACKEND', 'apps.base.audit.DatabaseAuditBackend'))
+    return backend_class(**config.get('OPTIONS', {}))
+
+
+def entry_to_dict(entry: LogEntry) -> dict:
+    return {
+        field.attname: getattr(entry, field.attname) for field in entry._meta.concrete_fields if not field.primary_key
+    }
+
+# endregion --------------------------------------------------------------------
+
+# region BUFFERING -------------------------------------------------------------
+
+@contextlib.contextmanager
+def collect():
+    """
+    Buffer every committed audit entry of the block and hand them to the backend in one call on exit.
+    """
+    buffer = []
+    token = _buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _buffer.reset(token)
+        if buffer:
+            get_backend().write(buffer)
+
+
+def record(entry: LogEntry) -> None:
+    """
+    Stage an entry until its transaction commits; rolled back changes are never logged.
+    Outside of ``collect`` the entry is written as soon as it is committed.
+    """
+    def stage():
+        buffer = _buffer.get()
+        if buffer is None:
+            get_backend().write([entry])
+        else:
+            buffer.append(entry)
+
+    transaction.on_commit(stage)
+
+
+def _get_actor():
+    request = _request.get()
+    # DRF copies the authenticated user back to the django request, so JWT users (including the
+    # stateless claims user) are picked up here too.
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    return None
+
+
+def _get_remote_addr(request) -> str | None:
+    if getattr(settings, 'AUDITLOG_DISABLE_REMOTE_ADDR', False):
+        return None
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if not forwarded_for:
+        return request.META.get('REMOTE_ADDR')
+    # the client is the first address, proxies append theirs; drop the port of 'x.x.x.x:port' and '[::1]:port'
+    remote_addr = forwarded_for.split(',')[0].strip()
+    if '.' in remote_addr and ':' in remote_addr:
+        return remote_addr.split(':')[0]
+    if remote_addr.startswith('['):
+        return remote_addr[1:].split(']')[0]
+    return remote_addr
+
+
+def _get_remote_port(request) -> int | None:
+    try:
+        return int(request.META.get('HTTP_X_FORWARDED_PORT', ''))
+    except ValueError:
+        return None
+
+
+def _build_entry(instance, action, changes) -> LogEntry:
+    request = _request.get()
+    actor = _get_actor()
+    pk = instance.pk
+    try:
+        object_repr = smart_str(instance)
+    except ObjectDoesNotExist:
+        object_repr = ''
+    get_additional_data = getattr(instance, 'get_additional_data', None)
+    return LogEntry(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_pk=smart_str(pk),
+        object_id=pk if isinstance(pk, int) else None,
+        object_repr=object_repr,
+        action=action,
+        changes=changes,
+        actor_id=getattr(actor, 'pk', None),
+        actor_email=getattr(actor, 'email', None),
+        cid=get_cid(),
+        remote_addr=_get_remote_addr(request) if request is not None else None,
+        remote_port=_get_remote_port(request) if request is not None else None,
+        additional_data=get_additional_data() if callable(get_additional_data) else None,
+    )
+
+
+def _log(action, instance, sender, diff_old, diff_new, fields_to_check=None):
+    pre_log_results = pre_log.send(sender, instance=instance, action=action)
+    if any(item[1] is False for item in pre_log_results):
+        return
+    changes = model_instance_diff(
+        diff_old, diff_new, fields_to_check=fields_to_check,
+        use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES,
+    )
+    if changes:
+        record(_build_entry(instance, action, changes))
+
+# endregion --------------------------------------------------------------------
+
+# region RECEIVERS -------------------------------------------------------------
+
+def mute_auditlog(sender, **kwargs):
+    """
+    Connected right ahead of auditlog's own receivers of a sink model: they see auditlog as disabled and leave the
+    entry, and on updates the re-read of the row, to the sink's receiver connected right after them.
+    """
+    _muted.set(auditlog_disabled.set(True))
+
+
+def unmute_auditlog(receiver):
+    @wraps(receiver)
+    def wrapper(*args, **kwargs):
+        token = _muted.get()
+        if token is not None:
+            _muted.set(None)
+            auditlog_disabled.reset(token)
+        receiver(*args, **kwargs)
+
+    return wrapper
+
+
+@unmute_auditlog
+@check_disable
+def log_create(sender, instance, created, **kwargs):
+    if created:
+        _log(LogEntry.Action.CREATE, instance, sender, diff_old=None, diff_new=instance)
+
+
+@unmute_auditlog
+@check_disable
+def log_update(sender, instance, **kwargs):
+    if not instance._state.adding and instance.pk is not None:
+        # BaseModel keeps the values it was loaded with, which saves re-reading the row
+        get_loaded_instance = getattr(instance, 'get_loaded_instance', None)
+        old = get_loaded_instance() if get_loaded_instance is not None else None
+        if old is None:
+            old = sender._default_manager.filter(pk=instance.pk).first()
+        _log(
+            LogEntry.Action.UPDATE, instance, sender, diff_old=old, diff_new=instance,
+            fields_to_check=kwargs.get('update_fields'),
+        )
+
+
+@unmute_auditlog
+@check_disable
+def log_delete(sender, instance, **kwargs):
+    if instance.pk is not None:
+        _log(LogEntry.Action.DELETE, instance, sender, diff_old=instance, diff_new=None)
+
+
+class AuditSinkRegistry(AuditlogModelRegistry):
+    """
+    Drop-in replacement for ``auditlog.register`` that routes create/update/delete entries through the sink.
+    Access and many-to-many entries are left to auditlog.
+    """
+
+    signals = {post_save: log_create, pre_save: log_update, post_delete: log_delete}
+
+    def __init__(self):
+        super().__init__(create=False, update=False, delete=False, access=False, m2m=False, custom=self.signals)
+
+    def register(self, model=None, **options):
+        if model is None:
+            return lambda cls: self.register(cls, **options)
+        if options.get('serialize_data'):
+            raise AuditLogRegistrationError('The audit sink does not store serialized data.')
+        for signal in self.signals:
+            signal.connect(mute_auditlog, sender=model, dispatch_uid='apps.base.audit.mute_auditlog')
+        # diffing, masking and the LogEntry admin read the field options from auditlog's own registry;
+        # register extends the option lists in place, hence the copy
+        default_auditlog.register(model, **copy.deepcopy(options))
+        return super().register(model, **options)
+
+
+auditlog = AuditSinkRegistry()
+
+# endregion --------------------------------------------------------------------
+
+
+class AuditSinkMiddleware(AuditlogMiddleware):
+    """
+    Replaces ``AuditlogMiddleware``: the actor is resolved when an entry is recorded and all
+    entries of the request are flushed together once the response is ready.
+    """
+
+    def __call__(self, request):
+        set_cid(request)
+        token = _request.set(request)
+        try:
+            with collect():
+                return self.get_response(request)
+        finally:
+            _request.reset(token)
@@ -0,0 +1,25 @@
+from collections import defaultdict
+
+from django.db import connections
+
+# app label -> raw DDL applied after `migrate` on PostgreSQL only. Migrations are generated per environment,
+# so statements that have no ORM equivalent (extensions, operator class indexes, partitions) live here.
+_postgres_ddl: dict[str, list[str]] = defaultdict(list)
+
+
+def register_postgres_ddl(app_label: str, *statements: str) -> None:
+    """Statements must be idempotent (IF NOT EXISTS), they run on every migrate."""
+    _postgres_ddl[app_label].extend(statements)
+
+
+def apply_postgres_ddl(sender, using='default', **kwargs):
+    connection = connections[using]
+    statements = _postgres_ddl.get(sender.label)
+    if connection.vendor != 'postgresql' or not statements:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+register_postgres_ddl('base', 'CREATE EXTENSION IF NOT EXISTS pg_trgm')
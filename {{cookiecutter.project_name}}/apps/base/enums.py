@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class AttachmentStatusEnum(Enum):
+    PENDING = "pending"
+    UPLOADED = "uploaded"
+
+    @classmethod
+    def choices(cls):
+        return [(status.value, status.name.title()) for status in cls]
@@ -1,65 +1,167 @@
-from django.http import Http404
-from rest_framework.exceptions import APIException, ValidationError, NotAuthenticated
-from rest_framework.views import exception_handler
+import json
+import logging
+import random
+import threading
+from collections import Counter
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied as DjangoPermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.translation import get_language
+from rest_framework import exceptions
+from rest_framework.views import set_rollback
 
-from {{cookiecutter.project_slug}}.settings.base import DEBUG
 from .exceptions import CustomException
 from .responses import Response
 
+logger = logging.getLogger(__name__)
 
-def custom_exception_handler(exc, context):
-    response = exception_handler(exc, context)
-    if DEBUG:
-        raise exc
-    if isinstance(exc, Http404):
-        return Response(
-            errors={
-                "error": "Not Found"
-            },
-            message="Data not found",
-            meta={},
-            status=404
-        )
-
-    if isinstance(exc, ValidationError):
-        return Response(
-            errors=exc.detail,
-            message="Validation error",
-            meta={},
-            status=exc.status_code
-        )
-
-    if isinstance(exc, CustomException):
-        return Response(
-            errors=exc.details,
-            message=exc.message,
-            status=exc.status_code
-        )
-
-    if isinstance(exc, NotAuthenticated):
-        return Response(
-            message=exc.detail,
-            meta={},
-            status=exc.status_code
-        )
-
-    if isinstance(exc, APIException):
-        message = 'API error occurred.'
-        try:
-            message = exc.detail['detail']
-        except:
-            pass
-        return Response(
-            message=message,
-            meta={},
-            status=exc.status_code
-        )
-
-    if response is None:
-        return Response(
-            data=None,
-            message="An unexpected error occurred. Please try again later or contact support if the issue persists.",
-            status=500
-        )
+# exception class -> function(exc) building its response, see `register_error`
+_handlers: dict[type, Callable] = {}
+# exception class -> handler of its closest registered base, filled as classes are first seen
+_resolved: dict[type, Callable | None] = {}
+
+
+def register_error(*exc_classes: type):
+    """Registers the decorated function as the response builder of the exception classes and their subclasses."""
+    def decorator(handler):
+        for exc_class in exc_classes:
+            _handlers[exc_class] = handler
+        _resolved.clear()
+        return handler
+    return decorator
+
+
+def get_error_handler(exc_class: type) -> Callable | None:
+    try:
+        return _resolved[exc_class]
+    except KeyError:
+        handler = next((_handlers[base] for base in exc_class.__mro__ if base in _handlers), None)
+        _resolved[exc_class] = handler
+        return handler
+
+
+def _render(message: str, errors: dict | None = None) -> bytes:
+    # same envelope and bytes as Response rendered by JSONRenderer
+    body = {'message': message, 'meta': {}}
+    if errors:
+        body['errors'] = errors
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+# Bodies of the errors that come in floods (scanners, expired tokens, throttled clients) are rendered once
+STATIC_BODIES = {
+    403: _render(str(exceptions.PermissionDenied.default_detail)),
+    404: _render('Data not found', {'error': 'Not Found'}),
+    429: _render('Request was throttled.'),
+    500: _render('An unexpected error occurred. Please try again later or contact support if the issue persists.'),
+}
+# (exception class, language) -> default detail and the body of the exception raised with it, e.g. NotAuthenticated
+_default_bodies: dict[tuple[type, str], tuple[str, bytes]] = {}
+
+
+def static_response(status_code: int, body: bytes | None = None) -> HttpResponse:
+    return HttpResponse(body or STATIC_BODIES[status_code], status=status_code, content_type='application/json')
+
+
+def _default_body(exc_class: type) -> tuple[str, bytes]:
+    key = (exc_class, get_language())
+    try:
+        return _default_bodies[key]
+    except KeyError:
+        detail = str(exc_class.default_detail)  # resolving the lazy translation is the slow part
+        _default_bodies[key] = detail, _render(detail)
+        return _default_bodies[key]
+
+
+class ErrorMetrics:
+    """
+    Counts a random ERROR_METRICS_SAMPLE_RATE share of the handled errors by status and exception class, so
+    error storms cost a random() call per error. `snapshot` scales the counts back to estimated totals.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, status_code: int, exc_class: type) -> None:
+        if random.random() >= settings.ERROR_METRICS_SAMPLE_RATE:
+            return
+        with self._lock:
+            self._counts[(status_code, exc_class.__name__)] += 1
+
+    def snapshot(self) -> dict[tuple[int, str], int]:
+        with self._lock:
+            counts = dict(self._counts)
+        rate = settings.ERROR_METRICS_SAMPLE_RATE or 1
+        return {key: round(count / rate) for key, count in counts.items()}
 
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+error_metrics = ErrorMetrics()
+
+
+@register_error(Http404)
+def _not_found(exc):
+    return static_response(404)
+
+
+@register_error(DjangoPermissionDenied)
+def _forbidden(exc):
+    return static_response(403)
+
+
+@register_error(exceptions.ValidationError)
+def _validation_error(exc):
+    return Response(errors=exc.detail, message='Validation error', meta={}, status=exc.status_code)
+
+
+@register_error(CustomException)
+def _custom_exception(exc):
+    return Response(errors=exc.details, message=exc.message, status=exc.status_code)
+
+
+@register_error(exceptions.Throttled)
+def _throttled(exc):
+    response = static_response(429)
+    if exc.wait is not None:
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+@register_error(exceptions.APIException)
+def _api_exception(exc):
+    detail = exc.detail
+    default_detail, body = _default_body(type(exc))
+    if detail == default_detail:
+        response = static_response(exc.status_code, body)
+    else:
+        if isinstance(detail, dict):
+            message = detail.get('detail', 'API error occurred.')
+        elif isinstance(detail, str):
+            message = detail
+        else:
+            message = 'API error occurred.'
+        response = Response(message=message, meta={}, status=exc.status_code)
+    auth_header = getattr(exc, 'auth_header', None)  # set by APIView.handle_exception for 401s
+    if auth_header:
+        response['WWW-Authenticate'] = auth_header
+    return response
+
+
+def custom_exception_handler(exc, context):
+    handler = get_error_handler(type(exc))
+    if handler is None:
+        if settings.DEBUG:
+            return None  # DRF re-raises it, for the debug page
+        logger.error('Unhandled API error', exc_info=exc)
+        response = static_response(500)
+    else:
+        response = handler(exc)
+    set_rollback()
+    error_metrics.record(response.status_code, type(exc))
     return response
@@ -1,5 +1,8 @@
-class CustomException(Exception):
-    """Base class for custom exceptions."""
+from rest_framework.exceptions import APIException
+
+
+class CustomException(APIException):
+    """Base class for custom exceptions, DRF's exception handler maps them to their status code as well."""
 
     def __init__(self, message: str, status_code: int = 400, details: dict = None):
         super().__init__(message)
@@ -21,3 +24,17 @@ class PermissionDeniedError(CustomException):
     def __init__(self, message="You do not have the required permissions to perform this action. Please contact "
                                "support if you believe this is an error."):
         super().__init__(message, status_code=403)
+
+
+class ConflictError(CustomException):
+    """Raised when the resource is not in a state that allows the action."""
+
+    def __init__(self, message="The resource is not in a state that allows this action."):
+        super().__init__(message, status_code=409)
+
+
+class PayloadTooLargeError(CustomException):
+    """Raised when the request body exceeds the size the endpoint accepts."""
+
+    def __init__(self, message="The request body is too large."):
+        super().__init__(message, status_code=413)
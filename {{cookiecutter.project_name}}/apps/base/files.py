@@ -0,0 +1,326 @@
+import mimetypes
+import os
+import posixpath
+import re
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import content_disposition_header
+from django.utils.text import get_valid_filename
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.views import APIView
+{%- if cookiecutter.use_minio == 'y' %}
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name, safe_join
+{%- endif %}
+
+from .exceptions import PayloadTooLargeError
+from .responses import Response
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# region SERVING ---------------------------------------------------------------
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    The (start, end) byte positions, both inclusive, of a single `Range: bytes=...` header. None means the
+    whole file is sent, malformed and multi-range headers are ignored as RFC 9110 allows. Raises ValueError
+    when the range can not be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:  # suffix range, the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(f'bytes {header} not satisfiable for a file of {size} bytes')
+    return start, end
+{%- if cookiecutter.use_minio == 'y' %}
+
+
+def get_object_key(storage: S3Storage, name: str) -> str:
+    """The bucket key of a stored file, its name below the storage's ``location``."""
+    return safe_join(storage.location, clean_name(name))
+{%- endif %}
+
+
+def iter_file(storage: Storage, name: str, start: int, end: int, chunk_size: int | None = None):
+    """Yields the bytes from start to end (inclusive) of a stored file in chunks, only one is held in memory."""
+    chunk_size = chunk_size or settings.FILES_CHUNK_SIZE
+    {%- if cookiecutter.use_minio == 'y' %}
+    if isinstance(storage, S3Storage):
+        # S3Storage.open() downloads the whole object first, a ranged GET streams just the requested bytes
+        body = storage.bucket.Object(get_object_key(storage, name)).get(Range=f'bytes={start}-{end}')
+        yield from body['Body'].iter_chunks(chunk_size)
+        return
+    {%- endif %}
+    with storage.open(name, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, name: str, storage: Storage | None = None, filename: str | None = None,
+               content_type: str | None = None, as_attachment: bool = False) -> HttpResponse:
+    """
+    A response for a stored file that never holds it in memory. Local files are handed to nginx with
+    X-Accel-Redirect when FILES_ACCEL_REDIRECT_PREFIX is set, anything else is streamed in FILES_CHUNK_SIZE
+    chunks with support for single byte ranges.
+    """
+    storage = storage or default_storage
+    if not storage.exists(name):
+        raise Http404
+    filename = filename or posixpath.basename(name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    if isinstance(storage, FileSystemStorage) and settings.FILES_ACCEL_REDIRECT_PREFIX:
+        # nginx reads the file from the internal location and handles Range requests itself
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.FILES_ACCEL_REDIRECT_PREFIX + quote(name)
+    else:
+        size = storage.size(name)
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        start, end = byte_range or (0, size - 1)
+        response = StreamingHttpResponse(
+            iter_file(storage, name, start, end) if size else iter(()),
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            content_type=content_type,
+        )
+        response['Content-Length'] = end - start + 1
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+# endregion --------------------------------------------------------------------
+
+
+# region UPLOADS ---------------------------------------------------------------
+
+class _FileSystemWriter:
+
+    def __init__(self, storage: FileSystemStorage, name: str, content_type: str):
+        self.name = storage.get_available_name(name)
+        self.path = storage.path(self.name)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, 'wb')
+
+    def write(self, data: bytes):
+        self.file.write(data)
+
+    def close(self) -> str:
+        self.file.close()
+        return self.name
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.path)
+{%- if cookiecutter.use_minio == 'y' %}
+
+
+class _S3Writer:
+    """Sends the upload as a multipart upload, holding at most one part in memory."""
+    part_size = 8 * 1024 * 1024  # S3 requires at least 5 MiB for all but the last part
+
+    def __init__(self, storage: S3Storage, name: str, content_type: str):
+        self.name = storage.get_available_name(name)
+        self.client = storage.connection.meta.client
+        self.bucket = storage.bucket_name
+        self.key = get_object_key(storage, self.name)
+        self.parameters = {'ContentType': content_type, **storage.get_object_parameters(self.name)}
+        self.buffer = bytearray()
+        self.parts = []
+        self.upload_id = None
+
+    def write(self, data: bytes):
+        self.buffer += data
+        if len(self.buffer) >= self.part_size:
+            self._upload_part()
+
+    def _upload_part(self):
+        if self.upload_id is None:
+            self.upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self.parameters
+            )['UploadId']
+        number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=bytes(self.buffer)
+        )
+        self.parts.append({'PartNumber': number, 'ETag': response['ETag']})
+        self.buffer.clear()
+
+    def close(self) -> str:
+        if self.upload_id is None:
+            self.client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self.buffer), **self.parameters)
+            return self.name
+        if self.buffer:
+            self._upload_part()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={'Parts': self.parts}
+        )
+        return self.name
+
+    def abort(self):
+        if self.upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+{%- endif %}
+
+
+def open_writer(storage: Storage, name: str, content_type: str):
+    {%- if cookiecutter.use_minio == 'y' %}
+    if isinstance(storage, S3Storage):
+        return _S3Writer(storage, name, content_type)
+    {%- endif %}
+    if isinstance(storage, FileSystemStorage):
+        return _FileSystemWriter(storage, name, content_type)
+    raise ImproperlyConfigured(f'{type(storage).__name__} does not support streamed uploads')
+
+
+class StoredFile(UploadedFile):
+    """
+    An upload already saved by StorageUploadHandler, `storage_name` is its name in the storage. Assign that
+    name to a FileField rather than the file itself, which would copy it again.
+    """
+
+    def __init__(self, storage: Storage, storage_name: str, **kwargs):
+        super().__init__(file=None, **kwargs)
+        self.storage = storage
+        self.storage_name = storage_name
+
+    def open(self, mode='rb'):
+        self.file = self.storage.open(self.storage_name, mode)
+        return self
+
+
+class StorageUploadHandler(FileUploadHandler):
+    """
+    Writes uploaded files to the storage as the request body is read, rather than buffering them in memory
+    or a temporary file and copying them afterwards, so memory use does not grow with the file size. Files
+    larger than `max_size` bytes (FILES_MAX_UPLOAD_SIZE by default) are removed and fail the request with a 413.
+    """
+
+    def __init__(self, request=None, storage: Storage | None = None, upload_to: str | None = None,
+                 max_size: int | None = None):
+        super().__init__(request)
+        self.storage = storage or default_storage
+        self.upload_to = upload_to or settings.FILES_UPLOAD_TO
+        self.max_size = max_size or settings.FILES_MAX_UPLOAD_SIZE
+        self.writer = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        name = posixpath.join(self.upload_to, uuid.uuid4().hex, get_valid_filename(self.file_name) or 'file')
+        self.writer = open_writer(self.storage, name, self.content_type)
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            # the parser does not call upload_interrupted for other exceptions than StopUpload
+            self.upload_interrupted()
+            raise PayloadTooLargeError(f'Files can be at most {self.max_size} bytes.')
+        self.writer.write(raw_data)
+
+    def file_complete(self, file_size):
+        writer, self.writer = self.writer, None
+        return StoredFile(
+            self.storage, writer.close(), name=self.file_name, content_type=self.content_type, size=file_size,
+            charset=self.charset, content_type_extra=self.content_type_extra,
+        )
+
+    def upload_interrupted(self):
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+
+# endregion --------------------------------------------------------------------
+
+
+def get_uploader_id(name: str) -> str | None:
+    """The id of the user FileUploadView stored `name` for, None for names outside of FILES_UPLOAD_TO."""
+    prefix = settings.FILES_UPLOAD_TO.strip('/') + '/'
+    if posixpath.normpath(name) != name or not name.startswith(prefix):
+        return None
+    uploader_id, _, rest = name[len(prefix):].partition('/')
+    return uploader_id if rest else None
+
+
+class CanUseFiles(BasePermission):
+    """Admins, and every authenticated user once FILES_USER_ACCESS is set."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_staff or settings.FILES_USER_ACCESS))
+
+
+class FileView(APIView):
+    """
+    Serves the files uploaded through FileUploadView: users their own, admins everyone's. Nothing outside of
+    FILES_UPLOAD_TO is served, e.g. attachments are only downloaded through their own API.
+    """
+    permission_classes = [IsAuthenticated, CanUseFiles]
+    storage = default_storage
+
+    def get(self, request, name, *args, **kwargs):
+        uploader_id = get_uploader_id(name)
+        if uploader_id is None or not (request.user.is_staff or uploader_id == str(request.user.pk)):
+            raise Http404
+        return serve_file(request, name, storage=self.storage)
+
+
+class FileUploadView(APIView):
+    """Stores multipart uploads under ``FILES_UPLOAD_TO/<user id>/`` and returns the stored names."""
+    permission_classes = [IsAuthenticated, CanUseFiles]
+    parser_classes = [MultiPartParser]
+    storage = default_storage
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # the user is authenticated by now and the body is still unread, DRF parses it lazily
+        upload_to = posixpath.join(settings.FILES_UPLOAD_TO, str(request.user.pk))
+        request._request.upload_handlers = [
+            StorageUploadHandler(request._request, storage=self.storage, upload_to=upload_to)
+        ]
+
+    def post(self, request, *args, **kwargs):
+        if not request.FILES:
+            raise ValidationError({'file': 'No file was submitted.'})
+        files = [
+            {
+                'name': file.storage_name,
+                'filename': file.name,
+                'content_type': file.content_type,
+                'size': file.size,
+                'url': reverse('api:file', args=[file.storage_name]),
+            }
+            for file in request.FILES.values()
+        ]
+        return Response(
+            data={
+                'files': files
+            }, message='files uploaded', status=status.HTTP_201_CREATED
+        )
@@ -0,0 +1,48 @@
+import django_filters
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+
+class BaseFilterSet(django_filters.FilterSet):
+    """
+    Whitelisted, typed query parameters for a repository plus a ``search`` parameter over ``search_fields``.
+
+    ``search_mode=prefix`` (default) matches the start of the value, ``search_mode=trigram`` does a fuzzy
+    pg_trgm match ranked by similarity. Both are served by ``UPPER(field) gin_trgm_ops`` indexes on
+    PostgreSQL; other databases fall back to a plain case-insensitive ``contains``.
+    """
+    SEARCH_MODES = (('prefix', 'prefix'), ('trigram', 'trigram'))
+
+    search_fields: tuple[str, ...] = ()
+
+    search = django_filters.CharFilter(method='filter_search')
+    search_mode = django_filters.ChoiceFilter(choices=SEARCH_MODES, method='filter_search_mode')
+
+    def filter_search_mode(self, queryset, name, value):
+        # consumed by filter_search
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        if not value or not self.search_fields:
+            return queryset
+        mode = self.form.cleaned_data.get('search_mode') or 'prefix'
+        if mode == 'trigram' and connection.vendor == 'postgresql':
+            return self._trigram_search(queryset, value)
+        lookup = 'istartswith' if mode == 'prefix' else 'icontains'
+        condition = Q()
+        for field in self.search_fields:
+            condition |= Q(**{f'{field}__{lookup}': value})
+        return queryset.filter(condition)
+
+    def _trigram_search(self, queryset, value):
+        from django.contrib.postgres.lookups import TrigramSimilar
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Greatest
+
+        condition = Q()
+        for field in self.search_fields:
+            condition |= Q(TrigramSimilar(Upper(field), value.upper()))
+        similarities = [TrigramSimilarity(Upper(field), value.upper()) for field in self.search_fields]
+        rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank')
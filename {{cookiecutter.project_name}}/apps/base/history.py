@@ -0,0 +1,202 @@
+"""
+History storage mode for audit entries: with AUDITLOG_PARTITIONED, auditlog's LogEntry table is converted to one
+range partitioned by month on PostgreSQL. Inserts and vacuums only touch the current month, future months are
+created ahead by the ``maintain_audit_partitions`` task and months older than AUDITLOG_RETENTION_MONTHS are
+exported to gzipped CSV files in AUDITLOG_ARCHIVE_DIR, then dropped.
+"""
+import gzip
+import os
+import re
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .db import register_postgres_ddl
+
+TABLE = LogEntry._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{TABLE}_y(\d{{4}})m(\d{{2}})$')
+
+# Converts the table on the first migrate after AUDITLOG_PARTITIONED is set, creating a partition per month from
+# the oldest entry to AUDITLOG_PARTITIONS_AHEAD months ahead. Entries outside of every month land in the default
+# partition rather than failing the write that logged them.
+PARTITION_BY_MONTH_SQL = """
+DO $$
+DECLARE
+    month timestamp;
+    statement text;
+    indexes text[];
+    foreign_keys text[];
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = '{table}'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+    ALTER TABLE {table} RENAME TO {table}_unpartitioned;
+    CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (timestamp);
+    CREATE TABLE {default} PARTITION OF {table} DEFAULT;
+    FOR month IN SELECT generate_series(
+        date_trunc('month', LEAST(MIN(timestamp), now()) AT TIME ZONE 'UTC'),
+        date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{ahead} months',
+        interval '1 month'
+    ) FROM {table}_unpartitioned LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_y' || to_char(month, 'YYYY"m"MM'),
+            month AT TIME ZONE 'UTC', (month + interval '1 month') AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+    INSERT INTO {table} OVERRIDING SYSTEM VALUE SELECT * FROM {table}_unpartitioned;
+    indexes := ARRAY(
+        SELECT replace(pg_get_indexdef(indexrelid), '{table}_unpartitioned ', '{table} ')
+        FROM pg_index WHERE indrelid = '{table}_unpartitioned'::regclass AND NOT indisprimary
+    );
+    foreign_keys := ARRAY(
+        SELECT format('ALTER TABLE {table} ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid))
+        FROM pg_constraint WHERE conrelid = '{table}_unpartitioned'::regclass AND contype = 'f'
+    );
+    DROP TABLE {table}_unpartitioned;
+    ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp);
+    FOREACH statement IN ARRAY indexes || foreign_keys LOOP
+        EXECUTE statement;
+    END LOOP;
+    PERFORM setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false);
+END $$
+"""
+
+
+def register_partitioning() -> None:
+    if settings.AUDITLOG_PARTITIONED:
+        register_postgres_ddl(
+            LogEntry._meta.app_label,
+            PARTITION_BY_MONTH_SQL.format(
+                table=TABLE, default=DEFAULT_PARTITION, ahead=settings.AUDITLOG_PARTITIONS_AHEAD,
+            ),
+        )
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'{TABLE}_y{month.year}m{month.month:02}'
+
+
+def _bound(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def is_partitioned(using: str = 'default') -> bool:
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def get_partitions(using: str = 'default') -> dict[date, str]:
+    """The monthly partitions, month -> table name, oldest first."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = to_regclass(%s)', [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return dict(sorted(months.items()))
+
+
+def create_partition(month: date, using: str = 'default') -> None:
+    """
+    Creates the partition of `month`. Entries the default partition took for the month while it had none, e.g.
+    when the maintenance task did not run for longer than AUDITLOG_PARTITIONS_AHEAD months, are moved into it;
+    PostgreSQL refuses to create the partition while they are in the default one.
+    """
+    bounds = [_bound(month), _bound(add_months(month, 1))]
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= %s AND timestamp < %s)', bounds,
+        )
+        if cursor.fetchone()[0]:
+            cursor.execute(f'CREATE TEMPORARY TABLE {TABLE}_moving (LIKE {TABLE})')
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= %s AND timestamp < %s '
+                f'RETURNING *) INSERT INTO {TABLE}_moving SELECT * FROM moved', bounds,
+            )
+            cursor.execute(
+                f'CREATE TABLE {partition_name(month)} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)', bounds,
+            )
+            cursor.execute(f'INSERT INTO {TABLE} OVERRIDING SYSTEM VALUE SELECT * FROM {TABLE}_moving')
+            cursor.execute(f'DROP TABLE {TABLE}_moving')
+        else:
+            cursor.execute(
+                f'CREATE TABLE {partition_name(month)} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)', bounds,
+            )
+
+
+def ensure_partitions(months_ahead: int | None = None, using: str = 'default') -> list[str]:
+    """Creates the partitions of this month and the next `months_ahead` ones, returns the created ones."""
+    if months_ahead is None:
+        months_ahead = settings.AUDITLOG_PARTITIONS_AHEAD
+    this_month = timezone.now().date().replace(day=1)
+    existing = get_partitions(using)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        if month not in existing:
+            create_partition(month, using)
+            created.append(partition_name(month))
+    return created
+
+
+def archive_partitions(retention_months: int | None = None, directory: str | None = None,
+                       using: str = 'default') -> list[Path]:
+    """
+    Exports the partitions of months older than `retention_months` to ``<directory>/<partition>.csv.gz``, then
+    detaches and drops them. Returns the written files.
+    """
+    if retention_months is None:
+        retention_months = settings.AUDITLOG_RETENTION_MONTHS
+    directory = Path(directory or settings.AUDITLOG_ARCHIVE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    cutoff = add_months(timezone.now().date().replace(day=1), -retention_months)
+    connection = connections[using]
+    archived = []
+    for month, name in get_partitions(using).items():
+        if month >= cutoff:
+            break
+        path = directory / f'{name}.csv.gz'
+        partial = path.with_suffix('.gz.partial')
+        with connection.cursor() as cursor, gzip.open(partial, 'wb') as file:
+            cursor.copy_expert(f'COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)', file)
+        os.replace(partial, path)
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+            cursor.execute(f'DROP TABLE {name}')
+        archived.append(path)
+    return archived
+
+
+def recent_entries(queryset: QuerySet | None = None, months: int | None = None) -> QuerySet:
+    """
+    Restricts `queryset`, all entries by default, to the last `months` months (AUDITLOG_ADMIN_MONTHS by default).
+    The timestamp bound lets PostgreSQL skip the older partitions entirely.
+    """
+    if queryset is None:
+        queryset = LogEntry.objects.all()
+    if months is None:
+        months = settings.AUDITLOG_ADMIN_MONTHS
+    return queryset.filter(timestamp__gte=timezone.now() - timedelta(days=31 * months))
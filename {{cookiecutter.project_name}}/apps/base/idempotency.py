@@ -0,0 +1,92 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.exceptions import ValidationError
+
+from .exceptions import ConflictError, CustomException
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+# response headers kept with the stored response
+STORED_HEADERS = ('Content-Type', 'Location')
+
+
+class Replayed(Exception):
+    """Raised from `BaseViewSet.initial` to answer with the stored response instead of running the action."""
+
+    def __init__(self, response: HttpResponse):
+        super().__init__()
+        self.response = response
+
+
+class IdempotentRequest:
+    """
+    One request carrying an Idempotency-Key. The first request with a key runs while holding a lock, its
+    rendered response is stored for IDEMPOTENCY_TTL seconds and replayed to any later request with the same
+    key, user and payload. Duplicates that arrive while it runs wait for its response rather than running too.
+    5xx responses are not stored, so the request can be retried.
+    """
+
+    def __init__(self, request, key: str):
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({HEADER: f'Must be 1 to {MAX_KEY_LENGTH} characters.'})
+        user = request.user
+        owner = f'user:{user.pk}' if user.is_authenticated else f'ip:{request.META.get("REMOTE_ADDR")}'
+        digest = hashlib.sha256(f'{owner}\n{request.method}\n{request.path}\n{key}'.encode()).hexdigest()
+        self.cache = caches[settings.IDEMPOTENCY_CACHE]
+        self.response_key = f'idempotency:{digest}'
+        self.lock_key = f'idempotency:{digest}:lock'
+        self.fingerprint = hashlib.sha256(request.body).hexdigest()
+        self.token = None
+
+    def _replay(self, stored: dict) -> HttpResponse:
+        if stored['fingerprint'] != self.fingerprint:
+            raise CustomException(f'The {HEADER} was already used for a different request.', status_code=422)
+        response = HttpResponse(stored['content'], status=stored['status'])
+        for name, value in stored['headers'].items():
+            response[name] = value
+        response[REPLAYED_HEADER] = 'true'
+        return response
+
+    def acquire(self) -> HttpResponse | None:
+        """The stored response to replay, or None once this request holds the lock and should run."""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        token = uuid.uuid4().hex
+        while True:
+            stored = self.cache.get(self.response_key)
+            if stored is not None:
+                return self._replay(stored)
+            if self.cache.add(self.lock_key, token, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                self.token = token
+                return None
+            if time.monotonic() >= deadline:
+                raise ConflictError(f'A request with this {HEADER} is still being processed.')
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+    def complete(self, response) -> None:
+        if self.token is None:
+            return
+        if response.status_code < 500:
+            if hasattr(response, 'render'):
+                response.render()
+            stored = {
+                'fingerprint': self.fingerprint,
+                'status': response.status_code,
+                'content': response.content,
+                'headers': {name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+            }
+            self.cache.set(self.response_key, stored, settings.IDEMPOTENCY_TTL)
+        self.release()
+
+    def release(self) -> None:
+        if self.token is None:
+            return
+        # only drop the lock if it was not taken over after expiring
+        if self.cache.get(self.lock_key) == self.token:
+            self.cache.delete(self.lock_key)
+        self.token = None
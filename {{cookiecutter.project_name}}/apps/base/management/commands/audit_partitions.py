@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.base.history import archive_partitions, ensure_partitions, get_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = 'Create the upcoming monthly audit log partitions and archive the expired ones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=settings.AUDITLOG_PARTITIONS_AHEAD)
+        parser.add_argument('--retention-months', type=int, default=settings.AUDITLOG_RETENTION_MONTHS)
+        parser.add_argument('--archive-dir', default=settings.AUDITLOG_ARCHIVE_DIR)
+        parser.add_argument('--no-archive', action='store_true', help='only create the upcoming partitions')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not is_partitioned(using):
+            raise CommandError('The audit log table is not partitioned, set AUDITLOG_PARTITIONED and run migrate.')
+        for name in ensure_partitions(options['months_ahead'], using):
+            self.stdout.write(f'{name}: created')
+        if not options['no_archive']:
+            for path in archive_partitions(options['retention_months'], options['archive_dir'], using):
+                self.stdout.write(f'{path.name}: archived and dropped')
+        for month, name in get_partitions(using).items():
+            self.stdout.write(f'{month:%Y-%m}  {name}')
@@ -0,0 +1,48 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.http import Http404
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from apps.base.exception_handler import custom_exception_handler
+from apps.base.exceptions import ConflictError
+
+SCENARIOS = {
+    '401 not authenticated': exceptions.NotAuthenticated,
+    '403 permission denied': exceptions.PermissionDenied,
+    '404 not found': Http404,
+    '429 throttled': lambda: exceptions.Throttled(wait=30),
+    '400 validation': lambda: exceptions.ValidationError({'email': ['Enter a valid email address.']}),
+    '409 conflict': ConflictError,
+}
+
+
+def benchmark(handler, make_exception, iterations: int) -> float:
+    """Errors per second `handler` turns into rendered responses."""
+    exc, context, renderer = make_exception(), {'view': None, 'request': None}, JSONRenderer()
+    start = perf_counter()
+    for _ in range(iterations):
+        response = handler(exc, context)
+        if isinstance(response, Response):
+            response.accepted_renderer, response.accepted_media_type = renderer, renderer.media_type
+            response.renderer_context = {}
+            response.render()
+    return iterations / (perf_counter() - start)
+
+
+class Command(BaseCommand):
+    help = "Measure the errors per second of the API exception handler against DRF's stock handler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        self.stdout.write(f'{"scenario":24} {"drf errors/s":>14} {"ours errors/s":>14} {"speedup":>8}')
+        for name, make_exception in SCENARIOS.items():
+            stock = benchmark(drf_exception_handler, make_exception, iterations)
+            ours = benchmark(custom_exception_handler, make_exception, iterations)
+            self.stdout.write(f'{name:24} {stock:14,.0f} {ours:14,.0f} {ours / stock:7.1f}x')
@@ -0,0 +1,80 @@
+import random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.urls import URLResolver, include, path
+from django.urls.resolvers import RegexPattern
+from rest_framework.decorators import action
+from rest_framework.routers import DefaultRouter
+
+from apps.base.routers import FlatRouter, RouteTable
+from apps.base.views import BaseViewSet
+
+
+def make_viewset(name: str) -> type[BaseViewSet]:
+    def view(self, request, *args, **kwargs):
+        pass
+
+    def export(self, request):
+        pass
+
+    def history(self, request, pk=None):
+        pass
+
+    return type(name, (BaseViewSet,), {
+        '_get_service': lambda self: None,
+        'list': view, 'create': view, 'retrieve': view, 'update': view, 'destroy': view,
+        'export': action(detail=False)(export), 'history': action(detail=True)(history),
+    })
+
+
+def build_urlconf(viewsets: int, router_class, wrap) -> URLResolver:
+    """An api/ URLconf with one app, and so one include and router, per viewset, like apps.api.urls."""
+    apps = []
+    for number in range(viewsets):
+        router = router_class()
+        router.register(r'', make_viewset(f'Resource{number}ViewSet'), basename=f'resource{number}')
+        apps.append(path(f'resources{number}/', include((router.urls, f'resources{number}'))))
+    return URLResolver(RegexPattern(r'^/'), [wrap(path('api/', include((apps, 'api'))))])
+
+
+def sample_paths(viewsets: int, count: int) -> list[str]:
+    rng = random.Random(0)
+    paths = []
+    for _ in range(count):
+        number, pk = rng.randrange(viewsets), rng.randrange(1, 10_000)
+        paths.append(rng.choice([
+            f'/api/resources{number}/', f'/api/resources{number}/export/',
+            f'/api/resources{number}/{pk}/', f'/api/resources{number}/{pk}/history/',
+        ]))
+    return paths
+
+
+def benchmark(resolver: URLResolver, paths: list[str]) -> float:
+    """Paths per second `resolver` resolves."""
+    for url in paths[:100]:
+        resolver.resolve(url)  # warms up the lazily built URLconf and route table
+    start = perf_counter()
+    for url in paths:
+        resolver.resolve(url)
+    return len(paths) / (perf_counter() - start)
+
+
+class Command(BaseCommand):
+    help = 'Measure URL resolution of the flat route table against nested includes with DefaultRouters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--viewsets', type=int, nargs='+', default=[10, 50, 200])
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"viewsets":>8} {"routes":>7} {"nested paths/s":>15} {"flat paths/s":>13} {"speedup":>8}')
+        for viewsets in options['viewsets']:
+            paths = sample_paths(viewsets, options['iterations'])
+            nested = build_urlconf(viewsets, DefaultRouter, lambda resolver: resolver)
+            flat = build_urlconf(viewsets, lambda: FlatRouter('always'), RouteTable.wrap)
+            routes = sum(len(app.url_patterns) for app in flat.url_patterns[0].url_patterns)
+            nested_rate, flat_rate = benchmark(nested, paths), benchmark(flat, paths)
+            self.stdout.write(
+                f'{viewsets:8} {routes:7} {nested_rate:15,.0f} {flat_rate:13,.0f} {flat_rate / nested_rate:7.1f}x'
+            )
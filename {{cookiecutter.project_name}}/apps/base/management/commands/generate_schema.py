@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.base.schema import precompute_schemas
+
+
+class Command(BaseCommand):
+    help = 'Render the OpenAPI schema into SCHEMA_CACHE_DIR so the schema view never builds it on a request.'
+
+    def handle(self, *args, **options):
+        for path in precompute_schemas():
+            self.stdout.write(f'{path} written')
@@ -0,0 +1,94 @@
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path, set_urlconf
+from django.views.decorators.csrf import csrf_exempt
+
+# The stack the template shipped with before the API skipped the session based middleware
+DJANGO_DEFAULT_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+]
+
+
+@csrf_exempt  # like every DRF view
+def ping(request):
+    return JsonResponse({'message': 'pong'})
+
+
+# the requests are resolved against this module, so only the middleware are measured
+urlpatterns = [path('api/ping/', ping), path('admin/ping/', ping)]
+
+SCENARIOS = {
+    'api GET': lambda factory: factory.get('/api/ping/', HTTP_AUTHORIZATION='Bearer token'),
+    'api preflight': lambda factory: factory.options(
+        '/api/ping/', HTTP_ORIGIN='https://app.example.com', HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST',
+        HTTP_ACCESS_CONTROL_REQUEST_HEADERS='authorization,content-type',
+    ),
+    'admin GET': lambda factory: factory.get('/admin/ping/'),
+}
+
+
+def time_stack(middleware: list[str], make_request, iterations: int) -> float | None:
+    """Microseconds a request spends in `middleware` and the view, None if the stack does not answer with a 2xx."""
+    with override_settings(MIDDLEWARE=middleware):
+        handler = BaseHandler()
+        handler.load_middleware()
+    factory = RequestFactory()
+    requests = [make_request(factory) for _ in range(iterations + 1)]
+    for request in requests:
+        request.urlconf = __name__
+    try:
+        if handler.get_response(requests.pop()).status_code >= 300:
+            return None
+        start = perf_counter()
+        for request in requests:
+            handler.get_response(request)
+        return (perf_counter() - start) / iterations * 1e6
+    finally:
+        set_urlconf(None)  # resolving leaves this module as the thread's URLconf
+
+
+class Command(BaseCommand):
+    help = 'Report what a request spends in the middleware stack, and in each middleware of it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations, stack = options['iterations'], list(settings.MIDDLEWARE)
+        # stacks missing a middleware others depend on answer with logged 500s
+        request_logger = logging.getLogger('django.request')
+        request_logger.disabled = True
+        try:
+            self.report(stack, iterations)
+        finally:
+            request_logger.disabled = False
+
+    def report(self, stack: list[str], iterations: int):
+        # the project's own middleware (e.g. auditing) run in both stacks
+        extra = [m for m in stack if m not in DJANGO_DEFAULT_MIDDLEWARE and not m.startswith('apps.base.middleware.')]
+        for scenario, make_request in SCENARIOS.items():
+            default = time_stack(DJANGO_DEFAULT_MIDDLEWARE + extra, make_request, iterations)
+            total = time_stack(stack, make_request, iterations)
+            self.stdout.write(
+                f'{scenario}: {total:.1f}us per request, {default:.1f}us with the Django default stack'
+            )
+            for middleware in stack:
+                # a middleware's cost is what the stack saves without it, n/a when the others depend on it
+                without = time_stack([m for m in stack if m != middleware], make_request, iterations)
+                if without is None:
+                    self.stdout.write(f'  {"n/a":>8}    {middleware}')
+                else:
+                    self.stdout.write(f'  {max(total - without, 0):8.1f}us  {middleware}')
@@ -0,0 +1,86 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+SMAPS_ROLLUP = '/proc/self/smaps_rollup'
+
+
+def read_memory() -> dict[str, int]:
+    """RSS, PSS and USS (private pages, what a worker really costs) of the current process in kB."""
+    values = {}
+    with open(SMAPS_ROLLUP) as smaps:
+        for line in smaps:
+            key, _, rest = line.partition(':')
+            if rest.strip().endswith('kB'):
+                values[key] = int(rest.split()[0])
+    return {
+        'rss': values['Rss'], 'pss': values['Pss'], 'uss': values['Private_Clean'] + values['Private_Dirty'],
+    }
+
+
+def measure_workers(preload: bool, workers: int) -> list[dict[str, int]]:
+    """
+    Loads the application like a server master, optionally runs the preload warm-up and gc.freeze(), then forks
+    ``workers`` children that do what a worker does on its first requests and report their memory.
+    """
+    from django.core.wsgi import get_wsgi_application
+
+    from apps.base.preload import warm_up
+
+    get_wsgi_application()
+    if preload:
+        warm_up()
+        gc.collect()
+        gc.freeze()
+
+    results = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            warm_up()
+            gc.collect()
+            os.write(write_fd, json.dumps(read_memory()).encode())
+            os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            results.append(json.loads(pipe.read()))
+        os.waitpid(pid, 0)
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Fork workers with and without the preload warm-up and gc.freeze() and compare their unique memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        if not os.path.exists(SMAPS_ROLLUP) or not hasattr(os, 'fork'):
+            raise CommandError(f'needs fork() and {SMAPS_ROLLUP} (Linux)')
+
+        averages = {}
+        self.stdout.write('scenario   USS kB   PSS kB   RSS kB  (per worker average)')
+        for scenario in ('cold', 'preload'):
+            # each scenario in a fresh interpreter, a frozen or warmed process cannot be measured cold again
+            code = (
+                'import json, django; django.setup(); '
+                'from apps.base.management.commands.preload_memory import measure_workers; '
+                f'print(json.dumps(measure_workers({scenario == "preload"}, {options["workers"]})))'
+            )
+            result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+            if result.returncode:
+                raise CommandError(result.stderr.strip().splitlines()[-1])
+            workers = json.loads(result.stdout.strip().splitlines()[-1])
+            averages[scenario] = {key: sum(worker[key] for worker in workers) // len(workers) for key in workers[0]}
+            self.stdout.write(
+                f'{scenario:8} {averages[scenario]["uss"]:8} {averages[scenario]["pss"]:8} '
+                f'{averages[scenario]["rss"]:8}'
+            )
+        saved = averages['cold']['uss'] - averages['preload']['uss']
+        self.stdout.write(f'preload saves {saved} kB of unique memory per worker')
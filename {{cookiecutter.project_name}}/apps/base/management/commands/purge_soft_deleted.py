@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.base.managers import purge
+from apps.base.models import BaseModel
+
+
+def get_soft_delete_models(labels=None):
+    models = [model for model in apps.get_models() if issubclass(model, BaseModel)]
+    if labels:
+        models = [model for model in models if model._meta.label in labels]
+    return models
+
+
+def purge_soft_deleted(days: int, batch_size: int, labels=None) -> dict[str, int]:
+    before = timezone.now() - timedelta(days=days)
+    # the base manager sees every row of every tenant, whatever managers a subclass declares
+    return {
+        model._meta.label: purge(model._base_manager.filter(deleted_at__lt=before), batch_size)
+        for model in get_soft_delete_models(labels)
+    }
+
+
+class Command(BaseCommand):
+    help = 'Hard delete rows that were soft deleted more than N days ago, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SOFT_DELETE_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--model', action='append', dest='models', help='app_label.ModelName, repeatable')
+
+    def handle(self, *args, **options):
+        purged = purge_soft_deleted(options['days'], options['batch_size'], options['models'])
+        for label, count in purged.items():
+            self.stdout.write(f'{label}: {count} rows purged')
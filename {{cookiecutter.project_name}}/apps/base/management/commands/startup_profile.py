@@ -0,0 +1,63 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# what a worker does before serving: configure settings, populate the app registry, load the URLconf
+_BOOT = (
+    'import django; django.setup(); '
+    'from django.urls import get_resolver; get_resolver().url_patterns'
+)
+
+
+def profile_imports(settings_module: str, load_urls: bool = True) -> list[tuple[str, int, int, int]]:
+    """(module, self µs, cumulative µs, depth) of every import done while booting a fresh interpreter."""
+    code = _BOOT if load_urls else _BOOT.split('; from')[0]
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise CommandError(result.stderr.strip().splitlines()[-1])
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            imports.append((match[4], int(match[1]), int(match[2]), (len(match[3]) - 1) // 2))
+    return imports
+
+
+class Command(BaseCommand):
+    help = 'Boot the project in a fresh interpreter with -X importtime and report where import time goes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument('--no-urls', action='store_true', help='stop after django.setup()')
+        parser.add_argument(
+            '--settings-module', default=os.environ.get('DJANGO_SETTINGS_MODULE'),
+            help='defaults to DJANGO_SETTINGS_MODULE',
+        )
+
+    def handle(self, *args, **options):
+        imports = profile_imports(options['settings_module'], load_urls=not options['no_urls'])
+        limit = options['limit']
+
+        packages = defaultdict(int)
+        for module, self_us, _, _ in imports:
+            packages[module.split('.')[0]] += self_us
+        total = sum(packages.values())
+
+        self.stdout.write(f'{len(imports)} modules imported in {total / 1000:.1f} ms\n')
+        self.stdout.write('self ms  share  package')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:limit]:
+            self.stdout.write(f'{self_us / 1000:7.1f}  {self_us / total:5.1%}  {package}')
+
+        self.stdout.write('\ncumulative ms  module (first importer wins, nested imports indented)')
+        slowest = sorted(imports, key=lambda item: -item[2])[:limit]
+        for module, _, cumulative_us, depth in slowest:
+            self.stdout.write(f'{cumulative_us / 1000:13.1f}  {"  " * min(depth, 8)}{module}')
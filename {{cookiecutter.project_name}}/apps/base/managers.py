@@ -1,10 +1,63 @@
 from django.db import models
+from django.utils import timezone
 
+from .tenancy import get_current_tenant_id
 
-class BaseManager(models.Manager):
+
+def purge(queryset: models.QuerySet, batch_size: int = 1000) -> int:
+    """Hard delete the rows of `queryset`, ``batch_size`` rows per DELETE."""
+    purged = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return purged
+        queryset.model._base_manager.filter(pk__in=pks).delete()
+        purged += len(pks)
+
+
+class BaseQuerySet(models.QuerySet):
+
+    def soft_delete(self) -> int:
+        """Mark every row of the queryset as deleted with a single UPDATE."""
+        now = timezone.now()
+        return self.filter(deleted_at__isnull=True).update(deleted_at=now, updated_at=now)
+
+
+class BaseManager(models.Manager.from_queryset(BaseQuerySet)):
 
     def get_queryset(self):
         return super().get_queryset().filter(deleted_at__isnull=True)
 
     def with_deleted(self):
         return super().get_queryset()
+
+    def soft_delete(self, ids) -> int:
+        return self.get_queryset().filter(pk__in=ids).soft_delete()
+
+    def purge_deleted(self, before, batch_size: int = 1000) -> int:
+        """Hard delete rows soft deleted before ``before``, ``batch_size`` rows per DELETE."""
+        return purge(self.with_deleted().filter(deleted_at__lt=before), batch_size)
+
+
+class TenantManager(BaseManager):
+    """
+    Scopes queries to the current tenant (see ``apps.base.tenancy``) on top of hiding soft deleted rows. Outside
+    of a tenant, e.g. in the admin, Celery tasks or management commands, every tenant's rows are visible.
+    """
+
+    def _scope(self, queryset):
+        tenant_id = get_current_tenant_id()
+        return queryset if tenant_id is None else queryset.filter(tenant_id=tenant_id)
+
+    def get_queryset(self):
+        return self._scope(super().get_queryset())
+
+    def with_deleted(self):
+        return self._scope(super().with_deleted())
+
+    def all_tenants(self):
+        """Rows of every tenant, e.g. to check values that are unique across tenants."""
+        return BaseManager.get_queryset(self)
+
+    def for_tenant(self, tenant_id: int):
+        return self.all_tenants().filter(tenant_id=tenant_id)
@@ -0,0 +1,93 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from corsheaders.middleware import CorsMiddleware
+from corsheaders.signals import check_request_enabled
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request) -> bool:
+    return request.path_info.startswith(tuple(settings.API_PATH_PREFIXES))
+
+
+class WebOnlyMixin:
+    """
+    Skips the middleware for requests under API_PATH_PREFIXES. The API authenticates with tokens and renders
+    JSON, so sessions, CSRF, messages and frame options are only needed by the admin and other HTML pages.
+    Subclassing the Django middleware keeps the admin system checks and `isinstance` checks working.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)  # a coroutine when running async, like the wrapped __call__
+        return super().__call__(request)
+
+
+class WebSessionMiddleware(WebOnlyMixin, SessionMiddleware):
+    pass
+
+
+class WebCsrfViewMiddleware(WebOnlyMixin, CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class WebAuthenticationMiddleware(WebOnlyMixin, AuthenticationMiddleware):
+    # DRF authenticates API requests and copies the user to the django request
+    pass
+
+
+class WebMessageMiddleware(WebOnlyMixin, MessageMiddleware):
+    pass
+
+
+class WebXFrameOptionsMiddleware(WebOnlyMixin, XFrameOptionsMiddleware):
+    pass
+
+
+class PreflightMiddleware:
+    """
+    Answers CORS preflight requests before the rest of the stack runs. The headers corsheaders gives a
+    preflight only depend on the origin, the requested method and headers and whether CORS applies to the
+    path, so they are worked out once per combination and replayed. Keep it above CorsMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+    max_entries = 1024
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cors = CorsMiddleware(get_response)
+        self._headers: dict[tuple, dict] = {}
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if request.method != 'OPTIONS' or 'access-control-request-method' not in request.headers:
+            return self.get_response(request)
+        enabled = self.cors.is_enabled(request)
+        if not enabled or check_request_enabled.has_listeners():
+            # not a CORS path, or the answer can change per request
+            return self.cors(request)
+        key = (
+            request.headers.get('origin'),
+            request.headers['access-control-request-method'],
+            request.headers.get('access-control-request-headers'),
+            request.headers.get('access-control-request-private-network'),
+        )
+        headers = self._headers.get(key)
+        if headers is None:
+            request._cors_enabled = enabled
+            response = self.cors.add_response_headers(request, HttpResponse(headers={'content-length': '0'}))
+            headers = dict(response.headers)
+            if len(self._headers) >= self.max_entries:
+                self._headers.clear()
+            self._headers[key] = headers
+        return HttpResponse(headers=headers)
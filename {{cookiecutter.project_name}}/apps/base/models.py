@@ -1,10 +1,26 @@
+import copy
+{%- if cookiecutter.use_minio == 'y' %}
+
+from django.conf import settings
+{%- else %}
+{% endif %}
 from django.db import models
 from django.utils import timezone
+{%- if cookiecutter.use_minio == 'y' %}
 
-from .managers import BaseManager
+from .enums import AttachmentStatusEnum
+{%- else %}
+{% endif %}
+from .managers import BaseManager, TenantManager
+from .tenancy import get_current_tenant_id
 
 
 class BaseModel(models.Model):
+    """
+    Instances loaded from the database track their changes: ``save()`` only writes the changed columns and
+    ``updated_at``, and is a no-op when nothing changed, so no save signals are sent and ``updated_at`` stays.
+    ``save(force=True)`` still saves an unchanged instance, writing ``updated_at`` and sending the signals.
+    """
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(blank=True, null=True)
@@ -12,12 +28,160 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the row exactly as loaded; it is only turned into a dict when the instance is saved.
+        instance._loaded_values = (field_names, values)
+        return instance
+
+    def _get_loaded_values(self) -> dict | None:
+        loaded = self.__dict__.get('_loaded_values')
+        if isinstance(loaded, tuple):
+            loaded = self._loaded_values = dict(zip(*loaded))
+        return loaded
+
+    def get_dirty_fields(self) -> list[str] | None:
+        """
+        Names of the fields changed since the instance was loaded, or None if it was not loaded from the database.
+        In-place mutation of mutable values (e.g. JSON dicts) is not detected, assign a new value instead.
+        """
+        loaded = self._get_loaded_values()
+        if loaded is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            attname = field.attname
+            if attname not in self.__dict__:
+                continue
+            if attname not in loaded or loaded[attname] != self.__dict__[attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def get_loaded_instance(self):
+        """A copy of the instance holding the values it was loaded with."""
+        loaded = self._get_loaded_values()
+        if loaded is None:
+            return None
+        instance = copy.copy(self)
+        instance.__dict__.update(loaded)
+        return instance
+
+    def save(self, *args, force: bool = False, **kwargs):
+        if not self._state.adding and not args and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            dirty = self.get_dirty_fields()
+            if dirty is not None and self._meta.pk.name not in dirty:
+                if not dirty and not force:
+                    return
+                kwargs['update_fields'] = dirty if 'updated_at' in dirty else dirty + ['updated_at']
+        super().save(*args, **kwargs)
+        self._reset_loaded_values(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._reset_loaded_values(fields)
+
+    def _reset_loaded_values(self, fields=None):
+        loaded = self._get_loaded_values() or {}
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = self.__dict__[field.attname]
+        self._loaded_values = loaded
+
     def soft_delete(self):
         self.deleted_at = timezone.now()
-        self.save()
+        self.save(update_fields=['deleted_at', 'updated_at'])
 
     @property
     def is_deleted(self):
         return self.deleted_at is not None
 
     objects = BaseManager()
+
+
+class Tenant(BaseModel):
+    """An organization hosted on the deployment, the rows of TenantModel subclasses each belong to one."""
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=64, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class TenantModel(BaseModel):
+    """
+    A model whose rows belong to a tenant. Its manager only returns the current tenant's rows and new rows are
+    saved to the current tenant. Indexes should start with ``tenant`` so scoped queries use them, subclasses
+    that declare their own Meta.indexes must repeat it. Large tables can also be partitioned by tenant on
+    PostgreSQL, see ``apps.base.tenancy.partition_by_tenant``.
+    """
+    # the composite indexes lead with it, no separate index
+    tenant = models.ForeignKey(Tenant, on_delete=models.PROTECT, related_name='+', db_index=False)
+
+    objects = TenantManager()
+
+    class Meta:
+        abstract = True
+        indexes = [models.Index(fields=['tenant', 'created_at'], name='%(app_label)s_%(class)s_tenant_idx')]
+
+    def save(self, *args, **kwargs):
+        if self.tenant_id is None:
+            self.tenant_id = get_current_tenant_id()
+        super().save(*args, **kwargs)
+
+
+class Rollup(models.Model):
+    """
+    Number of `metric` events, e.g. signups, in the period starting at `bucket`, per `dimension` (e.g. the
+    user's role) and tenant. Kept up to date by ``apps.base.rollups.record`` so charts never scan the source rows.
+    """
+    metric = models.CharField(max_length=64)
+    dimension = models.CharField(max_length=64, blank=True, default='')
+    # not a foreign key, rollups outlive their tenant; 0 for rows without a tenant
+    tenant_id = models.BigIntegerField(default=0)
+    bucket = models.DateTimeField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        # the upsert conflict target, also serves the (metric, tenant, bucket range) reads
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'tenant_id', 'bucket', 'dimension'], name='%(app_label)s_%(class)s_key'
+            ),
+        ]
+
+
+class HourlyRollup(Rollup):
+    pass
+
+
+class DailyRollup(Rollup):
+    pass
+{%- if cookiecutter.use_minio == 'y' %}
+
+
+class Attachment(BaseModel):
+    """A file in the object storage. Clients upload and download it with presigned URLs, never through Django."""
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL, related_name='attachments'
+    )
+    key = models.CharField(max_length=512, unique=True)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    etag = models.CharField(max_length=255, blank=True, default='')
+    # set while a multipart upload is in progress
+    upload_id = models.CharField(max_length=255, blank=True, default='')
+    status = models.CharField(
+        max_length=20,
+        choices=AttachmentStatusEnum.choices(),
+        default=AttachmentStatusEnum.PENDING.value,
+    )
+
+    def __str__(self):
+        return self.filename
+{%- endif %}
@@ -1,8 +1,31 @@
 from rest_framework.permissions import BasePermission
 
+CAPABILITIES_CLAIM = 'caps'
+
+
+def get_capabilities(request) -> int:
+    """
+    Capability bitmask of the caller, read from the access token claims when present so no user lookup is needed.
+    """
+    token = request.auth
+    if token is not None and hasattr(token, 'get'):
+        capabilities = token.get(CAPABILITIES_CLAIM)
+        if capabilities is not None:
+            return capabilities
+    return getattr(request.user, 'capabilities', 0)
+
 
 class IsAdminPermission(BasePermission):
     message = 'Permission denied, you are not the admin'
 
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_admin)
+        return bool(request.user and request.user.is_staff)
+
+
+class HasCapabilities(BasePermission):
+    """Grants access when the caller holds every capability the view requires for the current action."""
+    message = 'You do not have the required permissions to perform this action.'
+
+    def has_permission(self, request, view):
+        required = view.get_required_capabilities()
+        return get_capabilities(request) & required == required
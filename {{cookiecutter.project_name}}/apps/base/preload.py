@@ -0,0 +1,74 @@
+import gc
+import logging
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _walk_resolver(resolver: URLResolver):
+    resolver.reverse_dict  # populates the reverse and namespace maps
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex  # compiled lazily otherwise
+        if isinstance(pattern, URLResolver):
+            yield from _walk_resolver(pattern)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def warm_urls() -> list[URLPattern]:
+    return list(_walk_resolver(get_resolver()))
+
+
+def warm_serializers(patterns: list[URLPattern]) -> None:
+    # Serializer field maps are rebuilt per instance, building one fills the model _meta caches they read from.
+    # Capability bitmasks need nothing here, they are compiled when the view classes are created.
+    seen = set()
+    for pattern in patterns:
+        view = getattr(pattern.callback, 'cls', None)
+        serializer_class = getattr(view, 'serializer_class', None)
+        if serializer_class is None or serializer_class in seen:
+            continue
+        seen.add(serializer_class)
+        serializer_class().fields
+
+
+def warm_services(patterns: list[URLPattern]) -> None:
+    from .views import BaseViewSet
+
+    # building a viewset resolves its shared service and repository, see apps.base.registry
+    for view in {getattr(pattern.callback, 'cls', None) for pattern in patterns}:
+        if isinstance(view, type) and issubclass(view, BaseViewSet):
+            view()
+
+
+def warm_schema() -> None:
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    from .schema import get_schema
+
+    for renderer in (OpenApiYamlRenderer(), OpenApiJsonRenderer()):
+        get_schema(renderer)
+
+
+def warm_up() -> None:
+    patterns = warm_urls()
+    warm_serializers(patterns)
+    warm_services(patterns)
+    warm_schema()
+
+
+def preload() -> None:
+    """
+    Called by wsgi.py/asgi.py once the application is loaded. With PRELOAD_APP, meant for the master of a
+    pre-forking server (gunicorn ``preload_app``), it warms what workers would otherwise each build on their
+    first requests, then moves every object to the permanent generation so garbage collections in the
+    workers do not write to, and un-share, the pages holding them.
+    """
+    if not settings.PRELOAD_APP:
+        return
+    warm_up()
+    gc.collect()
+    gc.freeze()
+    logger.info('preloaded application, %d objects frozen', gc.get_freeze_count())
@@ -0,0 +1,53 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+# class -> function building its instance, classes not provided are built with no arguments
+_factories: dict[type, Callable[[], object]] = {}
+# class -> the process wide instance
+_instances: dict[type, object] = {}
+_lock = threading.RLock()  # building an instance resolves its dependencies
+
+
+def provide(cls: type[T], factory: Callable[[], T]) -> None:
+    """Makes `resolve(cls)` build its instance with `factory`, e.g. a subclass or a differently configured one."""
+    with _lock:
+        _factories[cls] = factory
+        _instances.pop(cls, None)
+
+
+def resolve(cls: type[T]) -> T:
+    """
+    The process wide instance of `cls`, built on first use. Services and repositories are stateless, so views,
+    Celery tasks and management commands share the same instances instead of building them per call.
+    """
+    try:
+        return _instances[cls]
+    except KeyError:
+        with _lock:
+            if cls not in _instances:
+                _instances[cls] = _factories.get(cls, cls)()
+            return _instances[cls]
+
+
+@contextmanager
+def override(cls: type[T], instance: T):
+    """Makes `resolve(cls)` return `instance` inside the block, for tests."""
+    with _lock:
+        previous = _instances.get(cls)
+        _instances[cls] = instance
+    try:
+        yield instance
+    finally:
+        with _lock:
+            if previous is None:
+                _instances.pop(cls, None)
+            else:
+                _instances[cls] = previous
+
+
+def reset() -> None:
+    with _lock:
+        _instances.clear()
@@ -0,0 +1,97 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Mapping, Type
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+
+from .filters import BaseFilterSet
+from .models import BaseModel
+from .serializers import BaseModelSerializer
+
+
+@dataclass(frozen=True)
+class QuerySpec:
+    """What a read should load, passed with each call so repositories and services hold no request state."""
+    # request params, checked by the repository's filterset_class
+    filters: Mapping = field(default_factory=dict)
+    # fields to load, all when empty; must not defer the relations of the action's load policy
+    only: tuple[str, ...] = ()
+    order_by: tuple[str, ...] = ()
+    # selects the load policy
+    action: str | None = None
+
+
+class BaseRepository(ABC):
+    """Stateless, one instance is shared by the whole process, see `apps.base.registry`."""
+    # action -> eager loading applied to its queryset, 'default' is used for actions without a policy
+    # e.g. {'list': {'select_related': ('profile',), 'prefetch_related': ('groups',)}}
+    load_policies: dict[str, dict] = {}
+    # whitelisted, typed filters applied to `QuerySpec.filters`
+    filterset_class: Type[BaseFilterSet] | None = None
+
+    def __init__(self):
+        self._model: Type[BaseModel] = self._get_model()
+
+    @abstractmethod
+    def _get_model(self) -> Type[BaseModel]:
+        pass
+
+    @abstractmethod
+    def _get_serializer(self) -> Type[BaseModelSerializer]:
+        pass
+
+    @property
+    def model(self) -> Type[BaseModel]:
+        return self._model
+
+    def _apply_load_policy(self, queryset: QuerySet, action: str | None) -> QuerySet:
+        policy = self.load_policies.get(action) or self.load_policies.get('default') or {}
+        if policy.get('select_related'):
+            queryset = queryset.select_related(*policy['select_related'])
+        if policy.get('prefetch_related'):
+            queryset = queryset.prefetch_related(*policy['prefetch_related'])
+        return queryset
+
+    def _apply_filters(self, queryset: QuerySet, filters: Mapping) -> QuerySet:
+        if not filters:
+            return queryset
+        if self.filterset_class is None:
+            return queryset.filter(**filters)
+        filterset = self.filterset_class(filters, queryset=queryset)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset.qs
+
+    def _apply_spec(self, queryset: QuerySet, spec: QuerySpec) -> QuerySet:
+        if spec.only:
+            queryset = queryset.only(*spec.only)
+        if spec.order_by:
+            queryset = queryset.order_by(*spec.order_by)
+        return self._apply_load_policy(queryset, spec.action)
+
+    def get_queryset(self, spec: QuerySpec | None = None) -> QuerySet:
+        spec = spec or QuerySpec()
+        return self._apply_spec(self._apply_filters(self._model.objects.all(), spec.filters), spec)
+
+    def get_all(self, spec: QuerySpec | None = None) -> QuerySet:
+        return self.get_queryset(spec)
+
+    def get_by_id(self, id: int | str, spec: QuerySpec | None = None) -> BaseModel | None:
+        return self._apply_spec(self._model.objects.filter(pk=id), spec or QuerySpec()).first()
+
+    def create(self, data: dict) -> BaseModel:
+        serializer = self._get_serializer()(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def update(self, instance: BaseModel, data: dict) -> BaseModel:
+        serializer = self._get_serializer()(instance, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def delete(self, instance: BaseModel) -> None:
+        instance.soft_delete()
+
+    def delete_by_id(self, id: int | str) -> bool:
+        return self._model.objects.soft_delete([id]) > 0
@@ -0,0 +1,104 @@
+import contextlib
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DailyRollup, HourlyRollup, Rollup
+from .tenancy import get_current_tenant_id
+
+GRANULARITIES: dict[str, type[Rollup]] = {'hour': HourlyRollup, 'day': DailyRollup}
+COLUMNS = ('metric', 'dimension', 'tenant_id', 'bucket', 'count')
+
+# (metric, dimension, tenant_id, hour) -> count
+_buffer: ContextVar[Counter | None] = ContextVar('rollup_buffer', default=None)
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour or day of `moment`, days start at midnight in TIME_ZONE."""
+    moment = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if granularity == 'day' else moment
+
+
+@contextlib.contextmanager
+def collect():
+    """Add up the committed events of the block and upsert them in one batch on exit, e.g. around imports."""
+    buffer = Counter()
+    token = _buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _buffer.reset(token)
+        if buffer:
+            write(buffer)
+
+
+def record(metric: str, dimension: str = '', tenant_id: int | None = None, at: datetime | None = None,
+           count: int = 1) -> None:
+    """
+    Count `count` `metric` events at `at` (now by default) once the transaction commits, so rolled back changes
+    are never counted. Outside of ``collect`` they are written as soon as they are committed.
+    """
+    if tenant_id is None:
+        tenant_id = get_current_tenant_id()
+    key = (metric, dimension, tenant_id or 0, truncate(at or timezone.now(), 'hour'))
+
+    def stage():
+        buffer = _buffer.get()
+        if buffer is None:
+            write(Counter({key: count}))
+        else:
+            buffer[key] += count
+
+    transaction.on_commit(stage)
+
+
+def write(events: Counter, using: str = 'default') -> None:
+    """
+    Add `events` to the hourly and daily rollups with batched ``INSERT ... ON CONFLICT DO UPDATE`` statements,
+    which both PostgreSQL and SQLite turn into in-place increments of the existing rows.
+    """
+    days = Counter()
+    for (metric, dimension, tenant_id, hour), count in events.items():
+        days[metric, dimension, tenant_id, truncate(hour, 'day')] += count
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for model, counts in ((HourlyRollup, events), (DailyRollup, days)):
+            table = connection.ops.quote_name(model._meta.db_table)
+            items = list(counts.items())
+            batch_size = connection.ops.bulk_batch_size(COLUMNS, items)
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                params = []
+                for (metric, dimension, tenant_id, bucket), count in batch:
+                    params += [metric, dimension, tenant_id, connection.ops.adapt_datetimefield_value(bucket), count]
+                cursor.execute(
+                    f'INSERT INTO {table} ({", ".join(COLUMNS)}) '
+                    f'VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))} '
+                    f'ON CONFLICT (metric, tenant_id, bucket, dimension) '
+                    f'DO UPDATE SET count = {table}.count + EXCLUDED.count', params,
+                )
+
+
+def series(metrics, granularity: str, since: datetime, until: datetime) -> dict[str, list[dict]]:
+    """
+    The rollups of `metrics` between `since` and `until` (excluded), metric -> buckets in order, each with the
+    total and the count per dimension. Scoped to the current tenant, summed over all tenants outside of one.
+    """
+    rows = GRANULARITIES[granularity].objects.filter(
+        metric__in=metrics, bucket__gte=truncate(since, granularity), bucket__lt=until,
+    )
+    tenant_id = get_current_tenant_id()
+    if tenant_id is not None:
+        rows = rows.filter(tenant_id=tenant_id)
+    rows = rows.values('metric', 'bucket', 'dimension').annotate(total=Sum('count')).order_by('bucket')
+    result = {metric: {} for metric in metrics}
+    for row in rows:
+        buckets = result[row['metric']]
+        bucket = buckets.setdefault(row['bucket'], {'bucket': row['bucket'], 'total': 0, 'counts': {}})
+        bucket['total'] += row['total']
+        bucket['counts'][row['dimension']] = row['total']
+    return {metric: list(buckets.values()) for metric, buckets in result.items()}
@@ -0,0 +1,195 @@
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import URLPattern, URLResolver, re_path
+from django.urls.exceptions import Resolver404
+from django.urls.resolvers import RegexPattern, ResolverMatch, RoutePattern
+from rest_framework.routers import SimpleRouter
+
+# API_TRAILING_SLASH policy -> what the router puts at the end of its routes
+TRAILING_SLASHES = {'always': '/', 'never': '', 'optional': '/?'}
+REGEX_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+QUANTIFIERS = frozenset('*?{')
+
+
+class FlatRouter(SimpleRouter):
+    """
+    SimpleRouter for BaseViewSet subclasses, without the API root view and format suffix patterns DefaultRouter
+    adds. Routes end as API_TRAILING_SLASH says: 'always' with a slash, 'never' or 'optional'.
+
+    The collection of a viewset registered with an empty prefix is the path of the include it is mounted at, e.g.
+    ``users/``, and keeps that path's slash under every policy.
+    """
+
+    def __init__(self, trailing_slash: str | None = None):
+        super().__init__()
+        policy = trailing_slash or settings.API_TRAILING_SLASH
+        if policy not in TRAILING_SLASHES:
+            raise ImproperlyConfigured(f'trailing slash policy must be one of {", ".join(TRAILING_SLASHES)}')
+        self.trailing_slash = TRAILING_SLASHES[policy]
+
+    def get_urls(self):
+        urls = []
+        for url in super().get_urls():
+            # with an empty prefix SimpleRouter strips the slash of '^/?$' and leaves the invalid '^?$'
+            regex = str(url.pattern)
+            if regex.startswith('^?'):
+                url = re_path('^' + regex[2:], url.callback, name=url.name)
+            urls.append(url)
+        return urls
+
+
+@dataclass(frozen=True)
+class _Route:
+    index: int  # position in the URLconf, the first route to match wins as with Django's resolver
+    pattern: URLPattern
+    regex: re.Pattern | None  # None for static routes
+    converters: dict
+    default_kwargs: dict
+    app_names: list
+    namespaces: list
+    route: str
+
+
+def _literal(pattern) -> str | None:
+    """The text `pattern` matches if it only matches one, None otherwise."""
+    if isinstance(pattern, RoutePattern):
+        route = str(pattern)
+        return None if '<' in route else route
+    regex = pattern.regex.pattern.removeprefix('^')
+    if regex.endswith('$') and not regex.endswith('\\$'):
+        regex = regex[:-1]
+    return None if REGEX_SPECIAL.intersection(regex) else regex
+
+
+def _literal_prefix(pattern) -> str:
+    literal = _literal(pattern)
+    if literal is not None:
+        return literal
+    if isinstance(pattern, RoutePattern):
+        return str(pattern).partition('<')[0]
+    regex = pattern.regex.pattern.removeprefix('^')
+    end = next((i for i, char in enumerate(regex) if char in REGEX_SPECIAL), len(regex))
+    # 'users/?' only guarantees 'users'
+    if end < len(regex) and regex[end] in QUANTIFIERS:
+        end = max(end - 1, 0)
+    return regex[:end]
+
+
+def _join_route(route1: str, route2: str) -> str:
+    """The ``route`` of a ResolverMatch: the routes of the nested patterns joined, as Django's resolver does."""
+    if not route1:
+        return route2
+    return route1 + route2.removeprefix('^')
+
+
+class RouteTable(URLResolver):
+    """
+    A URLResolver that resolves everything below it from one flat table instead of walking the nested includes
+    and routers with a regex per level. Routes without parameters are found with a dict lookup, the others are
+    bucketed by their first path segment and tried with a single precompiled regex each. Reversing and the
+    URLconf checks still see the nested patterns, e.g. ``api:users:user-list`` keeps working.
+    """
+
+    @classmethod
+    def wrap(cls, resolver: URLResolver) -> 'RouteTable':
+        """`path('api/', include(...))` -> the same entry resolved by a RouteTable."""
+        return cls(resolver.pattern, resolver.urlconf_name, resolver.default_kwargs, resolver.app_name,
+                   resolver.namespace)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._table = None
+
+    def _walk(self, patterns, prefix, exact, regex, converters, default_kwargs, app_names, namespaces, route):
+        """
+        Yields a flattened route for each URLPattern below `patterns`. `prefix` is the text every path matched so
+        far starts with, and all of it when `exact`.
+        """
+        for pattern in patterns:
+            if not isinstance(pattern.pattern, (RoutePattern, RegexPattern)):
+                raise ImproperlyConfigured(f'{pattern.pattern!r} cannot be precompiled')
+            piece = pattern.pattern.regex.pattern
+            if not piece.startswith('^'):
+                raise ImproperlyConfigured(f'{pattern.pattern!r} is not anchored, it cannot be precompiled')
+            literal = _literal(pattern.pattern) if exact else None
+            levels = (
+                prefix + (literal if literal is not None else _literal_prefix(pattern.pattern)) if exact else prefix,
+                literal is not None,
+                regex + piece[1:],
+                {**converters, **pattern.pattern.converters},
+            )
+            if isinstance(pattern, URLPattern):
+                text, is_static, pattern_regex, pattern_converters = levels
+                if pattern_regex.endswith('$') and not pattern_regex.endswith('\\$'):
+                    pattern_regex = pattern_regex[:-1] + r'\Z'
+                yield (
+                    text, is_static, pattern, pattern_regex, pattern_converters,
+                    {**default_kwargs, **pattern.default_args}, app_names, namespaces,
+                    _join_route(route, str(pattern.pattern)),
+                )
+            else:
+                yield from self._walk(
+                    pattern.url_patterns, *levels, {**default_kwargs, **pattern.default_kwargs},
+                    [*app_names, pattern.app_name], [*namespaces, pattern.namespace],
+                    _join_route(route, str(pattern.pattern)),
+                )
+
+    def _build(self):
+        static, buckets, anywhere = {}, {}, []
+        leaves = self._walk(self.url_patterns, '', True, '^', {}, {}, [self.app_name], [self.namespace], '')
+        for index, (text, is_static, pattern, regex, converters, defaults, app_names, namespaces, route) \
+                in enumerate(leaves):
+            if is_static:
+                static.setdefault(text, _Route(index, pattern, None, {}, defaults, app_names, namespaces, route))
+                continue
+            entry = _Route(index, pattern, re.compile(regex), converters, defaults, app_names, namespaces, route)
+            segment, slash, _ = text.partition('/')
+            if slash:
+                buckets.setdefault(segment + slash, []).append(entry)
+            else:
+                anywhere.append(entry)
+        # routes that can match any first segment are tried along with each bucket, in URLconf order
+        for segment, entries in buckets.items():
+            buckets[segment] = sorted(entries + anywhere, key=lambda entry: entry.index)
+        return static, buckets, anywhere
+
+    def _match(self, entry: _Route, args: tuple, captured: dict) -> ResolverMatch:
+        kwargs = {**captured, **entry.default_kwargs}
+        return ResolverMatch(
+            entry.pattern.callback, () if kwargs else args, kwargs, entry.pattern.name, entry.app_names,
+            entry.namespaces, entry.route, captured_kwargs=captured, extra_kwargs=entry.default_kwargs,
+        )
+
+    def resolve(self, path):
+        path = str(path)
+        match = self.pattern.match(path)
+        if not match:
+            raise Resolver404({'path': path})
+        new_path, outer_args, outer_kwargs = match
+        if self._table is None:
+            self._table = self._build()
+        static, buckets, anywhere = self._table
+
+        found = static.get(new_path)
+        segment, slash, _ = new_path.partition('/')
+        for entry in buckets.get(segment + slash, anywhere) if slash else anywhere:
+            if found is not None and entry.index > found.index:
+                break
+            regex_match = entry.regex.match(new_path)
+            if regex_match is None:
+                continue
+            kwargs = regex_match.groupdict()
+            try:
+                for key, value in kwargs.items():
+                    if key in entry.converters:
+                        kwargs[key] = entry.converters[key].to_python(value)
+            except ValueError:
+                continue
+            kwargs = {key: value for key, value in kwargs.items() if value is not None}
+            return self._match(entry, outer_args + regex_match.groups(), {**outer_kwargs, **kwargs})
+        if found is not None:
+            return self._match(found, outer_args, outer_kwargs)
+        raise Resolver404({'tried': [], 'path': new_path})
@@ -0,0 +1,146 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.module_loading import autodiscover_modules
+from drf_spectacular.extensions import OpenApiViewExtension
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+# (schema version, renderer format) -> rendered schema, filled once per process
+_schemas: dict[tuple[str, str], bytes] = {}
+
+
+def _walk_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            view = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+            actions = sorted((getattr(callback, 'actions', None) or {}).items())
+            yield f'{prefix}{pattern.pattern} {view.__module__}.{view.__qualname__} {actions}'
+
+
+@lru_cache(maxsize=None)
+def get_schema_version() -> str:
+    """Changes with the URLconf, CODE_VERSION and the spectacular settings, the URLconf is fixed per process."""
+    digest = hashlib.sha256()
+    digest.update(f'{settings.CODE_VERSION}\n{spectacular_settings.VERSION}\n'.encode())
+    for line in _walk_patterns(get_resolver().url_patterns):
+        digest.update(line.encode())
+        digest.update(b'\n')
+    return digest.hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def load_schema_extensions() -> None:
+    """Imports the ``schema`` module of every app, OpenAPI extensions live there so they load with the schema only."""
+    autodiscover_modules('schema')
+
+
+def generate_schema(renderer) -> bytes:
+    load_schema_extensions()
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return renderer.render(schema, renderer_context={})
+
+
+def get_schema(renderer) -> bytes:
+    """
+    The rendered schema from memory, then from SCHEMA_CACHE_DIR, generating it only when neither has the current
+    version. DEBUG skips the directory since serializers may change without the URLconf or CODE_VERSION changing.
+    """
+    key = (get_schema_version(), renderer.format)
+    schema = _schemas.get(key)
+    if schema is not None:
+        return schema
+    path = Path(settings.SCHEMA_CACHE_DIR) / f'schema-{key[0]}.{renderer.format}'
+    if not settings.DEBUG and path.exists():
+        schema = path.read_bytes()
+    else:
+        schema = generate_schema(renderer)
+        if not settings.DEBUG:
+            write_schema(path, schema)
+    _schemas[key] = schema
+    return schema
+
+
+def write_schema(path: Path, schema: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f'{path.suffix}.tmp')
+    tmp.write_bytes(schema)
+    tmp.replace(path)
+
+
+def precompute_schemas() -> list[Path]:
+    """Render every format into SCHEMA_CACHE_DIR, meant to run at build time next to collectstatic."""
+    paths = []
+    for renderer in (OpenApiYamlRenderer(), OpenApiJsonRenderer()):
+        path = Path(settings.SCHEMA_CACHE_DIR) / f'schema-{get_schema_version()}.{renderer.format}'
+        schema = generate_schema(renderer)
+        write_schema(path, schema)
+        _schemas[(get_schema_version(), renderer.format)] = schema
+        paths.append(path)
+    return paths
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving a precomputed schema with an ETag. Requests asking for a specific
+    language or version, or non public schemas, are still generated per request.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        load_schema_extensions()
+        if not self.serve_public or self.custom_settings or self.urlconf or self.patterns or self.api_version \
+                or request.version or request.GET.get('lang') or request.GET.get('version'):
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        schema = get_schema(renderer)
+        etag = f'"{get_schema_version()}-{renderer.format}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(schema, content_type=f'{renderer.media_type}; charset=utf-8')
+            filename = f'{spectacular_settings.TITLE or "schema"}.{renderer.format}'
+            response['Content-Disposition'] = f'inline; filename="{filename}"'
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class FileViewSchema(OpenApiViewExtension):
+    target_class = 'apps.base.files.FileView'
+
+    def view_replacement(self):
+        class Fixed(self.target_class):
+            @extend_schema(responses={(200, '*/*'): OpenApiTypes.BINARY, 206: OpenApiTypes.BINARY, 416: None})
+            def get(self, request, name, *args, **kwargs):
+                return super().get(request, name, *args, **kwargs)
+
+        return Fixed
+
+
+class FileUploadViewSchema(OpenApiViewExtension):
+    target_class = 'apps.base.files.FileUploadView'
+
+    def view_replacement(self):
+        class Fixed(self.target_class):
+            @extend_schema(
+                request={'multipart/form-data': {'type': 'object', 'additionalProperties': {'type': 'string',
+                                                                                           'format': 'binary'}}},
+                responses={201: OpenApiResponse(OpenApiTypes.OBJECT, description='the stored files')},
+            )
+            def post(self, request, *args, **kwargs):
+                return super().post(request, *args, **kwargs)
+
+        return Fixed
@@ -1,11 +1,19 @@
 from abc import ABC, abstractmethod
 
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save
+
 from .models import BaseModel
-from .repositories import BaseRepository
+from .repositories import BaseRepository, QuerySpec
 from .exceptions import NotFoundError
+from .signals import entity_changed
 
 
 class BaseService(ABC):
+    """
+    Stateless, one instance is shared by the whole process, see `apps.base.registry`. Per call state, like the
+    request's filters, is passed in a `QuerySpec`.
+    """
 
     def __init__(self):
         self._repository: BaseRepository = self._get_repository()
@@ -14,25 +22,49 @@ class BaseService(ABC):
     def _get_repository(self) -> BaseRepository:
         pass
 
-    def set_filters(self, params):
-        self._repository.set_filters(params)
-
-    def get_all(self) -> BaseModel:
-        return self._repository.get_all()
+    def get_all(self, spec: QuerySpec | None = None) -> QuerySet:
+        return self._repository.get_all(spec)
 
-    def get_by_id(self, id: int | str) -> BaseModel:
-        instance = self._repository.get_by_id(id)
+    def get_by_id(self, id: int | str, spec: QuerySpec | None = None) -> BaseModel:
+        instance = self._repository.get_by_id(id, spec)
         if instance is None:
             raise NotFoundError()
         return instance
 
     def create(self, data: dict) -> BaseModel:
-        return self._repository.create(data)
+        instance = self._repository.create(data)
+        self._send_changed('created', instance.pk, instance)
+        return instance
 
-    def update(self, id: int | str, data: dict) -> BaseModel:
-        instance = self.get_by_id(id)
-        return self._repository.update(instance, data)
+    def update(self, id: int | str, data: dict, spec: QuerySpec | None = None) -> BaseModel:
+        instance = self.get_by_id(id, spec)
+        instance = self._repository.update(instance, data)
+        self._send_changed('updated', instance.pk, instance)
+        return instance
 
     def delete(self, id: int | str) -> None:
+        if not self._delete_needs_instance():
+            if not self._repository.delete_by_id(id):
+                raise NotFoundError()
+            self._send_changed('deleted', self._repository.model._meta.pk.to_python(id))
+            return
         instance = self.get_by_id(id)
         self._repository.delete(instance)
+        self._on_delete(instance)
+        self._send_changed('deleted', instance.pk, instance)
+
+    def _send_changed(self, action: str, pk, instance: BaseModel | None = None) -> None:
+        entity_changed.send(sender=self._repository.model, action=action, pk=pk, instance=instance)
+
+    def _on_delete(self, instance: BaseModel) -> None:
+        pass
+
+    def _delete_needs_instance(self) -> bool:
+        # A single UPDATE is enough unless save signals (e.g. auditlog) or an `_on_delete` hook want the instance.
+        # User always loads it, its audit log and search index listen to post_save; Tenant has the fast path.
+        model = self._repository.model
+        return (
+            type(self)._on_delete is not BaseService._on_delete
+            or pre_save.has_listeners(model)
+            or post_save.has_listeners(model)
+        )
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by BaseService after a create, update or delete with sender=model, action ('created', 'updated' or
+# 'deleted'), pk and instance (None when a delete did not load the row). Receivers run inside the transaction.
+entity_changed = Signal()
@@ -0,0 +1,28 @@
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def purge_soft_deleted(days=None, batch_size=1000):
+    from django.conf import settings
+
+    from .management.commands.purge_soft_deleted import purge_soft_deleted as purge
+
+    purge(days if days is not None else settings.SOFT_DELETE_RETENTION_DAYS, batch_size)
+{%- if cookiecutter.use_auditlog == 'y' %}
+
+
+@shared_task(ignore_result=True)
+def write_audit_entries(rows):
+    from auditlog.models import LogEntry
+
+    LogEntry.objects.bulk_create([LogEntry(**row) for row in rows])
+
+
+@shared_task(ignore_result=True)
+def maintain_audit_partitions():
+    from .history import archive_partitions, ensure_partitions, is_partitioned
+
+    if is_partitioned():
+        ensure_partitions()
+        archive_partitions()
+{%- endif %}
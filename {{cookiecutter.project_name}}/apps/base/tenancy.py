@@ -0,0 +1,113 @@
+import contextlib
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .db import register_postgres_ddl
+
+# claim of the access token holding the user's tenant, see apps.users.tokens
+TENANT_CLAIM = 'tenant'
+
+_tenant: ContextVar[int | None] = ContextVar('tenant', default=None)
+
+
+def get_current_tenant_id() -> int | None:
+    """The tenant queries of TenantModel subclasses are scoped to, None outside of a tenant (all tenants)."""
+    return _tenant.get()
+
+
+def set_current_tenant_id(tenant_id: int | None) -> None:
+    """Scopes the rest of the request to `tenant_id`, called by authentication once the token is verified."""
+    _tenant.set(tenant_id)
+
+
+@contextlib.contextmanager
+def tenant_context(tenant_id: int | None):
+    """Scopes the block to `tenant_id`, for Celery tasks and management commands working for one tenant."""
+    token = _tenant.set(tenant_id)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+class TenantMiddleware:
+    """
+    Starts every request outside of any tenant and drops the tenant its authentication set once it is done, so
+    it never leaks to the next request served by the thread. The tenant comes from the verified JWT, DRF
+    authenticates API requests in the view, see ``VersionedJWTAuthentication``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with tenant_context(None):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with tenant_context(None):
+            return await self.get_response(request)
+
+
+# Converts the table to one partitioned by hash of tenant_id, on the first migrate after it was registered.
+# PostgreSQL requires the primary key and unique indexes to include the partition key and cannot point foreign
+# keys at the rows of a partitioned table by id alone, so tables referenced by foreign keys are refused.
+PARTITION_BY_TENANT_SQL = """
+DO $$
+DECLARE
+    statement text;
+    indexes text[];
+    foreign_keys text[];
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = '{table}'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_constraint WHERE confrelid = '{table}'::regclass AND contype = 'f') THEN
+        RAISE EXCEPTION '{table} is referenced by foreign keys, it cannot be partitioned by tenant';
+    END IF;
+    ALTER TABLE {table} RENAME TO {table}_unpartitioned;
+    CREATE TABLE {table} (LIKE {table}_unpartitioned INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)
+        PARTITION BY HASH (tenant_id);
+    FOR remainder IN 0..{partitions} - 1 LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {table} FOR VALUES WITH (MODULUS {partitions}, REMAINDER %s)',
+            '{table}_p' || remainder, remainder
+        );
+    END LOOP;
+    INSERT INTO {table} OVERRIDING SYSTEM VALUE SELECT * FROM {table}_unpartitioned;
+    indexes := ARRAY(
+        SELECT replace(pg_get_indexdef(indexrelid), '{table}_unpartitioned ', '{table} ')
+        FROM pg_index WHERE indrelid = '{table}_unpartitioned'::regclass AND NOT indisprimary
+    );
+    foreign_keys := ARRAY(
+        SELECT format('ALTER TABLE {table} ADD CONSTRAINT %I %s', conname, pg_get_constraintdef(oid))
+        FROM pg_constraint WHERE conrelid = '{table}_unpartitioned'::regclass AND contype = 'f'
+    );
+    DROP TABLE {table}_unpartitioned;
+    ALTER TABLE {table} ADD PRIMARY KEY ({pk}, tenant_id);
+    FOREACH statement IN ARRAY indexes || foreign_keys LOOP
+        EXECUTE statement;
+    END LOOP;
+    PERFORM setval(pg_get_serial_sequence('{table}', '{pk}'), (SELECT COALESCE(MAX({pk}), 0) + 1 FROM {table}), false);
+END $$
+"""
+
+
+def partition_by_tenant(model, partitions: int = 16) -> None:
+    """
+    Declares `model`, a TenantModel subclass, partitioned by tenant on PostgreSQL. Call it after the model class,
+    like ``register_postgres_ddl``. For large tables that are only read one tenant at a time: each tenant's
+    rows live in one of `partitions` tables, so its queries and vacuums only touch that one.
+    """
+    register_postgres_ddl(model._meta.app_label, PARTITION_BY_TENANT_SQL.format(
+        table=model._meta.db_table, pk=model._meta.pk.column, partitions=partitions,
+    ))
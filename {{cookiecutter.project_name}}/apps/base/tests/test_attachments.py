@@ -0,0 +1,189 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import Request, urlopen
+
+from django.test import override_settings
+from django.utils import timezone
+from storages.backends.s3 import S3Storage
+from moto.server import ThreadedMotoServer
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base import attachments
+from apps.base.files import get_object_key, iter_file, open_writer
+from apps.base.management.commands.purge_soft_deleted import purge_soft_deleted
+from apps.base.models import Attachment
+from apps.base.utils import TestHelper
+from apps.users.models import User
+
+BUCKET = 'attachments-test'
+
+
+def http(method, url, body=None, headers=None):
+    # urllib would send bodies as application/x-www-form-urlencoded
+    headers = {'Content-Type': 'application/octet-stream', **(headers or {})}
+    with urlopen(Request(url, data=body, method=method, headers=headers)) as resp:
+        return resp.headers, resp.read()
+
+
+class AttachmentTest(APITestCase):
+    """Runs the upload flow against a local fake S3, the test client never sends file bytes to Django."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadedMotoServer(port=0, verbose=False)
+        cls.server.start()
+        host, port = cls.server.get_host_and_port()
+        endpoint = f'http://{host}:{port}'
+        cls.settings_override = override_settings(
+            AWS_S3_ENDPOINT_URL=endpoint, MINIO_EXPOSE_URL=endpoint, AWS_STORAGE_BUCKET_NAME=BUCKET,
+            AWS_ACCESS_KEY_ID='test', AWS_SECRET_ACCESS_KEY='test', AWS_S3_REGION_NAME='us-east-1',
+            ATTACHMENT_MAX_SIZE=20 * 1024 * 1024, ATTACHMENT_PART_SIZE=0,
+        )
+        cls.settings_override.enable()
+        attachments.get_client.cache_clear()
+        attachments.get_client().create_bucket(Bucket=BUCKET)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        attachments.get_client.cache_clear()
+        cls.settings_override.disable()
+        cls.server.stop()
+
+    def setUp(self):
+        self.list_url = reverse('api:attachments:attachment-list')
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='Testpass123!')
+        TestHelper.authenticate_client(self.client, self.user)
+
+    def start(self, content, **extra):
+        resp = self.client.post(
+            self.list_url, {'filename': 'report.txt', 'content_type': 'text/plain', 'size': len(content), **extra},
+            format='json'
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+        return resp.data['data']['attachment']['id'], resp.data['data']['upload']
+
+    def complete(self, id, data=None):
+        return self.client.post(reverse('api:attachments:attachment-complete', args=[id]), data or {}, format='json')
+
+    def test_single_upload_and_download(self):
+        content = b'quarterly numbers'
+        id, upload = self.start(content)
+        self.assertEqual(Attachment.objects.get(pk=id).status, 'pending')
+
+        http(upload['method'], upload['url'], content, upload['headers'])
+        resp = self.complete(id)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(resp.data['data']['attachment']['status'], 'uploaded')
+        resp = self.client.get(reverse('api:attachments:attachment-download', args=[id]))
+        headers, body = http('GET', resp.data['data']['url'])
+        self.assertEqual(body, content)
+        self.assertIn('report.txt', headers['Content-Disposition'])
+
+    def test_multipart_upload(self):
+        content = b'a' * (5 * 1024 * 1024) + b'tail'
+        id, upload = self.start(content, multipart=True)
+        self.assertEqual(len(upload['parts']), 2)
+
+        parts = []
+        for part in upload['parts']:
+            offset = (part['part_number'] - 1) * upload['part_size']
+            headers, _ = http('PUT', part['url'], content[offset:offset + upload['part_size']])
+            parts.append({'part_number': part['part_number'], 'etag': headers['ETag']})
+        resp = self.complete(id, {'parts': parts})
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        attachment = Attachment.objects.get(pk=id)
+        self.assertEqual((attachment.status, attachment.size, attachment.upload_id), ('uploaded', len(content), ''))
+
+    def test_complete_before_upload_conflicts(self):
+        id, _ = self.start(b'missing')
+
+        self.assertEqual(self.complete(id).status_code, status.HTTP_409_CONFLICT)
+        resp = self.client.get(reverse('api:attachments:attachment-download', args=[id]))
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+
+    def test_size_mismatch_conflicts(self):
+        id, upload = self.start(b'declared')
+        self.assertIn('content-length', parse_qs(urlsplit(upload['url']).query)['X-Amz-SignedHeaders'][0].split(';'))
+        # the fake bucket does not check signatures, real ones refuse bodies of another size
+        http(upload['method'], upload['url'], b'longer than declared', upload['headers'])
+
+        self.assertEqual(self.complete(id).status_code, status.HTTP_409_CONFLICT)
+        self.assertIsNone(attachments.head_object(Attachment.objects.get(pk=id).key))
+
+    def upload(self, content):
+        id, upload = self.start(content)
+        http(upload['method'], upload['url'], content, upload['headers'])
+        self.assertEqual(self.complete(id).status_code, status.HTTP_200_OK)
+        return Attachment.objects.get(pk=id)
+
+    def test_deleting_an_attachment_deletes_its_object(self):
+        attachment = self.upload(b'to be deleted')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.delete(reverse('api:attachments:attachment-detail', args=[attachment.pk]))
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsNone(attachments.head_object(attachment.key))
+
+    def test_purging_an_attachment_deletes_its_object(self):
+        attachment = self.upload(b'to be purged')
+        Attachment.objects.filter(pk=attachment.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purge_soft_deleted(days=30, batch_size=10, labels=['base.Attachment'])
+
+        self.assertFalse(Attachment._base_manager.filter(pk=attachment.pk).exists())
+        self.assertIsNone(attachments.head_object(attachment.key))
+
+    def test_rejects_oversized_files(self):
+        resp = self.client.post(
+            self.list_url, {'filename': 'big.bin', 'content_type': 'application/octet-stream', 'size': 10 ** 9},
+            format='json'
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_cannot_see_attachments(self):
+        id, _ = self.start(b'private')
+        other = User.objects.create_user(username='other', email='other@example.com', password='Testpass123!')
+        TestHelper.authenticate_client(self.client, other)
+
+        resp = self.client.get(reverse('api:attachments:attachment-detail', args=[id]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_storage_streams_uploads_and_byte_ranges(self):
+        storage = S3Storage(
+            bucket_name=BUCKET, endpoint_url=attachments.settings.AWS_S3_ENDPOINT_URL, access_key='test',
+            secret_key='test', region_name='us-east-1',
+        )
+        content = bytes(range(256)) * (6 * 4096)  # a bit over the 5 MiB minimum, so two parts
+
+        writer = open_writer(storage, 'streamed/data.bin', 'application/octet-stream')
+        writer.part_size = 5 * 1024 * 1024
+        for offset in range(0, len(content), 65536):
+            writer.write(content[offset:offset + 65536])
+        name = writer.close()
+
+        self.assertEqual(len(writer.parts), 2)
+        self.assertEqual(storage.size(name), len(content))
+        self.assertEqual(b''.join(iter_file(storage, name, 100, 199, chunk_size=32)), content[100:200])
+
+    def test_storage_location_prefixes_object_keys(self):
+        storage = S3Storage(
+            bucket_name=BUCKET, endpoint_url=attachments.settings.AWS_S3_ENDPOINT_URL, access_key='test',
+            secret_key='test', region_name='us-east-1', location='media',
+        )
+        writer = open_writer(storage, 'located/data.bin', 'application/octet-stream')
+        writer.write(b'located bytes')
+        name = writer.close()
+
+        self.assertEqual(writer.key, f'media/{name}')
+        self.assertTrue(storage.exists(name))
+        self.assertEqual(b''.join(iter_file(storage, name, 0, 6)), b'located')
+        storage.location = ''
+        self.assertEqual(get_object_key(storage, 'a/../b.bin'), 'b.bin')
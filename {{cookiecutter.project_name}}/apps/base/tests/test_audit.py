@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from auditlog.context import auditlog_disabled, disable_auditlog
+from auditlog.models import LogEntry
+from auditlog.registry import AuditLogRegistrationError
+from django.db import transaction
+from django.test import RequestFactory, TestCase
+
+from apps.base import audit
+from apps.users.models import User
+
+
+class AuditSinkTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='audited', email='audited@example.com', password='Testpass123!')
+        LogEntry.objects.all().delete()
+
+    def test_entries_are_flushed_once_per_collect_block(self):
+        with audit.collect() as buffer:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.email = 'first@example.com'
+                self.user.save()
+                self.user.email = 'second@example.com'
+                self.user.save()
+            self.assertFalse(LogEntry.objects.exists())
+
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual(LogEntry.objects.filter(object_pk=str(self.user.pk)).count(), 2)
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with audit.collect() as buffer:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        self.user.email = 'rolled-back@example.com'
+                        self.user.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+
+        self.assertEqual(buffer, [])
+        self.assertFalse(LogEntry.objects.exists())
+
+    def test_file_backend_appends_json_lines(self):
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        with mock.patch.object(audit, 'get_backend', return_value=audit.FileAuditBackend(path=path)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.email = 'file@example.com'
+                self.user.save()
+
+        with open(path) as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['object_pk'], str(self.user.pk))
+        self.assertIn('email', rows[0]['changes'])
+        self.assertFalse(LogEntry.objects.exists())
+
+    def test_entries_record_the_client_address_and_port(self):
+        request = RequestFactory().post(
+            '/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.7:5000, 10.0.0.1',
+            HTTP_X_FORWARDED_PORT='443',
+        )
+        token = audit._request.set(request)
+        self.addCleanup(audit._request.reset, token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.email = 'proxied@example.com'
+            self.user.save()
+
+        entry = LogEntry.objects.get(object_pk=str(self.user.pk))
+        self.assertEqual((entry.remote_addr, entry.remote_port), ('203.0.113.7', 443))
+        request.META.pop('HTTP_X_FORWARDED_FOR')
+        self.assertEqual(audit._get_remote_addr(request), '10.0.0.1')
+
+    def test_models_are_logged_once_with_auditlogs_field_options(self):
+        self.assertIn('password', audit.default_auditlog.get_model_fields(User)['exclude_fields'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.email = 'once@example.com'
+            self.user.password = 'changed'
+            self.user.save()
+
+        entry = LogEntry.objects.get(object_pk=str(self.user.pk))
+        self.assertEqual(entry.action, LogEntry.Action.UPDATE)
+        self.assertEqual(set(entry.changes_dict), {'email'})
+        self.assertFalse(auditlog_disabled.get())
+        with disable_auditlog(), self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(LogEntry.objects.count(), 1)
+        with self.assertRaises(AuditLogRegistrationError):
+            audit.auditlog.register(User, serialize_data=True)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.users.admin import UserAdminForm
+from apps.users.models import User
+from apps.users.services import UserService
+
+
+class DirtyFieldsTest(TestCase):
+
+    def setUp(self):
+        User.objects.create_user(username='tracked', email='tracked@example.com', password='Testpass123!')
+        self.user = User.objects.get(username='tracked')
+
+    def test_loaded_instance_is_clean(self):
+        self.assertEqual(self.user.get_dirty_fields(), [])
+
+    def test_unchanged_save_skips_the_write(self):
+        with self.assertNumQueries(0):
+            self.user.save()
+
+    def test_forced_save_of_unchanged_instance_touches_updated_at(self):
+        updated_at = self.user.updated_at
+        listener = mock.Mock()
+        post_save.connect(listener, sender=User)
+        self.addCleanup(post_save.disconnect, listener, sender=User)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save(force=True)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "users_user"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"email"', updates[0])
+        self.assertGreater(User.objects.get(pk=self.user.pk).updated_at, updated_at)
+        self.assertEqual(listener.call_args.kwargs['update_fields'], {'updated_at'})
+
+    def test_save_writes_only_changed_columns(self):
+        self.user.email = 'changed@example.com'
+        self.assertEqual(self.user.get_dirty_fields(), ['email'])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.user.save()
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "users_user"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"email"', updates[0])
+        self.assertNotIn('"password"', updates[0])
+        self.assertNotIn('"username"', updates[0])
+        self.assertEqual(self.user.get_dirty_fields(), [])
+        self.assertEqual(User.objects.get(pk=self.user.pk).email, 'changed@example.com')
+
+    def test_service_update_with_same_values_does_not_write(self):
+        service = UserService()
+        with CaptureQueriesContext(connection) as queries:
+            service.update(self.user.pk, {'email': 'tracked@example.com'})
+
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+    def test_admin_form_keeps_password_hash_when_not_edited(self):
+        password = self.user.password
+        form = UserAdminForm(
+            data={'username': 'tracked', 'email': 'tracked@example.com', 'password': password, 'role': 'editor'},
+            instance=self.user,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.role, 'editor')
+        self.assertEqual(user.password, password)
+        self.assertTrue(user.check_password('Testpass123!'))
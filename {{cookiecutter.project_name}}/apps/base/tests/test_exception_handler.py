@@ -0,0 +1,111 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import Http404
+from django.test import SimpleTestCase, override_settings
+from rest_framework import exceptions, status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base import exception_handler
+from apps.base.exception_handler import custom_exception_handler, error_metrics, get_error_handler, register_error
+from apps.base.exceptions import NotFoundError
+from apps.users.models import User
+
+CONTEXT = {'view': None, 'request': None}
+
+
+class ExceptionHandlerTest(SimpleTestCase):
+
+    def test_flood_errors_get_prerendered_bodies(self):
+        for exc, code, message in (
+            (Http404(), 404, 'Data not found'),
+            (exceptions.NotAuthenticated(), 401, 'Authentication credentials were not provided.'),
+            (exceptions.AuthenticationFailed(), 401, 'Incorrect authentication credentials.'),
+            (exceptions.Throttled(wait=12.5), 429, 'Request was throttled.'),
+        ):
+            response = custom_exception_handler(exc, CONTEXT)
+
+            self.assertEqual(response.status_code, code)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertEqual(json.loads(response.content)['message'], message)
+        self.assertEqual(response['Retry-After'], '13')
+
+    def test_specific_details_are_rendered(self):
+        response = custom_exception_handler(exceptions.AuthenticationFailed('Token expired'), CONTEXT)
+        self.assertEqual(response.data['message'], 'Token expired')
+
+        response = custom_exception_handler(exceptions.ValidationError({'email': ['invalid']}), CONTEXT)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], {'email': ['invalid']})
+
+        response = custom_exception_handler(NotFoundError(), CONTEXT)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], NotFoundError().message)
+
+    def test_handlers_resolve_through_the_mro(self):
+        class GoneError(NotFoundError):
+            pass
+
+        self.assertIs(get_error_handler(GoneError), get_error_handler(NotFoundError))
+        self.assertIsNone(get_error_handler(KeyError))
+
+        handlers, resolved = dict(exception_handler._handlers), dict(exception_handler._resolved)
+        self.addCleanup(exception_handler._handlers.update, handlers)
+        self.addCleanup(exception_handler._resolved.update, resolved)
+        gone = register_error(GoneError)(lambda exc: exception_handler.static_response(404))
+        self.assertIs(get_error_handler(GoneError), gone)
+        exception_handler._handlers.pop(GoneError)
+        exception_handler._resolved.clear()
+
+    def test_unexpected_errors_are_a_generic_500(self):
+        with self.assertLogs('apps.base.exception_handler', 'ERROR'):
+            response = custom_exception_handler(KeyError('secret'), CONTEXT)
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertNotIn(b'secret', response.content)
+        with override_settings(DEBUG=True):
+            self.assertIsNone(custom_exception_handler(KeyError('secret'), CONTEXT))
+
+    def test_metrics_count_a_sample_of_the_errors(self):
+        error_metrics.reset()
+        self.addCleanup(error_metrics.reset)
+        with override_settings(ERROR_METRICS_SAMPLE_RATE=1):
+            for _ in range(3):
+                custom_exception_handler(Http404(), CONTEXT)
+        with override_settings(ERROR_METRICS_SAMPLE_RATE=0):
+            custom_exception_handler(Http404(), CONTEXT)
+        self.assertEqual(error_metrics._counts, {(404, 'Http404'): 3})
+
+        with override_settings(ERROR_METRICS_SAMPLE_RATE=0.5):
+            self.assertEqual(error_metrics.snapshot(), {(404, 'Http404'): 6})
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_errors', iterations=50, stdout=out)
+
+        self.assertIn('404 not found', out.getvalue())
+        self.assertRegex(out.getvalue(), r'\d+\.\dx')
+
+
+class ExceptionHandlerViewTest(APITestCase):
+
+    def test_anonymous_request_gets_www_authenticate(self):
+        resp = self.client.get(reverse('api:users:user-get-me'))
+
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', resp['WWW-Authenticate'])
+        self.assertEqual(resp.json(), {'message': 'Authentication credentials were not provided.', 'meta': {}})
+
+    def test_unexpected_errors_roll_back_atomic_requests(self):
+        with mock.patch.dict(connection.settings_dict, {'ATOMIC_REQUESTS': True}), transaction.atomic():
+            User.objects.create_user(username='rolled-back', email='rolled-back@example.com', password='Testpass123!')
+            with self.assertLogs('apps.base.exception_handler', 'ERROR'):
+                response = custom_exception_handler(KeyError('boom'), CONTEXT)
+            self.assertTrue(transaction.get_rollback())
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertFalse(User.objects.filter(username='rolled-back').exists())
@@ -0,0 +1,147 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.files import FileUploadView, FileView, StorageUploadHandler, parse_range
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+
+CONTENT = bytes(range(256)) * 1024
+
+
+@override_settings(FILES_CHUNK_SIZE=4096, FILES_ACCEL_REDIRECT_PREFIX='', FILES_USER_ACCESS=True)
+class FileServingTest(APITestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = FileSystemStorage(location=self.directory.name)
+        for view in (FileView, FileUploadView):
+            patcher = mock.patch.object(view, 'storage', self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='reader', email='reader@example.com', password='Testpass123!')
+        self.name = self.storage.save(f'uploads/{self.user.pk}/docs/data.bin', ContentFile(CONTENT))
+        self.url = reverse('api:file', args=[self.name])
+        TestHelper.authenticate_client(self.client, self.user)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_streams_the_whole_file(self):
+        resp = self.client.get(self.url)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(resp['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(resp.streaming_content), CONTENT)
+
+    def test_serves_byte_ranges(self):
+        for header, start, end in (('bytes=10-19', 10, 19), ('bytes=-5', len(CONTENT) - 5, len(CONTENT) - 1),
+                                   ('bytes=262100-', 262100, len(CONTENT) - 1)):
+            resp = self.client.get(self.url, HTTP_RANGE=header)
+
+            self.assertEqual(resp.status_code, status.HTTP_206_PARTIAL_CONTENT)
+            self.assertEqual(resp['Content-Range'], f'bytes {start}-{end}/{len(CONTENT)}')
+            self.assertEqual(b''.join(resp.streaming_content), CONTENT[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        resp = self.client.get(self.url, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+
+        self.assertEqual(resp.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(resp['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_parse_range_ignores_malformed_headers(self):
+        self.assertIsNone(parse_range(None, 10))
+        self.assertIsNone(parse_range('bytes=1-2,4-5', 10))
+        self.assertIsNone(parse_range('items=1-2', 10))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 9))
+
+    @override_settings(FILES_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_hands_local_files_to_nginx(self):
+        resp = self.client.get(self.url)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp['X-Accel-Redirect'], f'/protected-media/uploads/{self.user.pk}/docs/data.bin')
+        self.assertEqual(resp.content, b'')
+
+    def test_missing_file_and_anonymous_access(self):
+        missing = reverse('api:file', args=[f'uploads/{self.user.pk}/nope.bin'])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_upload_is_written_to_storage_while_the_body_is_read(self):
+        chunks = []
+        receive = StorageUploadHandler.receive_data_chunk
+
+        def spy(handler, raw_data, start):
+            chunks.append(len(raw_data))
+            return receive(handler, raw_data, start)
+
+        with mock.patch.object(StorageUploadHandler, 'receive_data_chunk', spy):
+            resp = self.client.post(
+                reverse('api:files'), {'file': SimpleUploadedFile('report 1.bin', CONTENT)}, format='multipart'
+            )
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+        stored = resp.data['data']['files'][0]
+        self.assertTrue(stored['name'].startswith(f'uploads/{self.user.pk}/'))
+        self.assertTrue(stored['name'].endswith('/report_1.bin'))
+        self.assertEqual(stored['size'], len(CONTENT))
+        self.assertGreater(len(chunks), 1)
+        with self.storage.open(stored['name']) as file:
+            self.assertEqual(file.read(), CONTENT)
+
+    def test_upload_requires_a_file(self):
+        resp = self.client.post(reverse('api:files'), {}, format='multipart')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_users_only_read_their_own_uploads(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='Testpass123!')
+        TestHelper.authenticate_client(self.client, other)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        TestHelper.authenticate_client(self.client, admin)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+    def test_names_outside_the_upload_directory_are_not_served(self):
+        attachment = self.storage.save('attachments/abc/data.bin', ContentFile(CONTENT))
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        TestHelper.authenticate_client(self.client, admin)
+        for name in (attachment, f'uploads/{self.user.pk}/../../{attachment}', f'uploads/{self.user.pk}'):
+            with self.subTest(name=name):
+                resp = self.client.get(reverse('api:file', args=[name]))
+                self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(FILES_USER_ACCESS=False)
+    def test_files_are_admin_only_by_default(self):
+        resp = self.client.post(
+            reverse('api:files'), {'file': SimpleUploadedFile('a.bin', b'data')}, format='multipart'
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(FILES_MAX_UPLOAD_SIZE=len(CONTENT) - 1)
+    def test_uploads_over_the_size_limit_are_rejected_and_removed(self):
+        resp = self.client.post(
+            reverse('api:files'), {'file': SimpleUploadedFile('big.bin', CONTENT)}, format='multipart'
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        stored = [name for _, _, names in os.walk(self.storage.path('uploads')) for name in names]
+        self.assertEqual(stored, ['data.bin'])
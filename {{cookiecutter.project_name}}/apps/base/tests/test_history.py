@@ -0,0 +1,118 @@
+import gzip
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+
+from auditlog.models import LogEntry
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.base import history
+from apps.base.db import _postgres_ddl
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+
+
+class PartitionNamingTest(TestCase):
+
+    def test_add_months_crosses_years(self):
+        self.assertEqual(history.add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(history.add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+        self.assertEqual(history.partition_name(date(2024, 3, 1)), 'auditlog_logentry_y2024m03')
+
+    def test_partitioning_ddl_is_registered_when_enabled(self):
+        statements = _postgres_ddl['auditlog']
+        self.addCleanup(lambda: _postgres_ddl.__setitem__('auditlog', statements))
+        _postgres_ddl['auditlog'] = list(statements)
+        with override_settings(AUDITLOG_PARTITIONED=True, AUDITLOG_PARTITIONS_AHEAD=2):
+            history.register_partitioning()
+        ddl = _postgres_ddl['auditlog'][-1]
+        self.assertIn('PARTITION BY RANGE (timestamp)', ddl)
+        self.assertIn("interval '2 months'", ddl)
+        self.assertFalse(history.is_partitioned())  # sqlite
+
+
+@skipUnless(connection.vendor == 'postgresql', 'partitioning is PostgreSQL only')
+class PartitioningTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='Testpass123!')
+        LogEntry.objects.all().delete()
+        self.this_month = timezone.now().date().replace(day=1)
+
+    def log_at(self, month: date) -> LogEntry:
+        entry = LogEntry.objects.log_create(self.admin, action=LogEntry.Action.UPDATE, changes={'a': [1, 2]})
+        LogEntry.objects.filter(pk=entry.pk).update(
+            timestamp=datetime(month.year, month.month, 15, tzinfo=dt_timezone.utc),
+        )
+        return entry
+
+    def count(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+            return cursor.fetchone()[0]
+
+    def test_convert_create_archive_and_drop(self):
+        old_month = history.add_months(self.this_month, -14)
+        old = self.log_at(old_month)
+
+        with connection.cursor() as cursor:
+            cursor.execute(history.PARTITION_BY_MONTH_SQL.format(
+                table=history.TABLE, default=history.DEFAULT_PARTITION, ahead=1,
+            ))
+        self.assertTrue(history.is_partitioned())
+        partitions = history.get_partitions()
+        self.assertEqual(list(partitions)[0], old_month)
+        self.assertEqual(list(partitions)[-1], history.add_months(self.this_month, 1))
+        self.assertEqual(self.count(partitions[old_month]), 1)
+
+        # the maintenance task did not run for months, the default partition took the entries
+        late_month = history.add_months(self.this_month, 3)
+        late = self.log_at(late_month)
+        self.assertEqual(self.count(history.DEFAULT_PARTITION), 1)
+        created = history.ensure_partitions(months_ahead=3)
+        self.assertEqual(created, [history.partition_name(history.add_months(self.this_month, n)) for n in (2, 3)])
+        self.assertEqual(self.count(history.DEFAULT_PARTITION), 0)
+        self.assertEqual(self.count(history.partition_name(late_month)), 1)
+        self.assertTrue(LogEntry.objects.filter(pk=late.pk).exists())
+        self.assertEqual(history.ensure_partitions(months_ahead=3), [])
+
+        with tempfile.TemporaryDirectory() as directory:
+            archived = history.archive_partitions(retention_months=12, directory=directory)
+            self.assertEqual([path.name for path in archived], [
+                f'{history.partition_name(history.add_months(self.this_month, n))}.csv.gz' for n in (-14, -13)
+            ])
+            with gzip.open(archived[0], 'rt') as file:
+                rows = file.read().splitlines()
+        self.assertEqual(len(rows), 2)  # header and the old entry
+        self.assertTrue(rows[1].startswith(f'{old.pk},'))
+        self.assertFalse(LogEntry.objects.filter(pk=old.pk).exists())
+        self.assertEqual(list(history.get_partitions())[0], history.add_months(self.this_month, -12))
+
+
+class RecentLogEntryAdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        LogEntry.objects.all().delete()
+        self.recent = LogEntry.objects.log_create(self.admin, action=LogEntry.Action.UPDATE, changes={'a': [1, 2]})
+        self.old = LogEntry.objects.log_create(self.admin, action=LogEntry.Action.UPDATE, changes={'a': [0, 1]})
+        self.old_timestamp = timezone.now() - timedelta(days=400)
+        LogEntry.objects.filter(pk=self.old.pk).update(timestamp=self.old_timestamp)
+        self.client.force_login(self.admin)
+
+    def test_changelist_lists_recent_entries_only(self):
+        url = reverse('admin:auditlog_logentry_changelist')
+        self.assertEqual(list(history.recent_entries()), [self.recent])
+        resp = self.client.get(url)
+        self.assertEqual([entry.pk for entry in resp.context['cl'].result_list], [self.recent.pk])
+        resp = self.client.get(url, {'timestamp__year': self.old_timestamp.year})
+        self.assertEqual([entry.pk for entry in resp.context['cl'].result_list], [self.old.pk])
+
+    def test_old_entries_stay_reachable(self):
+        resp = self.client.get(reverse('admin:auditlog_logentry_change', args=[self.old.pk]))
+        self.assertEqual(resp.status_code, 200)
@@ -0,0 +1,104 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from apps.base.idempotency import IdempotentRequest
+from apps.base.utils import TestHelper
+from apps.users.authentication import StatelessJWTAuthentication
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+from apps.users.views import UserViewSet
+
+PAYLOAD = {
+    'username': 'newuser',
+    'email': 'newuser@example.com',
+    'role': UserRoleEnum.VIEWER.value,
+    'password': 'Testpass123!',
+    'confirm_password': 'Testpass123!',
+}
+
+
+class IdempotencyTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.list_url = reverse('api:users:user-list')
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        TestHelper.authenticate_client(self.client, self.admin)
+
+    def create(self, key, payload=PAYLOAD):
+        return self.client.post(self.list_url, payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def claim(self, key):
+        """Takes the key as if another worker were running a request with it."""
+        request = APIRequestFactory().post(self.list_url, PAYLOAD, format='json')
+        force_authenticate(request, self.admin)
+        request.user = self.admin
+        claim = IdempotentRequest(request, key)
+        self.assertIsNone(claim.acquire())
+        return claim
+
+    def test_retry_is_replayed_without_running_again(self):
+        first = self.create('retry-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with mock.patch.object(UserViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            with self.assertNumQueries(0):
+                second = self.create('retry-1')
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(User.objects.filter(username='newuser').count(), 1)
+
+    def test_keys_are_scoped_to_the_user_and_payload(self):
+        self.create('shared')
+        resp = self.create('shared', {**PAYLOAD, 'username': 'someone', 'email': 'someone@example.com'})
+        self.assertEqual(resp.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        other = User.objects.create_user(
+            username='other', email='other@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        TestHelper.authenticate_client(self.client, other)
+        resp = self.create('shared')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)  # ran, and the username is taken
+        self.assertFalse(resp.has_header('Idempotent-Replayed'))
+
+    def test_without_a_key_requests_run_every_time(self):
+        self.assertEqual(self.client.post(self.list_url, PAYLOAD, format='json').status_code, 201)
+        self.assertEqual(self.client.post(self.list_url, PAYLOAD, format='json').status_code, 400)
+
+    def test_concurrent_duplicate_waits_for_the_first_response(self):
+        claim = self.claim('in-flight')
+        timer = threading.Timer(0.2, claim.complete, [JsonResponse({'done': True}, status=201)])
+        timer.start()
+
+        resp = self.create('in-flight')
+
+        timer.join()
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.json(), {'done': True})
+        self.assertFalse(User.objects.filter(username='newuser').exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT=0.2)
+    def test_duplicate_gives_up_when_the_first_does_not_finish(self):
+        self.claim('stuck')
+
+        self.assertEqual(self.create('stuck').status_code, status.HTTP_409_CONFLICT)
+
+    def test_server_errors_are_not_stored(self):
+        with mock.patch('apps.users.services.UserService.create', side_effect=RuntimeError), \
+                self.assertLogs('apps.base.exception_handler', 'ERROR'):
+            self.assertEqual(self.create('flaky').status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        resp = self.create('flaky')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(resp.has_header('Idempotent-Replayed'))
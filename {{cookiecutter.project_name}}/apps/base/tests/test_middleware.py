@@ -0,0 +1,70 @@
+from io import StringIO
+from unittest import mock
+
+from corsheaders.middleware import CorsMiddleware
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+
+PREFLIGHT = {
+    'HTTP_ORIGIN': 'https://app.example.com',
+    'HTTP_ACCESS_CONTROL_REQUEST_METHOD': 'POST',
+    'HTTP_ACCESS_CONTROL_REQUEST_HEADERS': 'authorization,content-type',
+}
+
+
+@override_settings(API_PATH_PREFIXES=['/api/'])
+class MiddlewareTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.list_url = reverse('api:users:user-list')
+
+    def test_api_requests_skip_web_middleware(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        resp = self.client.get(reverse('api:users:user-detail', args=[self.admin.pk]))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(resp.has_header('X-Frame-Options'))
+        self.assertFalse(hasattr(resp.wsgi_request, 'session'))
+        self.assertEqual(resp.wsgi_request.user, self.admin)  # set by DRF
+
+    def test_web_requests_keep_web_middleware(self):
+        resp = self.client.get('/admin/login/')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', resp.cookies)
+        self.assertTrue(hasattr(resp.wsgi_request, 'session'))
+
+    def test_preflight_is_answered_from_cache(self):
+        add_headers = mock.patch.object(
+            CorsMiddleware, 'add_response_headers', autospec=True, side_effect=CorsMiddleware.add_response_headers
+        )
+        with add_headers as add_headers, mock.patch('apps.users.views.UserViewSet.dispatch') as dispatch:
+            first = self.client.options(self.list_url, **PREFLIGHT)
+            second = self.client.options(self.list_url, **PREFLIGHT)
+        dispatch.assert_not_called()
+        self.assertEqual(add_headers.call_count, 1)
+        for resp in (first, second):
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertEqual(resp['Access-Control-Allow-Origin'], 'https://app.example.com')
+            self.assertIn('authorization', resp['Access-Control-Allow-Headers'])
+
+    def test_options_without_preflight_reaches_view(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        resp = self.client.options(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn('GET', resp['Allow'])
+
+    def test_middleware_timing_command(self):
+        out = StringIO()
+        call_command('middleware_timing', iterations=3, stdout=out)
+        self.assertIn('api preflight:', out.getvalue())
+        self.assertIn('apps.base.middleware.PreflightMiddleware', out.getvalue())
@@ -0,0 +1,55 @@
+import gc
+import os
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import get_resolver
+
+from apps.base import preload, registry
+from apps.base.management.commands.preload_memory import SMAPS_ROLLUP
+from apps.users.services import UserService
+
+
+class PreloadTest(SimpleTestCase):
+
+    @override_settings(PRELOAD_APP=False)
+    def test_does_nothing_unless_enabled(self):
+        with mock.patch.object(preload, 'warm_up') as warm_up, mock.patch.object(gc, 'freeze') as freeze:
+            preload.preload()
+
+        warm_up.assert_not_called()
+        freeze.assert_not_called()
+
+    @override_settings(PRELOAD_APP=True)
+    def test_warms_up_then_freezes(self):
+        calls = []
+        with mock.patch.object(preload, 'warm_up', side_effect=lambda: calls.append('warm_up')), \
+                mock.patch.object(gc, 'freeze', side_effect=lambda: calls.append('freeze')):
+            preload.preload()
+
+        self.assertEqual(calls, ['warm_up', 'freeze'])
+
+    def test_warm_urls_populates_resolvers(self):
+        patterns = preload.warm_urls()
+
+        self.assertTrue(get_resolver()._populated)
+        self.assertIn('user-list', {pattern.name for pattern in patterns})
+
+    def test_warm_services_builds_the_shared_services(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        preload.warm_services(preload.warm_urls())
+
+        self.assertIn(UserService, registry._instances)
+
+    @skipUnless(os.path.exists(SMAPS_ROLLUP), 'needs /proc smaps_rollup')
+    def test_benchmark_reports_both_scenarios(self):
+        out = StringIO()
+        call_command('preload_memory', workers=2, stdout=out)
+
+        report = out.getvalue()
+        self.assertRegex(report, r'cold +\d+')
+        self.assertRegex(report, r'preload +\d+')
+        self.assertRegex(report, r'preload saves -?\d+ kB')
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base import registry
+from apps.base.repositories import QuerySpec
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+from apps.users.repositories import UserRepository
+from apps.users.services import UserService
+
+
+class RegistryTest(SimpleTestCase):
+
+    def setUp(self):
+        self.addCleanup(registry.reset)
+        registry.reset()
+
+    def test_resolve_builds_one_instance(self):
+        service = registry.resolve(UserService)
+        self.assertIs(registry.resolve(UserService), service)
+        self.assertIs(service._repository, registry.resolve(UserRepository))
+
+    def test_provide_and_override(self):
+        class AuditedUserService(UserService):
+            pass
+
+        self.addCleanup(registry._factories.pop, UserService, None)
+        registry.provide(UserService, AuditedUserService)
+        self.assertIsInstance(registry.resolve(UserService), AuditedUserService)
+        stub = mock.Mock(spec=UserService)
+        with registry.override(UserService, stub):
+            self.assertIs(registry.resolve(UserService), stub)
+        self.assertIsInstance(registry.resolve(UserService), AuditedUserService)
+
+
+class StatelessServiceTest(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', role=UserRoleEnum.VIEWER.value, password='Testpass123!'
+        )
+        self.service = registry.resolve(UserService)
+
+    def test_specs_do_not_leak_between_calls(self):
+        admins = self.service.get_all(QuerySpec(filters={'role': UserRoleEnum.ADMIN.value}))
+        everyone = self.service.get_all()
+        self.assertEqual([user.pk for user in admins], [self.admin.pk])
+        self.assertEqual(everyone.count(), 2)
+
+    def test_projection_and_ordering(self):
+        users = list(self.service.get_all(QuerySpec(only=('id', 'username'), order_by=('-username',))))
+        self.assertEqual([user.username for user in users], ['viewer', 'admin'])
+        self.assertIn('email', users[0].get_deferred_fields())
+
+    def test_requests_reuse_the_service(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        with mock.patch.object(UserService, '__init__') as init:
+            resp = self.client.get(reverse('api:users:user-list'), {'role': UserRoleEnum.VIEWER.value})
+            self.client.get(reverse('api:users:user-list'))
+        init.assert_not_called()
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['username'] for user in resp.data['data']['users']], ['viewer'])
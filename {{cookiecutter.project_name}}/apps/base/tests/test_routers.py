@@ -0,0 +1,154 @@
+import importlib
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import SimpleTestCase, override_settings
+from django.urls import URLResolver, clear_url_caches, include, path, re_path, resolve
+from django.urls.exceptions import Resolver404
+from django.urls.resolvers import RegexPattern
+from rest_framework.viewsets import ViewSetMixin
+
+from apps.base.management.commands.benchmark_urls import make_viewset
+from apps.base.routers import FlatRouter, RouteTable
+from apps.users.views import UserViewSet
+
+
+def view(request, *args, **kwargs):
+    return HttpResponse()
+
+
+def other_view(request, *args, **kwargs):
+    return HttpResponse()
+
+
+def resolvers(urlpatterns):
+    """The same URLconf resolved by Django's resolver and by a RouteTable."""
+    nested = URLResolver(RegexPattern(r'^/'), [path('api/', include((urlpatterns, 'api')))])
+    flat = URLResolver(RegexPattern(r'^/'), [RouteTable.wrap(path('api/', include((urlpatterns, 'api'))))])
+    return nested, flat
+
+
+class RouteTableTest(SimpleTestCase):
+
+    def setUp(self):
+        router = FlatRouter('always')
+        router.register(r'', UserViewSet, basename='user')
+        self.nested, self.flat = resolvers([
+            path('users/', include((router.urls, 'users'))),
+            path('users/login', view, name='login'),
+            path('files/<path:name>', view, name='file'),
+            path('items/<int:pk>/', view, {'extra': True}, name='item'),
+            re_path(r'^legacy/(?P<year>[0-9]{4})/$', view, name='legacy'),
+        ])
+
+    def assertSameMatch(self, url):
+        expected, match = self.nested.resolve(url), self.flat.resolve(url)
+        self.assertEqual(
+            (match.func, match.args, match.kwargs, match.url_name, match.namespaces, match.route),
+            (expected.func, expected.args, expected.kwargs, expected.url_name, expected.namespaces, expected.route),
+        )
+        self.assertEqual(match.view_name, expected.view_name)
+
+    def test_resolves_like_django(self):
+        for url in [
+            '/api/users/', '/api/users/me/', '/api/users/search/', '/api/users/7/', '/api/users/login',
+            '/api/files/a/b.txt', '/api/items/3/', '/api/legacy/2024/',
+        ]:
+            with self.subTest(url=url):
+                self.assertSameMatch(url)
+        self.assertEqual(self.flat.resolve('/api/items/3/').kwargs, {'pk': 3, 'extra': True})
+
+    def test_unknown_paths_are_not_found(self):
+        for url in ['/api/users', '/api/items/x/', '/api/legacy/24/', '/api/nothing/', '/other/']:
+            with self.subTest(url=url), self.assertRaises(Resolver404):
+                self.flat.resolve(url)
+
+    def test_first_matching_route_wins(self):
+        nested, flat = resolvers([
+            path('things/<str:slug>/', view, name='thing'),
+            path('things/new/', other_view, name='new-thing'),
+            path('static/', other_view, name='static'),
+        ])
+        self.assertEqual(flat.resolve('/api/things/new/').url_name, 'thing')
+        self.assertEqual(flat.resolve('/api/static/').url_name, 'static')
+        self.assertEqual(nested.resolve('/api/things/new/').url_name, 'thing')
+
+
+class FlatRouterTest(SimpleTestCase):
+
+    def routes(self, policy, prefix=r'items'):
+        router = FlatRouter(policy)
+        router.register(prefix, make_viewset('ItemViewSet'), basename='item')
+        return {pattern.name: pattern.pattern.regex.pattern for pattern in router.urls}
+
+    def test_trailing_slash_policies(self):
+        self.assertEqual(self.routes('always')['item-export'], '^items/export/$')
+        self.assertEqual(self.routes('never')['item-export'], '^items/export$')
+        self.assertEqual(self.routes('optional')['item-export'], '^items/export/?$')
+
+    def test_empty_prefix(self):
+        for policy in ('always', 'never', 'optional'):
+            with self.subTest(policy=policy):
+                routes = self.routes(policy, prefix=r'')
+                self.assertEqual(routes['item-list'], '^$')
+                self.assertEqual(routes['item-export'], '^export' + FlatRouter(policy).trailing_slash + '$')
+
+    def test_extra_actions_match_drf(self):
+        viewset = make_viewset('ItemViewSet')
+        overridden = type('OverriddenViewSet', (viewset,), {'export': lambda self, request: None})
+        for cls in (UserViewSet, viewset, overridden):
+            with self.subTest(viewset=cls.__name__):
+                self.assertEqual(cls.get_extra_actions(), ViewSetMixin.get_extra_actions.__func__(cls))
+        self.assertEqual([action.__name__ for action in overridden.get_extra_actions()], ['history'])
+
+    def test_no_root_view_or_format_suffixes(self):
+        self.assertEqual(set(self.routes('always')), {'item-list', 'item-export', 'item-detail', 'item-history'})
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_urls', viewsets=[3], iterations=50, stdout=out)
+        self.assertIn('speedup', out.getvalue())
+
+
+class ApiTrailingSlashTest(SimpleTestCase):
+    """The project's API URLconf, rebuilt for each API_TRAILING_SLASH policy."""
+
+    def reload_urlconf(self):
+        for module in ('apps.users.urls', 'apps.base.urls', 'apps.api.urls', settings.ROOT_URLCONF):
+            if module in sys.modules:
+                importlib.reload(sys.modules[module])
+        clear_url_caches()
+
+    def assertRoutes(self, policy, found, missing):
+        with override_settings(API_TRAILING_SLASH=policy):
+            self.addCleanup(self.reload_urlconf)
+            self.reload_urlconf()
+            for url, view_name in found.items():
+                with self.subTest(policy=policy, url=url):
+                    self.assertEqual(resolve(url).view_name, view_name)
+            for url in missing:
+                with self.subTest(policy=policy, url=url), self.assertRaises(Resolver404):
+                    resolve(url)
+
+    def test_always(self):
+        self.assertRoutes('always', {
+            '/api/users/': 'api:users:user-list', '/api/users/5/': 'api:users:user-detail',
+            '/api/users/me/': 'api:users:user-get-me', '/api/users/login': 'api:users:login',
+        }, ['/api/users', '/api/users/5'])
+
+    def test_never(self):
+        # the collection is the path of the users include
+        self.assertRoutes('never', {
+            '/api/users/': 'api:users:user-list', '/api/users/5': 'api:users:user-detail',
+            '/api/users/me': 'api:users:user-get-me', '/api/users/login': 'api:users:login',
+        }, ['/api/users/5/', '/api/users/me/'])
+
+    def test_optional(self):
+        self.assertRoutes('optional', {
+            '/api/users/': 'api:users:user-list',
+            '/api/users/5': 'api:users:user-detail', '/api/users/5/': 'api:users:user-detail',
+            '/api/users/me': 'api:users:user-get-me', '/api/users/login': 'api:users:login',
+        }, ['/api/users//'])
@@ -0,0 +1,71 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.base import schema
+
+
+class CachedSchemaTest(APITestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        override = override_settings(DEBUG=False, SCHEMA_CACHE_DIR=self.cache_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        schema._schemas.clear()
+        self.addCleanup(schema._schemas.clear)
+
+    def test_schema_is_generated_once_and_revalidated_with_etag(self):
+        with mock.patch.object(schema, 'generate_schema', wraps=schema.generate_schema) as generate:
+            first = self.client.get('/schema/')
+            second = self.client.get('/schema/')
+            not_modified = self.client.get('/schema/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertIn(b'/api/users/', first.content)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b'')
+        title = schema.spectacular_settings.TITLE
+        self.assertEqual(first['Content-Disposition'], f'inline; filename="{title}.yaml"')
+
+    def test_language_specific_schemas_are_generated_per_request(self):
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            resp = self.client.get('/schema/', {'lang': 'en'})
+
+        generate.assert_not_called()
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', resp)
+        self.assertIn(b'/api/users/', resp.content)
+
+    def test_formats_are_cached_separately(self):
+        yaml = self.client.get('/schema/')
+        json = self.client.get('/schema/', {'format': 'json'})
+
+        self.assertNotEqual(yaml['ETag'], json['ETag'])
+        self.assertEqual(json.json()['info']['version'], schema.spectacular_settings.VERSION)
+
+    def test_precomputed_files_are_served_without_generating(self):
+        paths = schema.precompute_schemas()
+        schema._schemas.clear()
+
+        self.assertTrue(all(Path(path).exists() for path in paths))
+        with mock.patch.object(schema, 'generate_schema') as generate:
+            resp = self.client.get('/schema/', {'format': 'json'})
+
+        generate.assert_not_called()
+        self.assertEqual(resp.content, Path(paths[1]).read_bytes())
+
+    def test_version_follows_code_version(self):
+        version = schema.get_schema_version()
+        schema.get_schema_version.cache_clear()
+        self.addCleanup(schema.get_schema_version.cache_clear)
+
+        with override_settings(CODE_VERSION='another-release'):
+            self.assertNotEqual(schema.get_schema_version(), version)
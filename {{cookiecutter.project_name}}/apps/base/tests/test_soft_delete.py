@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.base.models import Tenant
+from apps.base.repositories import BaseRepository
+from apps.base.serializers import BaseModelSerializer
+from apps.base.services import BaseService
+from apps.base.signals import entity_changed
+from apps.users.models import User
+from apps.users.services import UserService
+
+
+class TenantSerializer(BaseModelSerializer):
+
+    class Meta:
+        model = Tenant
+        fields = ['id', 'name', 'slug']
+
+
+class TenantRepository(BaseRepository):
+
+    def _get_model(self):
+        return Tenant
+
+    def _get_serializer(self):
+        return TenantSerializer
+
+
+class TenantService(BaseService):
+
+    def _get_repository(self):
+        return TenantRepository()
+
+
+class SoftDeleteTest(TestCase):
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='Testpass123!')
+            for i in range(3)
+        ]
+
+    def test_queryset_soft_delete_is_a_single_update(self):
+        ids = [user.id for user in self.users[:2]]
+        with self.assertNumQueries(1):
+            deleted = User.objects.soft_delete(ids)
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(list(User.objects.values_list('id', flat=True)), [self.users[2].id])
+        self.assertEqual(User.objects.with_deleted().count(), 3)
+
+    def test_instance_soft_delete_only_writes_deleted_at(self):
+        user = self.users[0]
+        User.objects.filter(pk=user.pk).update(email='changed@example.com')
+
+        user.soft_delete()
+
+        user = User.objects.with_deleted().get(pk=user.pk)
+        self.assertTrue(user.is_deleted)
+        self.assertEqual(user.email, 'changed@example.com')
+
+    def test_service_delete_of_unknown_id_raises_not_found(self):
+        from apps.base.exceptions import NotFoundError
+
+        with self.assertRaises(NotFoundError):
+            UserService().delete(0)
+
+    def test_purge_command_hard_deletes_old_rows_only(self):
+        old, recent, alive = self.users
+        User.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+        User.objects.filter(pk=recent.pk).update(deleted_at=timezone.now() - timedelta(days=1))
+
+        out = StringIO()
+        call_command('purge_soft_deleted', days=30, batch_size=1, model=['users.User'], stdout=out)
+
+        self.assertEqual(
+            set(User.objects.with_deleted().values_list('id', flat=True)), {recent.id, alive.id}
+        )
+        self.assertIn('users.User: 1 rows purged', out.getvalue())
+
+    def test_purge_does_not_depend_on_the_default_manager(self):
+        tenant = Tenant.objects.create(name='Old', slug='old', deleted_at=timezone.now() - timedelta(days=40))
+
+        with mock.patch.object(Tenant, 'objects', None):
+            call_command('purge_soft_deleted', days=30, model=['base.Tenant'], stdout=StringIO())
+
+        self.assertFalse(Tenant._base_manager.filter(pk=tenant.pk).exists())
+
+    def test_service_delete_without_listeners_is_a_single_update(self):
+        tenant = Tenant.objects.create(name='Acme', slug='acme')
+        receiver = mock.Mock()
+        entity_changed.connect(receiver, sender=Tenant)
+        self.addCleanup(entity_changed.disconnect, receiver, sender=Tenant)
+
+        with self.assertNumQueries(1):
+            TenantService().delete(tenant.pk)
+
+        self.assertTrue(Tenant.objects.with_deleted().get(pk=tenant.pk).is_deleted)
+        self.assertIsNone(receiver.call_args.kwargs['instance'])
+
+    def test_service_delete_loads_the_instance_for_save_listeners(self):
+        tenant = Tenant.objects.create(name='Acme', slug='acme')
+        listener = mock.Mock()
+        post_save.connect(listener, sender=Tenant)
+        self.addCleanup(post_save.disconnect, listener, sender=Tenant)
+
+        TenantService().delete(tenant.pk)
+
+        self.assertEqual(listener.call_args.kwargs['instance'].pk, tenant.pk)
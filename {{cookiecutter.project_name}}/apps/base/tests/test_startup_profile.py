@@ -0,0 +1,26 @@
+import os
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from apps.base.management.commands.startup_profile import profile_imports
+
+
+class StartupProfileTest(SimpleTestCase):
+
+    def test_booting_does_not_import_schema_tooling_or_test_clients(self):
+        modules = {module for module, *_ in profile_imports(os.environ['DJANGO_SETTINGS_MODULE'])}
+
+        self.assertIn('apps.users.views', modules)
+        lazy = ('drf_spectacular.views', 'drf_spectacular.openapi', 'rest_framework.test', 'apps.base.utils')
+        self.assertEqual([module for module in lazy if module in modules], [])
+
+    def test_command_reports_packages_and_slowest_modules(self):
+        out = StringIO()
+        call_command('startup_profile', limit=5, stdout=out)
+
+        report = out.getvalue()
+        self.assertRegex(report, r'^\d+ modules imported in [\d.]+ ms')
+        self.assertIn('django', report)
+        self.assertIn('cumulative ms', report)
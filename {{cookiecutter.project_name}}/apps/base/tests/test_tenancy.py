@@ -0,0 +1,93 @@
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.db import _postgres_ddl
+from apps.base.models import Tenant
+from apps.base.tenancy import get_current_tenant_id, partition_by_tenant, tenant_context
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+
+
+def create_user(username, tenant=None, role=UserRoleEnum.VIEWER.value):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', role=role, password='Testpass123!', tenant=tenant
+    )
+
+
+class TenantManagerTest(TestCase):
+
+    def setUp(self):
+        self.acme = Tenant.objects.create(name='Acme', slug='acme')
+        self.globex = Tenant.objects.create(name='Globex', slug='globex')
+        self.alice, self.bob = create_user('alice', self.acme), create_user('bob', self.globex)
+
+    def test_queries_are_scoped_to_the_current_tenant(self):
+        self.assertEqual(User.objects.count(), 2)
+        with tenant_context(self.acme.pk):
+            self.assertEqual(list(User.objects.all()), [self.alice])
+            self.assertIsNone(User.objects.filter(pk=self.bob.pk).first())
+            self.assertEqual(User.objects.all_tenants().count(), 2)
+            self.assertEqual(list(User.objects.for_tenant(self.globex.pk)), [self.bob])
+        self.assertIsNone(get_current_tenant_id())
+
+    def test_scope_composes_with_soft_delete(self):
+        self.alice.soft_delete()
+        with tenant_context(self.acme.pk):
+            self.assertFalse(User.objects.exists())
+            self.assertEqual(list(User.objects.with_deleted()), [self.alice])
+
+    def test_new_rows_get_the_current_tenant(self):
+        with tenant_context(self.globex.pk):
+            carol = create_user('carol')
+        self.assertEqual(carol.tenant_id, self.globex.pk)
+
+    def test_partition_ddl_is_registered_for_postgres(self):
+        statements = _postgres_ddl['users']
+        self.addCleanup(lambda: _postgres_ddl.__setitem__('users', statements))
+        _postgres_ddl['users'] = list(statements)
+        partition_by_tenant(User, partitions=4)
+        ddl = _postgres_ddl['users'][-1]
+        self.assertIn('PARTITION BY HASH (tenant_id)', ddl)
+        self.assertIn('MODULUS 4', ddl)
+        self.assertIn('ADD PRIMARY KEY (id, tenant_id)', ddl)
+
+
+class TenantRequestTest(APITestCase):
+
+    def setUp(self):
+        self.acme = Tenant.objects.create(name='Acme', slug='acme')
+        self.globex = Tenant.objects.create(name='Globex', slug='globex')
+        self.admin = create_user('admin', self.acme, UserRoleEnum.ADMIN.value)
+        self.colleague, self.outsider = create_user('colleague', self.acme), create_user('outsider', self.globex)
+
+    def test_api_requests_only_see_their_tenant(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        resp = self.client.get(reverse('api:users:user-list'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual({user['username'] for user in resp.data['data']['users']}, {'admin', 'colleague'})
+        resp = self.client.get(reverse('api:users:user-detail', args=[self.outsider.pk]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(get_current_tenant_id())  # reset by TenantMiddleware
+
+    def test_created_users_join_the_tenant(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        resp = self.client.post(reverse('api:users:user-list'), {
+            'username': 'newcomer', 'email': 'newcomer@example.com',
+            'password': 'Testpass123!', 'confirm_password': 'Testpass123!',
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(User.objects.get(username='newcomer').tenant_id, self.acme.pk)
+
+    def test_search_only_matches_the_tenant(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        resp = self.client.get(reverse('api:users:user-search'), {'q': 'example.com'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual({user['username'] for user in resp.data['data']['users']}, {'admin', 'colleague'})
+
+    def test_users_without_tenant_see_every_tenant(self):
+        TestHelper.authenticate_client(self.client, create_user('operator', role=UserRoleEnum.ADMIN.value))
+        resp = self.client.get(reverse('api:users:user-list'))
+        self.assertEqual(len(resp.data['data']['users']), 4)
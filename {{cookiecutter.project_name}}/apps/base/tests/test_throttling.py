@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from apps.base.throttling import LocalWindowStore, SlidingWindowThrottle, get_store
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+from apps.users.views import UserViewSet
+
+
+def rates(**rates):
+    return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates})
+
+
+class ThrottleTest(APITestCase):
+
+    def setUp(self):
+        get_store.cache_clear()
+        self.addCleanup(get_store.cache_clear)
+        patcher = mock.patch.object(UserViewSet, 'throttle_classes', [SlidingWindowThrottle])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.list_url = reverse('api:users:user-list')
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.detail_url = reverse('api:users:user-detail', args=[self.admin.pk])
+        TestHelper.authenticate_client(self.client, self.admin)
+
+    @rates(user='25/min')
+    def test_headers_and_action_costs(self):
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp['X-RateLimit-Limit'], '25')
+        self.assertEqual(resp['X-RateLimit-Remaining'], '24')
+        self.assertLessEqual(int(resp['X-RateLimit-Reset']), 60)
+
+        for remaining in (14, 4):
+            resp = self.client.get(self.list_url)
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertEqual(resp['X-RateLimit-Remaining'], str(remaining))
+
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', resp)
+        self.assertEqual(resp['X-RateLimit-Remaining'], '4')
+        # a denied request is not charged, cheaper actions still fit
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+
+    @rates(user='100/min', **{'user.retrieve': '2/min'})
+    def test_action_scope(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+
+        resp = self.client.get(self.detail_url)
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(resp['X-RateLimit-Limit'], '2')
+        self.assertEqual(self.client.get(self.list_url).status_code, status.HTTP_200_OK)
+
+    @rates(ip='2/min', user='100/min')
+    def test_ip_scope_is_shared_by_users(self):
+        other = User.objects.create_user(
+            username='other', email='other@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+        TestHelper.authenticate_client(self.client, other)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(ip='1/min')
+    def test_spoofed_forwarded_for_does_not_reset_the_ip_scope(self):
+        self.client.credentials()
+        login_url = reverse('api:users:login')
+        # nginx appends the address it got the request from to whatever the client sent
+        with mock.patch.object(TokenObtainPairView, 'throttle_classes', [SlidingWindowThrottle]):
+            for spoofed in ('1.1.1.1', '2.2.2.2'):
+                resp = self.client.post(
+                    login_url, {'username': 'admin', 'password': 'wrong'}, format='json',
+                    HTTP_X_FORWARDED_FOR=f'{spoofed}, 10.0.0.5',
+                )
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @rates(ip='100/min', user='100/min', **{'user.retrieve': '100/min'})
+    def test_all_scopes_are_checked_in_one_store_call(self):
+        store = LocalWindowStore()
+        with mock.patch('apps.base.throttling.get_store', return_value=store), \
+                mock.patch.object(store, 'hit', wraps=store.hit) as hit:
+            self.client.get(self.detail_url)
+
+        hit.assert_called_once()
+        self.assertEqual(len(hit.call_args.args[0]), 3)
+
+
+class LocalWindowStoreTest(SimpleTestCase):
+
+    def test_previous_window_counts_by_its_overlap(self):
+        store = LocalWindowStore()
+        store.hit([('current-1', 'previous-1', 10, 60_000, 0)], 8)
+
+        # a quarter into the next window, 3/4 of the previous 8 still count
+        allowed, counts = store.hit([('current-2', 'current-1', 10, 60_000, 15_000)], 5)
+        self.assertFalse(allowed)
+        self.assertEqual(counts, [6])
+        allowed, counts = store.hit([('current-2', 'current-1', 10, 60_000, 15_000)], 4)
+        self.assertTrue(allowed)
@@ -0,0 +1,164 @@
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+KEY_PREFIX = 'throttle'
+
+# Sliding window counter: the previous fixed window counts in proportion to how much of it still overlaps the
+# sliding one. All checks are made before any is charged, so a denied request costs nothing.
+# KEYS: current and previous window key of each check, ARGV: cost, then limit and window (ms) and elapsed ms of each.
+# Returns 1 and the count of each check before this request, or 0 and the counts up to the check that failed.
+SLIDING_WINDOW_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local counts = {}
+for i = 1, #KEYS / 2 do
+    local limit = tonumber(ARGV[i * 3 - 1])
+    local window = tonumber(ARGV[i * 3])
+    local elapsed = tonumber(ARGV[i * 3 + 1])
+    local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+    local count = math.floor(previous * (window - elapsed) / window) + current
+    counts[i] = count
+    if count + cost > limit then
+        table.insert(counts, 1, 0)
+        return counts
+    end
+end
+for i = 1, #KEYS / 2 do
+    redis.call('INCRBY', KEYS[i * 2 - 1], cost)
+    redis.call('PEXPIRE', KEYS[i * 2 - 1], tonumber(ARGV[i * 3]) * 2)
+end
+table.insert(counts, 1, 1)
+return counts
+"""
+
+
+class RedisWindowStore:
+    """Runs all the checks of a request in one round trip."""
+
+    def __init__(self, client):
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, checks: list[tuple[str, str, int, int, int]], cost: int) -> tuple[bool, list[int]]:
+        keys, args = [], [cost]
+        for current, previous, limit, window, elapsed in checks:
+            keys += [current, previous]
+            args += [limit, window, elapsed]
+        allowed, *counts = self._script(keys=keys, args=args)
+        return bool(allowed), counts
+
+
+class LocalWindowStore:
+    """The same algorithm in process memory, for tests and single process deployments without Redis."""
+
+    def __init__(self):
+        self._counts: dict[str, tuple[int, int]] = {}  # key -> (count, expires at ms)
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, now: int) -> int:
+        count, expires = self._counts.get(key, (0, 0))
+        return count if expires > now else 0
+
+    def hit(self, checks: list[tuple[str, str, int, int, int]], cost: int) -> tuple[bool, list[int]]:
+        now = int(time.time() * 1000)
+        with self._lock:
+            counts = []
+            for current, previous, limit, window, elapsed in checks:
+                count = self._get(previous, now) * (window - elapsed) // window + self._get(current, now)
+                counts.append(count)
+                if count + cost > limit:
+                    return False, counts
+            for current, _, _, window, _ in checks:
+                self._counts[current] = (self._get(current, now) + cost, now + window * 2)
+            if len(self._counts) > 10_000:
+                self._counts = {key: value for key, value in self._counts.items() if value[1] > now}
+        return True, counts
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    """Redis when THROTTLE_CACHE is a django-redis cache, process memory otherwise."""
+    backend = settings.CACHES[settings.THROTTLE_CACHE]['BACKEND']
+    if backend.startswith('django_redis.'):
+        from django_redis import get_redis_connection
+
+        return RedisWindowStore(get_redis_connection(settings.THROTTLE_CACHE))
+    return LocalWindowStore()
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate: str) -> tuple[int, int]:
+    """'100/min' -> (100, 60000), the number of requests and the window in milliseconds."""
+    num_requests, duration = SimpleRateThrottle.parse_rate(None, rate)
+    if not num_requests:
+        raise ImproperlyConfigured(f'invalid throttle rate {rate!r}')
+    return num_requests, duration * 1000
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Checks every scope that applies to the request in a single store call:
+
+    - ``ip``: every request, by client IP
+    - ``user``: authenticated requests, by user
+    - ``<basename>.<action>``: requests to that viewset action, by user or IP, e.g. ``'user.list': '30/min'``
+
+    Rates come from DEFAULT_THROTTLE_RATES, scopes without a rate are not checked. A request costs its view's
+    ``get_request_cost()`` units (1 by default). The tightest limit is left on ``request.rate_limit`` for the
+    rate limit headers.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scopes(self, request, view) -> list[tuple[str, str]]:
+        ident = self.get_ident(request)
+        user = getattr(request, 'user', None)
+        owner = f'user:{user.pk}' if user is not None and user.is_authenticated else f'ip:{ident}'
+        scopes = [('ip', ident)]
+        if owner.startswith('user:'):
+            scopes.append(('user', user.pk))
+        basename, action = getattr(view, 'basename', None), getattr(view, 'action', None)
+        if basename and action:
+            scopes.append((f'{basename}.{action}', owner))
+        return scopes
+
+    def allow_request(self, request, view):
+        rates = api_settings.DEFAULT_THROTTLE_RATES or {}
+        now = int(time.time() * 1000)
+        checks = []
+        for scope, ident in self.get_scopes(request, view):
+            if not rates.get(scope):
+                continue
+            limit, window = parse_rate(rates[scope])
+            index = now // window
+            key = f'{KEY_PREFIX}:{scope}:{ident}'
+            checks.append((f'{key}:{index}', f'{key}:{index - 1}', limit, window, now % window))
+        if not checks:
+            return True
+
+        cost = view.get_request_cost() if hasattr(view, 'get_request_cost') else 1
+        allowed, counts = get_store().hit(checks, cost)
+
+        # the reported limit is the one that failed, or the one with the least room left
+        remaining = [
+            (limit - count - (cost if allowed else 0), limit, (window - elapsed) / 1000)
+            for count, (_, _, limit, window, elapsed) in zip(counts, checks)
+        ]
+        left, limit, reset = remaining[-1] if not allowed else min(remaining)
+        request.rate_limit = (limit, max(left, 0), reset)
+        if not allowed:
+            self.wait_seconds = reset
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
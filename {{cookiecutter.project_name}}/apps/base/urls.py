@@ -0,0 +1,10 @@
+from django.urls import path, include
+
+from .attachments import AttachmentViewSet
+from .routers import FlatRouter
+
+router = FlatRouter()
+router.register(r'', AttachmentViewSet, basename='attachment')
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Optional, IO
+from typing import TYPE_CHECKING, Any, Callable, Optional, IO
 import os
 
 from django.contrib.auth import get_user_model
-from django.contrib.sessions.middleware import SessionMiddleware
-from django.test.client import RequestFactory
+from django.utils.module_loading import import_string
 from rest_framework import status
-from rest_framework.test import APIClient
 from rest_framework.reverse import reverse
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.settings import api_settings
+
+if TYPE_CHECKING:
+    # test clients pull in django.test and requests, only import them where they are used
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from rest_framework.test import APIClient
 
 User = get_user_model()
 
@@ -26,7 +29,7 @@ class TestHelper:
     # ---- Authentication ----
     @staticmethod
     def get_access_for_user(user: User) -> str:
-        refresh = RefreshToken.for_user(user)
+        refresh = import_string(api_settings.TOKEN_OBTAIN_SERIALIZER).get_token(user)
         return str(refresh.access_token)
 
     @staticmethod
@@ -73,6 +76,9 @@ class TestHelper:
         """
         Build a bare request and add a Session via middleware for low-level view tests.
         """
+        from django.contrib.sessions.middleware import SessionMiddleware
+        from django.test.client import RequestFactory
+
         factory = RequestFactory()
         req = factory.get("/")
         sm = SessionMiddleware(lambda r: r)
@@ -111,6 +117,8 @@ class RequestsClient:
     A thin wrapper to emulate `requests`-like calls using DRF's APIClient with JSON-only behavior.
     """
     def __init__(self) -> None:
+        from rest_framework.test import APIClient
+
         self.client = APIClient()
 
     def request(
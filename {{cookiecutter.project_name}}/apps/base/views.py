@@ -1,11 +1,28 @@
+import math
 from abc import ABC, abstractmethod
 
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.viewsets import GenericViewSet
 
+from .idempotency import HEADER as IDEMPOTENCY_HEADER, IdempotentRequest, Replayed
+from .permissions import HasCapabilities
+from .repositories import QuerySpec
 from .services import BaseService
 
 
 class BaseViewSet(ABC, GenericViewSet):
+    # action name -> capability bitmask the caller must hold, e.g. {'list': Capability.VIEW}
+    action_capabilities: dict[str, int] = {}
+    # action name -> throttle units a request uses, 1 for actions not listed, e.g. {'list': 10}
+    action_costs: dict[str, int] = {}
+    # methods whose requests are run once per Idempotency-Key header and replayed afterwards
+    idempotent_methods: tuple[str, ...] = ('POST', 'PUT', 'PATCH')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._required_capabilities = {action: int(mask) for action, mask in cls.action_capabilities.items()}
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -13,4 +30,91 @@ class BaseViewSet(ABC, GenericViewSet):
 
     @abstractmethod
     def _get_service(self) -> BaseService:
+        """Called for every request, return the shared instance, e.g. ``registry.resolve(UserService)``."""
         pass
+
+    def get_query_spec(self, **kwargs) -> QuerySpec:
+        return QuerySpec(action=self.action, **kwargs)
+
+    @classmethod
+    def get_extra_actions(cls):
+        # ViewSetMixin's uses inspect.getmembers, reading `schema` resolves DEFAULT_SCHEMA_CLASS and imports the
+        # whole schema tooling while the router builds the URLconf. The class dicts are read instead, nearest first.
+        attrs = {}
+        for klass in cls.__mro__:
+            for name, attr in vars(klass).items():
+                attrs.setdefault(name, attr)
+        actions = []
+        for name, attr in sorted(attrs.items()):
+            if not (hasattr(attr, 'mapping') and hasattr(attr, 'detail')):
+                continue
+            if attr.__name__ != name:
+                raise ImproperlyConfigured(
+                    f'Expected function (`{attr.__name__}`) to match its attribute name (`{name}`), the '
+                    f'@action decorator may be missing functools.wraps'
+                )
+            actions.append(attr)
+        return actions
+
+    def get_permissions(self):
+        return [*super().get_permissions(), HasCapabilities()]
+
+    def get_required_capabilities(self) -> int:
+        return self._required_capabilities.get(self.action, 0)
+
+    def get_request_cost(self) -> int:
+        return self.action_costs.get(self.action, 1)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is not None and request.method in self.idempotent_methods:
+            self._idempotency = IdempotentRequest(request, key)
+            replay = self._idempotency.acquire()
+            if replay is not None:
+                raise Replayed(replay)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, Replayed):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._idempotency = None
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        except BaseException:
+            if self._idempotency is not None:
+                self._idempotency.release()
+            raise
+        if self._idempotency is not None:
+            self._idempotency.complete(response)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        rate_limit = getattr(request, 'rate_limit', None)  # set by SlidingWindowThrottle
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response['X-RateLimit-Limit'] = limit
+            response['X-RateLimit-Remaining'] = remaining
+            response['X-RateLimit-Reset'] = math.ceil(reset)
+        return response
+
+
+def lazy_view(dotted_path: str, **initkwargs):
+    """
+    A URLconf entry for a class based view that is imported on its first request rather than when the
+    URLconf loads, for rarely hit views with heavy imports (e.g. the schema views).
+    """
+    resolved = []
+
+    @csrf_exempt
+    def view(request, *args, **kwargs):
+        if not resolved:
+            resolved.append(import_string(dotted_path).as_view(**initkwargs))
+        return resolved[0](request, *args, **kwargs)
+
+    # keeps the URLconf introspectable (e.g. the schema version fingerprint) without importing the view
+    view.__module__, _, view.__qualname__ = dotted_path.rpartition('.')
+    return view
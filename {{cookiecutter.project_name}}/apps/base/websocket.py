@@ -0,0 +1,157 @@
+import asyncio
+from collections import OrderedDict
+
+from asgiref.sync import async_to_sync
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+{%- if cookiecutter.use_jwt == 'y' %}
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from channels.auth import AuthMiddleware
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.settings import api_settings
+
+from ..users.revocation import is_revoked
+{%- endif %}
+
+# a feed event merged into one already pending for the same object keeps the first action unless it is a delete,
+# so created + updated is still reported as created
+_KEEP_FIRST = {'created', 'updated'}
+
+
+def publish(group: str, event: dict) -> None:
+    """
+    Sends ``event`` to the websocket group once the current transaction commits. A channel layer outage is
+    logged, it never fails the request whose write already committed.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    message = {'type': 'feed.event', 'event': event}
+    transaction.on_commit(lambda: async_to_sync(channel_layer.group_send)(group, message), robust=True)
+{%- if cookiecutter.use_jwt == 'y' %}
+
+
+@database_sync_to_async
+def get_token_user(raw_token: str):
+    """The user and the validated token, an anonymous user and None for invalid tokens."""
+    # the same JWT authentication class as the REST API, so stateless and versioned tokens behave the same
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if hasattr(authentication_class, 'get_validated_token'):
+            authentication = authentication_class()
+            try:
+                token = authentication.get_validated_token(raw_token)
+                return authentication.get_user(token), token
+            except AuthenticationFailed:
+                return AnonymousUser(), None
+    return AnonymousUser(), None
+
+
+class JWTAuthMiddleware(AuthMiddleware):
+    """
+    Sets ``scope['user']`` and ``scope['token']`` from a ``?token=<access token>`` query parameter, browsers
+    cannot send an Authorization header when opening a websocket.
+    """
+
+    def populate_scope(self, scope):
+        scope.setdefault('user', AnonymousUser())
+        scope.setdefault('token', None)
+
+    async def resolve_scope(self, scope):
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        scope['user'], scope['token'] = await get_token_user(token[0]) if token else (AnonymousUser(), None)
+{%- endif %}
+
+
+class FeedConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams the events published to ``group``, or the group ``get_group`` picks for the user, to users holding
+    ``required_capabilities``.
+
+    Events for the same object arriving within ``coalesce_seconds`` are merged and sent in one frame. At most
+    ``queue_size`` objects are pending per connection, beyond that the oldest is dropped and counted in the
+    frame's ``dropped``, so a slow client costs bounded memory instead of stalling the channel layer.
+{%- if cookiecutter.use_jwt == 'y' %}
+
+    Connections authenticated by a token are closed with 4401 when it expires, or at the next frame once it
+    is revoked.
+{%- endif %}
+    """
+    group: str = ''
+    required_capabilities: int = 0
+    coalesce_seconds: float = settings.FEED_COALESCE_SECONDS
+    queue_size: int = settings.FEED_QUEUE_SIZE
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated or not self.has_capabilities(user):
+            await self.close(code=4403)
+            return
+        self.pending: OrderedDict = OrderedDict()
+        self.dropped = 0
+        self.flush_task = None
+{%- if cookiecutter.use_jwt == 'y' %}
+        self.token = self.scope.get('token')
+        self.expiry_task = None
+        if self.token is not None:
+            self.expiry_task = asyncio.ensure_future(self.close_at(self.token['exp']))
+{%- endif %}
+        self.group_name = self.get_group(user)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    def get_group(self, user) -> str:
+        return self.group
+
+    def has_capabilities(self, user) -> bool:
+        # users loaded from the database and users built from token claims both expose `capabilities`
+        return getattr(user, 'capabilities', 0) & self.required_capabilities == self.required_capabilities
+
+    async def disconnect(self, code):
+        if getattr(self, 'flush_task', None):
+            self.flush_task.cancel()
+{%- if cookiecutter.use_jwt == 'y' %}
+        if getattr(self, 'expiry_task', None):
+            self.expiry_task.cancel()
+{%- endif %}
+        if getattr(self, 'group_name', None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def feed_event(self, message):
+        event = message['event']
+        key = (event['model'], event['id'])
+        pending = self.pending.pop(key, None)
+        if pending is not None and pending['action'] in _KEEP_FIRST and event['action'] != 'deleted':
+            event = {**event, 'action': pending['action']}
+        elif pending is None and len(self.pending) >= self.queue_size:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[key] = event
+        if self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(self.coalesce_seconds)
+        events, dropped = list(self.pending.values()), self.dropped
+        self.pending.clear()
+        self.dropped = 0
+        self.flush_task = None
+{%- if cookiecutter.use_jwt == 'y' %}
+        # revocations are looked up from memory, see RevocationList
+        if self.token is not None and await sync_to_async(is_revoked)(self.token):
+            await self.close(code=4401)
+            return
+{%- endif %}
+        await self.send_json({'events': events, 'dropped': dropped})
+{%- if cookiecutter.use_jwt == 'y' %}
+
+    async def close_at(self, expires_at: int):
+        await asyncio.sleep(max(0, expires_at - time.time()))
+        await self.close(code=4401)
+{%- endif %}
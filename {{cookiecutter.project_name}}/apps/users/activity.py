@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+
+from .models import User
+
+SEEN_KEY = 'users:activity:seen'
+LOGIN_KEY = 'users:activity:login'
+
+# user id -> monotonic time of the last touch this process buffered, see `touch`
+_touched: dict[int, float] = {}
+_touched_lock = threading.Lock()
+
+
+class RedisActivityStore:
+    """Latest timestamps per user in two Redis hashes, shared by every process until the flush drains them."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def add(self, user_id: int, seen: float, login: bool) -> None:
+        pipeline = self._client.pipeline(transaction=False)
+        pipeline.hset(SEEN_KEY, user_id, seen)
+        if login:
+            pipeline.hset(LOGIN_KEY, user_id, seen)
+        pipeline.execute()
+
+    def drain(self) -> tuple[dict[int, float], dict[int, float]]:
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.hgetall(SEEN_KEY).hgetall(LOGIN_KEY).delete(SEEN_KEY, LOGIN_KEY)
+        seen, logins, _ = pipeline.execute()
+        return (
+            {int(user_id): float(value) for user_id, value in seen.items()},
+            {int(user_id): float(value) for user_id, value in logins.items()},
+        )
+
+
+class LocalActivityStore:
+    """
+    The same buffers in process memory, for tests and single process deployments without Redis. No other process
+    can drain them, so `touch` flushes them itself once they are USER_ACTIVITY_THROTTLE seconds old.
+    """
+
+    def __init__(self):
+        self._seen: dict[int, float] = {}
+        self._logins: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._drained = time.monotonic()
+
+    def is_due(self, interval: float) -> bool:
+        return time.monotonic() - self._drained >= interval
+
+    def add(self, user_id: int, seen: float, login: bool) -> None:
+        with self._lock:
+            self._seen[user_id] = seen
+            if login:
+                self._logins[user_id] = seen
+
+    def drain(self) -> tuple[dict[int, float], dict[int, float]]:
+        with self._lock:
+            seen, logins, self._seen, self._logins = self._seen, self._logins, {}, {}
+            self._drained = time.monotonic()
+        return seen, logins
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    """Redis when USER_ACTIVITY_CACHE is a django-redis cache, process memory otherwise."""
+    backend = settings.CACHES[settings.USER_ACTIVITY_CACHE]['BACKEND']
+    if backend.startswith('django_redis.'):
+        from django_redis import get_redis_connection
+
+        return RedisActivityStore(get_redis_connection(settings.USER_ACTIVITY_CACHE))
+    return LocalActivityStore()
+
+
+def touch(user_id: int, login: bool = False) -> None:
+    """
+    Note that the user was seen now. Buffered at most once per USER_ACTIVITY_THROTTLE seconds per user and
+    process, logins always are; nothing is written to the database until `flush`.
+    """
+    now = time.monotonic()
+    if not login:
+        last = _touched.get(user_id)
+        if last is not None and now - last < settings.USER_ACTIVITY_THROTTLE:
+            return
+    with _touched_lock:
+        if len(_touched) > 100_000:
+            _touched.clear()
+        _touched[user_id] = now
+    store = get_store()
+    store.add(user_id, time.time(), login)
+    if isinstance(store, LocalActivityStore) and store.is_due(settings.USER_ACTIVITY_THROTTLE):
+        flush()
+
+
+def flush(using: str = 'default') -> int:
+    """
+    Write the buffered timestamps to ``last_seen`` and ``last_login`` with one ``UPDATE ... FROM (VALUES ...)``
+    per batch of users. Returns the number of users written.
+    """
+    seen, logins = get_store().drain()
+    if not seen:
+        return 0
+    connection = connections[using]
+    ops = connection.ops
+    table, pk = ops.quote_name(User._meta.db_table), ops.quote_name(User._meta.pk.column)
+    # untyped VALUES are text on PostgreSQL
+    row = '(%s::bigint, %s::timestamptz, %s::timestamptz)' if connection.vendor == 'postgresql' else '(%s, %s, %s)'
+
+    def adapt(timestamp):
+        if timestamp is None:
+            return None
+        return ops.adapt_datetimefield_value(datetime.fromtimestamp(timestamp, tz=dt_timezone.utc))
+
+    items = [(user_id, adapt(timestamp), adapt(logins.get(user_id))) for user_id, timestamp in seen.items()]
+    batch_size = ops.bulk_batch_size(['id', 'last_seen', 'last_login'], items)
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            cursor.execute(
+                f'UPDATE {table} SET last_seen = activity.column2, '
+                f'last_login = COALESCE(activity.column3, {table}.last_login) '
+                f'FROM (VALUES {", ".join([row] * len(batch))}) AS activity '
+                f'WHERE {table}.{pk} = activity.column1',
+                [value for item in batch for value in item],
+            )
+    return len(items)
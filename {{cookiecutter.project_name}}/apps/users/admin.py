@@ -13,7 +13,9 @@ class UserAdminForm(forms.ModelForm):
 
     def save(self, commit=True):
         user = super().save(commit=False)
-        user.set_password(self.cleaned_data["password"])
+        # the field holds the stored hash unless it was edited, only re-hash a new password
+        if 'password' in self.changed_data:
+            user.set_password(self.cleaned_data["password"])
         if commit:
             user.save()
         return user
@@ -21,9 +23,18 @@ class UserAdminForm(forms.ModelForm):
 
 class UserAdmin(admin.ModelAdmin):
     form = UserAdminForm
-    list_display = ('username', 'email', 'role', 'is_active')
+    list_display = ('username', 'email', 'full_name', 'role', 'is_active', 'last_seen')
+    list_select_related = ('profile',)
     list_filter = ('role', 'is_active')
-    search_fields = ('username', 'email')
+    # prefix lookups (UPPER(col) LIKE 'x%') are served by the trigram indexes, '%x%' scans are not
+    search_fields = ('^username', '^email')
     ordering = ('username',)
 
+    @admin.display(description='Full name')
+    def full_name(self, obj):
+        profile = getattr(obj, 'profile', None)
+        if profile is None:
+            return '-'
+        return ' '.join(filter(None, (profile.first_name, profile.last_name))) or '-'
+
 admin.site.register(User, UserAdmin)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
+
+    def ready(self):
+        from . import signals  # noqa
+{%- if cookiecutter.use_channels == 'y' %}
+        from . import consumers  # noqa, publishes user changes to the live feed
+{%- endif %}
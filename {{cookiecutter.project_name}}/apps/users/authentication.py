@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from ..base.tenancy import TENANT_CLAIM, set_current_tenant_id
+from .enums import UserCapabilityEnum
+from .activity import touch
+from .models import Profile
+from .revocation import is_revoked
+from .tokens import PROFILE_CLAIMS, VERSION_CLAIM, get_cached_user_version, get_user_version
+
+
+class ClaimsUser(TokenUser):
+    """
+    ``request.user`` built from the access token claims, exposes what the users API reads from a user.
+    Its profile only holds the profile claims, the other fields read as None.
+    """
+
+    @property
+    def capabilities(self) -> int:
+        return self.token.get('caps', 0)
+
+    @property
+    def is_staff(self):
+        return bool(self.capabilities & UserCapabilityEnum.ACCESS_ADMIN)
+
+    @property
+    def is_superuser(self):
+        return bool(self.capabilities & UserCapabilityEnum.ALL_PERMISSIONS)
+
+    @property
+    def tenant_id(self) -> int | None:
+        return self.token.get(TENANT_CLAIM)
+
+    @property
+    def created_at(self):
+        return datetime.fromtimestamp(self.token['created'] / 1_000_000, tz=timezone.utc)
+
+    @property
+    def updated_at(self):
+        return datetime.fromtimestamp(self.token[VERSION_CLAIM] / 1_000_000, tz=timezone.utc)
+
+    @property
+    def profile(self):
+        claims = {claim: self.token.get(claim) for claim in PROFILE_CLAIMS}
+        if not any(claims.values()):
+            return None
+        return Profile(**claims)
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """Loads the user from the database and rejects tokens issued before its last change."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        if is_revoked(validated_token):
+            raise InvalidToken('Token has been revoked')
+        # the users API nests the profile, load it with the user
+        user = self.user_model.objects.select_related('profile').filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if validated_token.get(VERSION_CLAIM) != get_user_version(user):
+            raise InvalidToken('Token is stale, please refresh it')
+        # the version check above guarantees the claim still matches the user's tenant
+        set_current_tenant_id(validated_token.get(TENANT_CLAIM))
+        touch(user.pk)
+        return user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Builds the user from the token claims, the only lookup is the user's version in the cache.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if is_revoked(validated_token):
+            raise InvalidToken('Token has been revoked')
+        if validated_token.get(VERSION_CLAIM) != get_cached_user_version(user.id):
+            raise InvalidToken('Token is stale, please refresh it')
+        set_current_tenant_id(user.tenant_id)
+        touch(user.id)
+        return user
+
+
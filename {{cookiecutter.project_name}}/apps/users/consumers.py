@@ -0,0 +1,35 @@
+from django.dispatch import receiver
+
+from ..base.signals import entity_changed
+from ..base.tenancy import get_current_tenant_id
+from ..base.websocket import FeedConsumer, publish
+from .enums import UserCapabilityEnum
+from .models import User
+from .serializers import UserSerializer
+
+USER_FEED_GROUP = 'users.changes.{}'
+
+
+def get_user_feed_group(tenant_id: int | None) -> str:
+    """The group of a tenant's user changes, ``users.changes.all`` gets every tenant's for users without one."""
+    return USER_FEED_GROUP.format('all' if tenant_id is None else tenant_id)
+
+
+class UserFeedConsumer(FeedConsumer):
+    """Live user create, update and delete events for admin dashboards, instead of polling `/api/users/`."""
+    required_capabilities = UserCapabilityEnum.VIEW_USERS | UserCapabilityEnum.ACCESS_ADMIN
+
+    def get_group(self, user) -> str:
+        # database users and users built from token claims both expose tenant_id
+        return get_user_feed_group(user.tenant_id)
+
+
+@receiver(entity_changed, sender=User)
+def publish_user_change(sender, action, pk, instance=None, **kwargs):
+    event = {'model': 'user', 'action': action, 'id': pk}
+    if action != 'deleted' and instance is not None:
+        event['user'] = UserSerializer(instance).data
+    tenant_id = instance.tenant_id if instance is not None else get_current_tenant_id()
+    publish(get_user_feed_group(None), event)
+    if tenant_id is not None:
+        publish(get_user_feed_group(tenant_id), event)
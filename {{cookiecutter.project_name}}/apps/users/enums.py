@@ -1,4 +1,5 @@
-from enum import Enum
+from enum import Enum, IntFlag
+
 
 class UserRoleEnum(Enum):
     ADMIN = "admin"
@@ -8,3 +9,33 @@ class UserRoleEnum(Enum):
     @classmethod
     def choices(cls):
         return [(role.value, role.name.title()) for role in cls]
+
+    @property
+    def capabilities(self) -> int:
+        return ROLE_CAPABILITY_MASKS[self.value]
+
+
+class UserMetricEnum(Enum):
+    """Events rolled up per role for the stats endpoint, see apps.base.rollups."""
+    SIGNUPS = "users.signups"
+    LOGINS = "users.logins"
+    SOFT_DELETES = "users.soft_deletes"
+
+
+class UserCapabilityEnum(IntFlag):
+    VIEW_USERS = 1 << 0
+    CREATE_USERS = 1 << 1
+    UPDATE_USERS = 1 << 2
+    DELETE_USERS = 1 << 3
+    ACCESS_ADMIN = 1 << 4
+    ALL_PERMISSIONS = 1 << 5
+
+
+ROLE_CAPABILITIES = {
+    UserRoleEnum.VIEWER: UserCapabilityEnum.VIEW_USERS,
+    UserRoleEnum.EDITOR: UserCapabilityEnum.VIEW_USERS | UserCapabilityEnum.UPDATE_USERS,
+    UserRoleEnum.ADMIN: ~UserCapabilityEnum(0),
+}
+
+# Compiled once at import: stored role value -> plain int bitmask, also carried in the JWT claims.
+ROLE_CAPABILITY_MASKS = {role.value: int(capabilities) for role, capabilities in ROLE_CAPABILITIES.items()}
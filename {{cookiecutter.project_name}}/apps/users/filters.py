@@ -0,0 +1,18 @@
+import django_filters
+
+from ..base.filters import BaseFilterSet
+from .enums import UserRoleEnum
+from .models import User
+
+
+class UserFilterSet(BaseFilterSet):
+    search_fields = ('username', 'email')
+
+    role = django_filters.ChoiceFilter(choices=UserRoleEnum.choices())
+    is_active = django_filters.BooleanFilter()
+    # created_at_after / created_at_before, ISO 8601
+    created_at = django_filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = User
+        fields = ('role', 'is_active', 'created_at')
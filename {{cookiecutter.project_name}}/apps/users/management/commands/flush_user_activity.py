@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.activity import flush
+
+
+class Command(BaseCommand):
+    help = 'Write the buffered last seen and last login times to the users table, in batches.'
+
+    def handle(self, *args, **options):
+        written = flush()
+        self.stdout.write(f'{written} users updated')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the user search index from users and profiles, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(options['batch_size'])
+        self.stdout.write(f'{indexed} users indexed')
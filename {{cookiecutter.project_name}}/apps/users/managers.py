@@ -1,9 +1,10 @@
 from django.contrib.auth.models import BaseUserManager, Group
 
+from apps.base.managers import TenantManager
 from apps.users.enums import UserRoleEnum
 
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager, TenantManager):
     def create_user(self, username, email=None, is_active=True, is_admin=False, password=None, **kwargs):
         if not username:
             raise ValueError('Users must have username')
@@ -1,14 +1,23 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 
-from .enums import UserRoleEnum
-from ..base.models import BaseModel
+from .enums import UserRoleEnum, UserCapabilityEnum, ROLE_CAPABILITY_MASKS
+from ..base.models import BaseModel, Tenant, TenantModel
+from ..base.db import register_postgres_ddl
 from .managers import UserManager
-from auditlog.registry import auditlog
+{%- if cookiecutter.use_auditlog == 'y' %}
+from ..base.audit import auditlog
+{%- endif %}
 
 
-class User(BaseModel, AbstractBaseUser, PermissionsMixin):
+class User(TenantModel, AbstractBaseUser, PermissionsMixin):
+    # users without a tenant run the deployment and see every tenant
+    tenant = models.ForeignKey(
+        Tenant, null=True, blank=True, on_delete=models.PROTECT, related_name='users', db_index=False
+    )
     is_active = models.BooleanField(default=True)
+    # written in batches by apps.users.activity, never by saving the user
+    last_seen = models.DateTimeField(null=True, blank=True)
     username = models.CharField(max_length=255, unique=True)
     email = models.EmailField(unique=True)
     role = models.CharField(
@@ -21,18 +30,41 @@ class User(BaseModel, AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ('email',)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='users_user_created_idx'),
+            models.Index(fields=['role', 'created_at'], name='users_user_role_created_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='users_user_tenant_created_idx'),
+            models.Index(fields=['tenant', 'role', 'created_at'], name='users_user_tenant_role_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
+    @property
+    def capabilities(self) -> int:
+        return ROLE_CAPABILITY_MASKS.get(self.role, 0)
+
     @property
     def is_staff(self):
-        return self.role == UserRoleEnum.ADMIN.value
+        return bool(self.capabilities & UserCapabilityEnum.ACCESS_ADMIN)
 
     @property
     def is_superuser(self):
-        return self.role == UserRoleEnum.ADMIN.value
+        return bool(self.capabilities & UserCapabilityEnum.ALL_PERMISSIONS)
+
+
+# Case-insensitive prefix, contains and trigram search on username/email (see apps.base.filters).
+register_postgres_ddl(
+    'users',
+    'CREATE INDEX IF NOT EXISTS users_user_username_trgm ON users_user USING gin (UPPER(username) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS users_user_email_trgm ON users_user USING gin (UPPER(email) gin_trgm_ops)',
+)
+{%- if cookiecutter.use_auditlog == 'y' %}
 
 auditlog.register(User, exclude_fields=['password', 'updated_at'])
+{%- endif %}
+
 
 class Profile(BaseModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -42,3 +74,22 @@ class Profile(BaseModel):
 
     def __str__(self):
         return f'User ({self.user.username})\'s profile'
+
+
+class UserSearchEntry(models.Model):
+    """
+    Denormalized search text of a user and their profile, kept in sync by apps.users.search.
+    On PostgreSQL a generated ``vector`` tsvector column and GIN indexes are added next to it.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='search_entry')
+    document = models.TextField(default='', blank=True)
+
+
+register_postgres_ddl(
+    'users',
+    "ALTER TABLE users_usersearchentry ADD COLUMN IF NOT EXISTS vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED",
+    'CREATE INDEX IF NOT EXISTS users_usersearchentry_vector_idx ON users_usersearchentry USING gin (vector)',
+    'CREATE INDEX IF NOT EXISTS users_usersearchentry_document_trgm '
+    'ON users_usersearchentry USING gin (document gin_trgm_ops)',
+)
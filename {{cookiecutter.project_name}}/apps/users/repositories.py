@@ -3,14 +3,24 @@ from typing import Type
 from ..base.models import BaseModel
 from ..base.serializers import BaseModelSerializer
 from ..base.repositories import BaseRepository
+from .filters import UserFilterSet
 from .models import User
+from .search import search_users
 from .serializers import UserSerializer
 
 
 class UserRepository(BaseRepository):
+    # the user representation nests the profile, load it in the same query
+    load_policies = {
+        'default': {'select_related': ('profile',)},
+    }
+    filterset_class = UserFilterSet
 
     def _get_model(self) -> Type[BaseModel]:
         return User
 
     def _get_serializer(self) -> Type[BaseModelSerializer]:
         return UserSerializer
+
+    def search(self, query: str, limit: int) -> list[User]:
+        return search_users(query, limit)
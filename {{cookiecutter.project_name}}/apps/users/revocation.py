@@ -0,0 +1,212 @@
+import hashlib
+import math
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+
+JTI_KEY = 'revocation:jti'  # sorted set of revoked token ids scored by their expiry
+NOT_BEFORE_KEY = 'revocation:not_before'  # user id -> tokens issued before this time are revoked
+VERSION_KEY = 'revocation:version'  # bumped by every revocation, processes reload when it moved
+
+
+class BloomFilter:
+    """
+    Set membership in ~1.8 bytes per expected member at a 0.1% false positive rate. Never misses a member, the
+    false positives are confirmed against the store.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RedisRevocationStore:
+    """Revocations shared by every process, each change bumps the version in the same transaction."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        """False if `jti` already was revoked, ZADD NX tells concurrent callers apart atomically."""
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.zadd(JTI_KEY, {jti: expires_at}, nx=True).incr(VERSION_KEY)
+        added, _ = pipeline.execute()
+        return bool(added)
+
+    def revoke_user(self, user_id, not_before: int) -> None:
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.hset(NOT_BEFORE_KEY, user_id, not_before).incr(VERSION_KEY)
+        pipeline.execute()
+
+    def is_revoked(self, jti: str) -> bool:
+        return self._client.zscore(JTI_KEY, jti) is not None
+
+    def get_version(self) -> int:
+        return int(self._client.get(VERSION_KEY) or 0)
+
+    def snapshot(self, now: int) -> tuple[int, list[str], dict[str, int]]:
+        """The version, the unexpired revoked ids and the not before times, expired ids are dropped."""
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.get(VERSION_KEY).zremrangebyscore(JTI_KEY, '-inf', now).zrange(JTI_KEY, 0, -1)
+        pipeline.hgetall(NOT_BEFORE_KEY)
+        version, _, jtis, not_before = pipeline.execute()
+        return (
+            int(version or 0),
+            [jti.decode() for jti in jtis],
+            {user_id.decode(): int(value) for user_id, value in not_before.items()},
+        )
+
+
+class LocalRevocationStore:
+    """The same lists in process memory, for tests and single process deployments without Redis."""
+
+    def __init__(self):
+        self._jtis: dict[str, int] = {}
+        self._not_before: dict[str, int] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        with self._lock:
+            if jti in self._jtis:
+                return False
+            self._jtis[jti] = expires_at
+            self._version += 1
+            return True
+
+    def revoke_user(self, user_id, not_before: int) -> None:
+        with self._lock:
+            self._not_before[str(user_id)] = not_before
+            self._version += 1
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._jtis
+
+    def get_version(self) -> int:
+        return self._version
+
+    def snapshot(self, now: int) -> tuple[int, list[str], dict[str, int]]:
+        with self._lock:
+            self._jtis = {jti: expires for jti, expires in self._jtis.items() if expires > now}
+            return self._version, list(self._jtis), dict(self._not_before)
+
+
+class RevocationList:
+    """
+    This process' copy of the revocations: a Bloom filter of the revoked token ids and the users' not before
+    times. Tokens that are not revoked are accepted from memory; the store is only asked for the version every
+    TOKEN_REVOCATION_SYNC_INTERVAL seconds and to confirm ids the filter matched.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._version = None
+        self._synced = 0.0
+        self._filter = BloomFilter(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, settings.TOKEN_REVOCATION_ERROR_RATE)
+        self._not_before: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def sync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._synced < settings.TOKEN_REVOCATION_SYNC_INTERVAL:
+            return
+        with self._lock:
+            if not force and now - self._synced < settings.TOKEN_REVOCATION_SYNC_INTERVAL:
+                return
+            if force or self.store.get_version() != self._version:
+                self._load()
+            self._synced = now
+
+    def _load(self) -> None:
+        version, jtis, not_before = self.store.snapshot(int(time.time()))
+        bloom = BloomFilter(
+            max(settings.TOKEN_REVOCATION_BLOOM_CAPACITY, 2 * len(jtis)), settings.TOKEN_REVOCATION_ERROR_RATE,
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        # no token issued before a user's not before time outlives the refresh lifetime
+        horizon = time.time() - api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+        self._version, self._filter = version, bloom
+        self._not_before = {user_id: value for user_id, value in not_before.items() if value > horizon}
+
+    def add(self, jti: str) -> None:
+        self._filter.add(jti)
+
+    def set_not_before(self, user_id, not_before: int) -> None:
+        self._not_before[str(user_id)] = not_before
+
+    def is_revoked_for_user(self, token) -> bool:
+        """Whether the token was issued before its user's tokens were all revoked."""
+        self.sync()
+        not_before = self._not_before.get(str(token.get(api_settings.USER_ID_CLAIM)))
+        return not_before is not None and token.get('iat', 0) < not_before
+
+    def is_revoked(self, token) -> bool:
+        if self.is_revoked_for_user(token):
+            return True
+        jti = token.get(api_settings.JTI_CLAIM)
+        return jti is not None and jti in self._filter and self.store.is_revoked(jti)
+
+
+@lru_cache(maxsize=None)
+def get_revocation_list() -> RevocationList:
+    """Backed by Redis when TOKEN_REVOCATION_CACHE is a django-redis cache, process memory otherwise."""
+    backend = settings.CACHES[settings.TOKEN_REVOCATION_CACHE]['BACKEND']
+    if backend.startswith('django_redis.'):
+        from django_redis import get_redis_connection
+
+        return RevocationList(RedisRevocationStore(get_redis_connection(settings.TOKEN_REVOCATION_CACHE)))
+    return RevocationList(LocalRevocationStore())
+
+
+def revoke_token(token) -> bool:
+    """Revoke one token (access or refresh) until it expires. False if it already was revoked."""
+    jti = token[api_settings.JTI_CLAIM]
+    revocations = get_revocation_list()
+    added = revocations.store.revoke(jti, token['exp'])
+    revocations.add(jti)
+    return added
+
+
+def use_refresh_token(token) -> bool:
+    """
+    Spend a refresh token that is being exchanged, False if it was revoked or already spent. Decided by the
+    store alone, not this process' possibly stale filter, so of concurrent exchanges of one token only one wins.
+    """
+    if get_revocation_list().is_revoked_for_user(token):
+        return False
+    if api_settings.ROTATE_REFRESH_TOKENS:
+        return revoke_token(token)
+    return not get_revocation_list().store.is_revoked(token[api_settings.JTI_CLAIM])
+
+
+def revoke_user_tokens(user_id) -> None:
+    """
+    Revoke every token issued to the user so far, e.g. "log out everywhere" or a reset password. Tokens are
+    compared by their whole second ``iat``, so ones issued earlier in the same second stay valid.
+    """
+    not_before = int(time.time())
+    revocations = get_revocation_list()
+    revocations.store.revoke_user(user_id, not_before)
+    revocations.set_not_before(user_id, not_before)
+
+
+def is_revoked(token) -> bool:
+    """For access tokens, on every request: the Bloom filter answers from memory for the tokens not revoked."""
+    return get_revocation_list().is_revoked(token)
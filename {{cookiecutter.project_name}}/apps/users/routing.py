@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import UserFeedConsumer
+
+websocket_urlpatterns = [
+    path('feed', UserFeedConsumer.as_asgi(), name='feed'),
+]
@@ -0,0 +1,6 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class VersionedJWTScheme(SimpleJWTScheme):
+    # documents the class as the bearer JWT scheme in the OpenAPI schema
+    target_class = 'apps.users.authentication.VersionedJWTAuthentication'
@@ -0,0 +1,101 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Case, FloatField, IntegerField, Q, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+
+from ..base.tenancy import get_current_tenant_id
+from .models import User, Profile, UserSearchEntry
+
+USER_INDEXED_FIELDS = frozenset(('username', 'email'))
+PROFILE_INDEXED_FIELDS = frozenset(('first_name', 'last_name', 'phone_number'))
+
+_TERM_RE = re.compile(r'[\w@.+-]+')
+
+
+def build_document(user: User, profile: Profile | None) -> str:
+    local_part, _, domain = user.email.partition('@')
+    parts = [user.username, user.email, local_part, domain]
+    if profile is not None:
+        parts += [profile.first_name, profile.last_name, profile.phone_number]
+    return ' '.join(part.lower() for part in parts if part)
+
+
+def get_profile(user: User) -> Profile | None:
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        return None
+
+
+def index_users(users) -> int:
+    """Upsert the search entries of ``users`` in one statement, their profile should be select_related."""
+    entries = [UserSearchEntry(user_id=user.pk, document=build_document(user, get_profile(user))) for user in users]
+    if entries:
+        UserSearchEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=['user'], update_fields=['document'],
+        )
+    return len(entries)
+
+
+def rebuild_index(batch_size: int = 1000) -> int:
+    """Re-index every user, walking the table by primary key so each batch is a single index range scan."""
+    indexed, last_pk = 0, 0
+    while True:
+        batch = list(
+            User.objects.select_related('profile').filter(pk__gt=last_pk).order_by('pk')[:batch_size]
+        )
+        indexed += index_users(batch)
+        if len(batch) < batch_size:
+            return indexed
+        last_pk = batch[-1].pk
+
+
+def parse_terms(query: str) -> list[str]:
+    return _TERM_RE.findall(query.lower())[:8]
+
+
+def search_users(query: str, limit: int = 50) -> list[User]:
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    entries = UserSearchEntry.objects.filter(user__deleted_at__isnull=True).select_related('user__profile')
+    # the entries are not a TenantModel, scope them like User.objects
+    tenant_id = get_current_tenant_id()
+    if tenant_id is not None:
+        entries = entries.filter(user__tenant_id=tenant_id)
+    if connection.vendor == 'postgresql':
+        entries = _postgres_search(entries, query, terms)
+    else:
+        entries = _fallback_search(entries, terms)
+    return [entry.user for entry in entries.order_by('-rank', 'user_id')[:limit]]
+
+
+def _postgres_search(entries: QuerySet, query: str, terms: list[str]) -> QuerySet:
+    # every term as a prefix (ali:* & exa:*), typos are caught by trigram similarity on the whole document
+    tsquery = ' & '.join(f"'{term}':*" for term in (term.replace("'", '') for term in terms) if term)
+    text = ' '.join(terms)
+    return entries.filter(
+        RawSQL(
+            "users_usersearchentry.vector @@ to_tsquery('simple', %s) OR users_usersearchentry.document %% %s",
+            [tsquery, text], output_field=BooleanField(),
+        )
+    ).annotate(
+        rank=RawSQL(
+            "ts_rank(users_usersearchentry.vector, to_tsquery('simple', %s)) "
+            "+ similarity(users_usersearchentry.document, %s)",
+            [tsquery, text], output_field=FloatField(),
+        )
+    )
+
+
+def _fallback_search(entries: QuerySet, terms: list[str]) -> QuerySet:
+    # substring match on the same document, terms matching the start of a word rank higher
+    rank = Value(0)
+    for term in terms:
+        entries = entries.filter(document__contains=term)
+        rank += Case(
+            When(Q(document__startswith=term) | Q(document__contains=f' {term}'), then=Value(1)),
+            default=Value(0), output_field=IntegerField(),
+        )
+    return entries.annotate(rank=rank)
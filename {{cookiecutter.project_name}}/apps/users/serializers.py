@@ -1,19 +1,34 @@
+from datetime import timedelta
+
 from django.core.validators import MinLengthValidator
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from .validators import number_validator, letter_validator, special_char_validator
+from ..base.rollups import GRANULARITIES
 from ..base.serializers import BaseModelSerializer
-from .models import User
+from .models import User, Profile
+
+
+class ProfileSerializer(BaseModelSerializer):
+    class Meta:
+        model = Profile
+        fields = ('first_name', 'last_name', 'phone_number')
 
 
 class UserSerializer(BaseModelSerializer):
     class Meta:
         model = User
         fields = (
-            'id', 'username', 'email', 'is_active', 'created_at', 'updated_at',
+            'id', 'username', 'email', 'is_active', 'created_at', 'updated_at', 'profile',
             'password', 'confirm_password'
         )
 
+    profile = ProfileSerializer(read_only=True)
+
     username = serializers.CharField(max_length=255)
     email = serializers.EmailField(max_length=255)
     password = serializers.CharField(
@@ -29,7 +44,7 @@ class UserSerializer(BaseModelSerializer):
 
     def validate_username(self, username):
         # If instance exists and username unchanged, allow it.
-        qs = User.objects.filter(username=username)
+        qs = User.objects.all_tenants().filter(username=username)
         if self.instance:
             qs = qs.exclude(pk=self.instance.pk)
         if qs.exists():
@@ -37,7 +52,7 @@ class UserSerializer(BaseModelSerializer):
         return username
 
     def validate_email(self, email):
-        qs = User.objects.filter(email=email)
+        qs = User.objects.all_tenants().filter(email=email)
         if self.instance:
             qs = qs.exclude(pk=self.instance.pk)
         if qs.exists():
@@ -89,3 +104,39 @@ class UserSerializer(BaseModelSerializer):
 
         instance.save()
         return instance
+
+
+class UserStatsQuerySerializer(serializers.Serializer):
+    # default and longest window per granularity
+    WINDOWS = {
+        'hour': (timedelta(days=2), timedelta(days=31)),
+        'day': (timedelta(days=30), timedelta(days=366)),
+    }
+
+    granularity = serializers.ChoiceField(choices=list(GRANULARITIES), default='day')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        default, longest = self.WINDOWS[attrs['granularity']]
+        attrs.setdefault('until', timezone.now())
+        attrs.setdefault('since', attrs['until'] - default)
+        if attrs['since'] >= attrs['until']:
+            raise serializers.ValidationError({'since': 'since must be before until'})
+        if attrs['until'] - attrs['since'] > longest:
+            raise serializers.ValidationError({'since': f'at most {longest.days} days per {attrs["granularity"]}'})
+        return attrs
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+    everywhere = serializers.BooleanField(default=False)
+
+    def validate_refresh(self, refresh):
+        try:
+            token = RefreshToken(refresh)
+        except TokenError as e:
+            raise serializers.ValidationError(str(e))
+        if str(token.get(api_settings.USER_ID_CLAIM)) != str(self.context['request'].user.pk):
+            raise serializers.ValidationError('refresh token belongs to another user')
+        return token
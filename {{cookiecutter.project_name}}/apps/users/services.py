@@ -1,9 +1,41 @@
+from datetime import datetime
+
+from ..base import rollups
+from ..base.registry import resolve
 from ..base.repositories import BaseRepository
 from ..base.services import BaseService
+from .enums import UserMetricEnum
 from .repositories import UserRepository
+from .revocation import revoke_token, revoke_user_tokens
+
+# name in the stats response -> rolled up metric
+STATS_METRICS = {
+    'signups': UserMetricEnum.SIGNUPS,
+    'logins': UserMetricEnum.LOGINS,
+    'soft_deletes': UserMetricEnum.SOFT_DELETES,
+}
 
 
 class UserService(BaseService):
 
     def _get_repository(self) -> BaseRepository:
-        return UserRepository()
+        return resolve(UserRepository)
+
+    def search(self, query: str, limit: int):
+        return self._repository.search(query, limit)
+
+    def get_stats(self, granularity: str, since: datetime, until: datetime) -> dict[str, list[dict]]:
+        """Per role user activity from the rollup tables only, the users table is never scanned."""
+        series = rollups.series([metric.value for metric in STATS_METRICS.values()], granularity, since, until)
+        return {name: series[metric.value] for name, metric in STATS_METRICS.items()}
+
+    def logout(self, user_id: int, tokens, everywhere: bool = False) -> None:
+        """Revoke `tokens`, the caller's own, or every token of the user when `everywhere`."""
+        for token in tokens:
+            revoke_token(token)
+        if everywhere:
+            revoke_user_tokens(user_id)
+
+    def revoke_tokens(self, id: int | str) -> None:
+        """Revoke every token issued to the user so far, e.g. ones that were stolen."""
+        revoke_user_tokens(self.get_by_id(id).pk)
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ..base import rollups
+from .enums import UserMetricEnum
+from .models import User, Profile
+from .search import USER_INDEXED_FIELDS, PROFILE_INDEXED_FIELDS, index_users
+from .tokens import cache_user_version, get_user_version
+
+
+@receiver(post_save, sender=User)
+def refresh_user_version(sender, instance, **kwargs):
+    active = instance.is_active and not instance.is_deleted
+    cache_user_version(instance.pk, get_user_version(instance) if active else None)
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or USER_INDEXED_FIELDS.intersection(update_fields):
+        index_users([instance])
+
+
+@receiver(post_save, sender=User)
+def count_user_events(sender, instance, created, update_fields=None, **kwargs):
+    # soft deletes go through BaseModel.soft_delete, the user service always loads the instance
+    if created:
+        rollups.record(UserMetricEnum.SIGNUPS.value, instance.role, instance.tenant_id, instance.created_at)
+    elif update_fields is not None and 'deleted_at' in update_fields and instance.is_deleted:
+        rollups.record(UserMetricEnum.SOFT_DELETES.value, instance.role, instance.tenant_id, instance.deleted_at)
+
+
+@receiver(post_save, sender=Profile)
+def bump_user_version_on_profile_change(sender, instance, **kwargs):
+    # profile names are token claims too, moving updated_at makes tokens carrying the old names stale
+    now = timezone.now()
+    User.objects.filter(pk=instance.user_id).update(updated_at=now)
+    cache_user_version(instance.user_id, int(now.timestamp() * 1_000_000))
+
+
+@receiver(post_save, sender=Profile)
+def index_profile(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or PROFILE_INDEXED_FIELDS.intersection(update_fields):
+        user = instance.user
+        user.profile = instance
+        index_users([user])
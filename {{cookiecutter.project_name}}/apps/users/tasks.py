@@ -0,0 +1,8 @@
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def flush_user_activity():
+    from .activity import flush
+
+    flush()
@@ -0,0 +1,63 @@
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.utils import TestHelper
+from apps.users import activity
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+
+
+class UserActivityTest(APITestCase):
+
+    def setUp(self):
+        activity.get_store.cache_clear()
+        activity._touched.clear()
+        self.addCleanup(activity._touched.clear)
+        self.addCleanup(activity.get_store.cache_clear)
+        self.user = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+
+    def test_touches_are_throttled_per_user(self):
+        activity.touch(self.user.pk)
+        activity.get_store().drain()
+        activity.touch(self.user.pk)
+        self.assertEqual(activity.get_store().drain(), ({}, {}))
+
+    def test_local_buffer_flushes_itself_once_due(self):
+        with override_settings(USER_ACTIVITY_THROTTLE=0):
+            activity.touch(self.user.pk)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+
+    def test_requests_only_buffer_activity(self):
+        TestHelper.authenticate_client(self.client, self.user)
+        with self.assertNumQueries(1):  # authentication loading the user
+            resp = self.client.get(reverse('api:users:user-get-me'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_seen)
+
+        updated_at = self.user.updated_at
+        with self.assertNumQueries(1):
+            self.assertEqual(activity.flush(), 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+        self.assertIsNone(self.user.last_login)
+        self.assertEqual(self.user.updated_at, updated_at)  # tokens stay valid
+
+    def test_logins_are_flushed_to_last_login(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='Testpass123!')
+        resp = self.client.post(
+            reverse('api:users:login'), {'username': 'admin', 'password': 'Testpass123!'}, format='json'
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        activity.touch(other.pk)
+        self.assertEqual(activity.flush(), 2)
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.last_login, self.user.last_seen)
+        self.assertIsNone(other.last_login)
+        self.assertIsNotNone(other.last_seen)
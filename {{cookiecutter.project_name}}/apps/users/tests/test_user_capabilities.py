@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.base.permissions import HasCapabilities
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum, UserCapabilityEnum
+from apps.users.models import User
+
+
+class UserCapabilityTest(APITestCase):
+
+    def test_role_masks_are_compiled_as_ints(self):
+        self.assertEqual(UserRoleEnum.VIEWER.capabilities, UserCapabilityEnum.VIEW_USERS)
+        self.assertEqual(
+            UserRoleEnum.EDITOR.capabilities, UserCapabilityEnum.VIEW_USERS | UserCapabilityEnum.UPDATE_USERS
+        )
+        for capability in UserCapabilityEnum:
+            self.assertTrue(UserRoleEnum.ADMIN.capabilities & capability)
+
+    def test_access_token_carries_role_and_capabilities(self):
+        user = User.objects.create_user(
+            username='editor', email='editor@example.com', role=UserRoleEnum.EDITOR.value, password='Testpass123!'
+        )
+        token = AccessToken(TestHelper.get_access_for_user(user))
+
+        self.assertEqual(token['role'], UserRoleEnum.EDITOR.value)
+        self.assertEqual(token['caps'], UserRoleEnum.EDITOR.capabilities)
+
+    def test_permission_check_uses_claims_only(self):
+        view = SimpleNamespace(get_required_capabilities=lambda: int(UserCapabilityEnum.UPDATE_USERS))
+        editor = SimpleNamespace(auth={'caps': UserRoleEnum.EDITOR.capabilities}, user=None)
+        viewer = SimpleNamespace(auth={'caps': UserRoleEnum.VIEWER.capabilities}, user=None)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(HasCapabilities().has_permission(editor, view))
+            self.assertFalse(HasCapabilities().has_permission(viewer, view))
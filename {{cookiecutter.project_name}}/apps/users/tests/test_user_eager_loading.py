@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User, Profile
+
+
+class UserEagerLoadingTest(APITestCase):
+
+    def setUp(self):
+        self.list_url = reverse("api:users:user-list")
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.count = 0
+
+    def create_users(self, count):
+        for _ in range(count):
+            self.count += 1
+            user = User.objects.create_user(
+                username=f'user{self.count}', email=f'user{self.count}@example.com', password='Testpass123!'
+            )
+            Profile.objects.create(user=user, first_name='First', last_name=f'Last{self.count}')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp, len(queries)
+
+    def test_list_nests_profile_without_n_plus_one(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        self.create_users(2)
+        _, few = self.count_queries(self.list_url)
+        self.create_users(5)
+        resp, many = self.count_queries(self.list_url)
+
+        self.assertEqual(few, many)
+        users = {user['username']: user for user in resp.data['data']['users']}
+        self.assertEqual(users['user3']['profile']['last_name'], 'Last3')
+        self.assertIsNone(users['admin']['profile'])
+
+    def test_admin_changelist_does_not_query_per_row(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin:users_user_changelist')
+        self.create_users(2)
+        _, few = self.count_queries(url)
+        self.create_users(5)
+        _, many = self.count_queries(url)
+
+        self.assertEqual(few, many)
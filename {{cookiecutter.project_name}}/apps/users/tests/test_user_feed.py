@@ -0,0 +1,164 @@
+from unittest import mock
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.api.routing import websocket_urlpatterns
+from apps.base.models import Tenant
+from apps.base.tenancy import tenant_context
+from apps.base import websocket
+from apps.base.utils import TestHelper
+from apps.base.websocket import JWTAuthMiddleware
+from apps.users.consumers import UserFeedConsumer, get_user_feed_group
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+from apps.users.revocation import revoke_token
+from apps.users.services import UserService
+
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+class UserFeedTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='Testpass123!')
+        self.admin_token = TestHelper.get_access_for_user(self.admin)
+        patcher = mock.patch.object(UserFeedConsumer, 'coalesce_seconds', 0.05)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def connect(self, token=None):
+        path = f'/ws/users/feed?token={token}' if token else '/ws/users/feed'
+        communicator = WebsocketCommunicator(application, path)
+        connected, code = await communicator.connect()
+        return communicator, connected, code
+
+    async def test_requires_an_admin_token(self):
+        viewer_token = await database_sync_to_async(TestHelper.get_access_for_user)(self.viewer)
+        for token in (None, 'not-a-jwt', viewer_token):
+            communicator, connected, code = await self.connect(token)
+            self.assertFalse(connected, token)
+            self.assertEqual(code, 4403)
+
+    def change_users(self):
+        service = UserService()
+        with self.captureOnCommitCallbacks(execute=True):
+            user = service.create({
+                'username': 'new', 'email': 'new@example.com',
+                'password': 'Testpass123!', 'confirm_password': 'Testpass123!',
+            })
+        with self.captureOnCommitCallbacks(execute=True):
+            service.update(user.pk, {'email': 'renamed@example.com'})
+        with self.captureOnCommitCallbacks(execute=True):
+            service.update(self.viewer.pk, {'role': UserRoleEnum.EDITOR.value})
+        with self.captureOnCommitCallbacks(execute=True):
+            service.delete(self.viewer.pk)
+        return user.pk
+
+    async def test_streams_coalesced_service_changes(self):
+        communicator, connected, _ = await self.connect(self.admin_token)
+        self.assertTrue(connected)
+
+        new_id = await database_sync_to_async(self.change_users)()
+        frame = await communicator.receive_json_from(timeout=1)
+        await communicator.disconnect()
+
+        events = {event['id']: event for event in frame['events']}
+        self.assertEqual(len(frame['events']), 2)
+        self.assertEqual(events[new_id]['action'], 'created')
+        self.assertEqual(events[new_id]['user']['email'], 'renamed@example.com')
+        self.assertEqual(events[self.viewer.pk], {'model': 'user', 'action': 'deleted', 'id': self.viewer.pk})
+        self.assertEqual(frame['dropped'], 0)
+
+    async def test_drops_the_oldest_pending_events_beyond_the_queue_size(self):
+        communicator, _, _ = await self.connect(self.admin_token)
+        channel_layer = get_channel_layer()
+
+        with mock.patch.object(UserFeedConsumer, 'queue_size', 2):
+            for pk in (1, 2, 3):
+                event = {'model': 'user', 'action': 'updated', 'id': pk}
+                await channel_layer.group_send(get_user_feed_group(None), {'type': 'feed.event', 'event': event})
+            frame = await communicator.receive_json_from(timeout=1)
+        await communicator.disconnect()
+
+        self.assertEqual([event['id'] for event in frame['events']], [2, 3])
+        self.assertEqual(frame['dropped'], 1)
+
+    async def test_revoked_tokens_are_disconnected_at_the_next_frame(self):
+        communicator, connected, _ = await self.connect(self.admin_token)
+        self.assertTrue(connected)
+
+        revoke_token(AccessToken(self.admin_token))
+        event = {'model': 'user', 'action': 'updated', 'id': self.viewer.pk}
+        await get_channel_layer().group_send(get_user_feed_group(None), {'type': 'feed.event', 'event': event})
+
+        self.assertEqual(await communicator.receive_output(timeout=1), {'type': 'websocket.close', 'code': 4401})
+
+    async def test_connections_close_when_their_token_expires(self):
+        expires_at = AccessToken(self.admin_token)['exp']
+        with mock.patch.object(websocket, 'time') as clock:
+            clock.time.return_value = expires_at - 0.05
+            communicator, connected, _ = await self.connect(self.admin_token)
+            self.assertTrue(connected)
+
+            self.assertEqual(await communicator.receive_output(timeout=1), {'type': 'websocket.close', 'code': 4401})
+
+    def change_tenant_users(self, acme, globex):
+        for username, tenant in (('colleague', acme), ('outsider', globex)):
+            with tenant_context(tenant.pk), self.captureOnCommitCallbacks(execute=True):
+                UserService().create({
+                    'username': username, 'email': f'{username}@example.com',
+                    'password': 'Testpass123!', 'confirm_password': 'Testpass123!',
+                })
+        return User.objects.get(username='colleague').pk
+
+    async def test_tenant_admins_only_receive_their_tenant_changes(self):
+        acme, globex = await database_sync_to_async(lambda: (
+            Tenant.objects.create(name='Acme', slug='acme'), Tenant.objects.create(name='Globex', slug='globex')
+        ))()
+        tenant_admin = await database_sync_to_async(User.objects.create_user)(
+            username='acme-admin', email='acme-admin@example.com', role=UserRoleEnum.ADMIN.value,
+            password='Testpass123!', tenant=acme,
+        )
+        tenant_token = await database_sync_to_async(TestHelper.get_access_for_user)(tenant_admin)
+        tenant_feed, connected, _ = await self.connect(tenant_token)
+        self.assertTrue(connected)
+        operator_feed, _, _ = await self.connect(self.admin_token)
+
+        colleague_id = await database_sync_to_async(self.change_tenant_users)(acme, globex)
+        tenant_frame = await tenant_feed.receive_json_from(timeout=1)
+        operator_frame = await operator_feed.receive_json_from(timeout=1)
+        await tenant_feed.disconnect()
+        await operator_feed.disconnect()
+
+        self.assertEqual([event['id'] for event in tenant_frame['events']], [colleague_id])
+        self.assertEqual(len(operator_frame['events']), 2)
+
+
+class UserFeedOutageTest(APITransactionTestCase):
+
+    def test_channel_layer_outage_does_not_fail_committed_writes(self):
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        TestHelper.authenticate_client(self.client, admin)
+        channel_layer = get_channel_layer()
+        # autocommit: the publish callback runs inline, right after the INSERT committed
+        with mock.patch.object(channel_layer, 'group_send', side_effect=ConnectionError('channel layer down')), \
+                self.assertLogs('django.db.backends.base', 'ERROR'):
+            resp = self.client.post(reverse('api:users:user-list'), {
+                'username': 'new', 'email': 'new@example.com',
+                'password': 'Testpass123!', 'confirm_password': 'Testpass123!',
+            }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(User.objects.filter(username='new').exists())
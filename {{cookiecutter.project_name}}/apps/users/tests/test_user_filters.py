@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.filters import UserFilterSet
+from apps.users.models import User
+
+
+class UserFilterTest(APITestCase):
+
+    def setUp(self):
+        self.list_url = reverse("api:users:user-list")
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        User.objects.create_user(
+            username='alice', email='alice@example.com', role=UserRoleEnum.EDITOR.value, password='Testpass123!'
+        )
+        User.objects.create_user(username='bob', email='bob@example.com', password='Testpass123!')
+        User.objects.create_user(username='carol', email='carol@example.com', password='Testpass123!', is_active=False)
+        TestHelper.authenticate_client(self.client, self.admin)
+
+    def list_usernames(self, **params):
+        resp = self.client.get(self.list_url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        return sorted(user['username'] for user in resp.data['data']['users'])
+
+    def test_exact_filters(self):
+        self.assertEqual(self.list_usernames(role=UserRoleEnum.EDITOR.value), ['alice'])
+        self.assertEqual(self.list_usernames(is_active='false'), ['carol'])
+
+    def test_created_at_range(self):
+        User.objects.filter(username='bob').update(created_at=timezone.now() - timedelta(days=10))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+
+        self.assertEqual(self.list_usernames(created_at_before=since), ['bob'])
+        self.assertNotIn('bob', self.list_usernames(created_at_after=since))
+
+    def test_prefix_search_matches_username_and_email(self):
+        self.assertEqual(self.list_usernames(search='AL'), ['alice'])
+        self.assertEqual(self.list_usernames(search='bob@'), ['bob'])
+        self.assertEqual(self.list_usernames(search='lice'), [])
+
+    def test_unknown_params_are_ignored_and_invalid_values_rejected(self):
+        self.assertEqual(len(self.list_usernames(password='x')), 4)
+
+        for params in ({'role': 'owner'}, {'created_at_after': 'yesterday'}, {'search_mode': 'regex'}):
+            resp = self.client.get(self.list_url, params)
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class UserFilterPlanTest(APITestCase):
+
+    def explain(self, params):
+        queryset = UserFilterSet(params, queryset=User.objects.all()).qs
+        return queryset.explain()
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plan')
+    def test_role_and_created_at_use_the_composite_index(self):
+        plan = self.explain({'role': UserRoleEnum.VIEWER.value, 'created_at_after': timezone.now().isoformat()})
+        self.assertIn('users_user_role_created_idx', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'pg_trgm indexes exist on PostgreSQL only')
+    def test_search_uses_trigram_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            for mode in ('prefix', 'trigram'):
+                plan = self.explain({'search': 'ali', 'search_mode': mode})
+                self.assertIn('users_user_username_trgm', plan, mode)
+                self.assertIn('users_user_email_trgm', plan, mode)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = on')
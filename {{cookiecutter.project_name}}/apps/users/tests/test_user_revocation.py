@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.utils import TestHelper
+from apps.users import revocation
+from apps.users.authentication import StatelessJWTAuthentication
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User
+from apps.users.views import UserViewSet
+
+
+class BloomFilterTest(SimpleTestCase):
+
+    def test_members_are_always_found(self):
+        bloom = revocation.BloomFilter(1000, 0.01)
+        members = [f'member-{i}' for i in range(1000)]
+        for member in members:
+            bloom.add(member)
+        self.assertTrue(all(member in bloom for member in members))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10_000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRevocationTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        revocation.get_revocation_list.cache_clear()
+        self.addCleanup(revocation.get_revocation_list.cache_clear)
+        self.me_url = reverse('api:users:user-get-me')
+        self.logout_url = reverse('api:users:user-logout')
+        self.user = User.objects.create_user(
+            username='revoked', email='revoked@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+
+    def login(self):
+        resp = self.client.post(
+            reverse('api:users:login'), {'username': 'revoked', 'password': 'Testpass123!'}, format='json'
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {resp.data["access"]}')
+        return resp.data
+
+    def assert_me_status(self, expected):
+        for authentication_classes in (UserViewSet.authentication_classes, [StatelessJWTAuthentication]):
+            with mock.patch.object(UserViewSet, 'authentication_classes', authentication_classes):
+                self.assertEqual(self.client.get(self.me_url).status_code, expected)
+
+    def test_logout_revokes_the_access_and_refresh_token(self):
+        tokens = self.login()
+        self.assert_me_status(status.HTTP_200_OK)
+        resp = self.client.post(self.logout_url, {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assert_me_status(status.HTTP_401_UNAUTHORIZED)
+        resp = self.client.post(reverse('api:users:refresh'), {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_tokens_are_single_use(self):
+        tokens = self.login()
+        refresh_url = reverse('api:users:refresh')
+        resp = self.client.post(refresh_url, {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp.data['refresh'], tokens['refresh'])
+        resp = self.client.post(refresh_url, {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_tokens_are_spent_in_the_store_not_the_filter(self):
+        tokens = self.login()
+        refresh_url = reverse('api:users:refresh')
+        # as if the second exchange ran in a process whose filter has not synced the first one yet
+        with mock.patch.object(revocation.get_revocation_list(), 'add'):
+            resp = self.client.post(refresh_url, {'refresh': tokens['refresh']}, format='json')
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            resp = self.client.post(refresh_url, {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_store_revokes_each_token_once(self):
+        store = revocation.LocalRevocationStore()
+        self.assertTrue(store.revoke('jti', 2_000_000_000))
+        self.assertFalse(store.revoke('jti', 2_000_000_000))
+
+    def test_revoking_a_user_revokes_every_token_issued_before(self):
+        self.login()
+        with mock.patch('apps.users.revocation.time.time', return_value=revocation.time.time() + 1):
+            TestHelper.authenticate_client(self.client, self.user)  # an admin revokes their own tokens
+            resp = self.client.post(reverse('api:users:user-revoke-tokens', args=[self.user.pk]))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assert_me_status(status.HTTP_401_UNAUTHORIZED)
+
+    def test_other_processes_pick_revocations_up_on_sync(self):
+        self.login()
+        self.client.get(self.me_url)  # syncs
+        # another process revoking every token of the user
+        revocation.get_revocation_list().store.revoke_user(self.user.pk, int(revocation.time.time()) + 1)
+        self.assert_me_status(status.HTTP_200_OK)
+        with override_settings(TOKEN_REVOCATION_SYNC_INTERVAL=0):
+            self.assert_me_status(status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_that_are_not_revoked_skip_the_store(self):
+        self.login()
+        self.client.get(self.me_url)  # syncs
+        store = revocation.get_revocation_list().store
+        with mock.patch.object(store, 'is_revoked') as is_revoked, mock.patch.object(store, 'get_version') as version:
+            self.assert_me_status(status.HTTP_200_OK)
+        is_revoked.assert_not_called()
+        version.assert_not_called()
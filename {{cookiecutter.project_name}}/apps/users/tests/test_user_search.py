@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base.utils import TestHelper
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User, Profile, UserSearchEntry
+
+
+class UserSearchTest(APITestCase):
+
+    def setUp(self):
+        self.search_url = reverse("api:users:user-search")
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+        )
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='Testpass123!')
+        self.bob = User.objects.create_user(username='bob', email='bob@mail.org', password='Testpass123!')
+        Profile.objects.create(user=self.bob, first_name='Robert', last_name='Malice', phone_number='09120000000')
+        TestHelper.authenticate_client(self.client, self.admin)
+
+    def search(self, query):
+        resp = self.client.get(self.search_url, {'q': query})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        return [user['username'] for user in resp.data['data']['users']]
+
+    def test_matches_profile_fields_and_ranks_word_prefixes_first(self):
+        self.assertEqual(self.search('robert'), ['bob'])
+        self.assertEqual(self.search('0912'), ['bob'])
+        self.assertEqual(self.search('alice'), ['alice', 'bob'])
+        self.assertEqual(self.search('mail.org'), ['bob'])
+
+    def test_index_follows_user_and_profile_changes(self):
+        self.alice.email = 'wonderland@example.com'
+        self.alice.save()
+        Profile.objects.create(user=self.alice, first_name='Alicia')
+
+        self.assertEqual(self.search('wonderland'), ['alice'])
+        self.assertEqual(self.search('alicia'), ['alice'])
+
+    def test_unrelated_updates_do_not_touch_the_index(self):
+        user = User.objects.get(pk=self.alice.pk)
+        user.role = UserRoleEnum.EDITOR.value
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_soft_deleted_users_are_not_returned(self):
+        self.alice.soft_delete()
+
+        self.assertEqual(self.search('alice'), ['bob'])
+
+    def test_query_is_required(self):
+        resp = self.client.get(self.search_url, {'q': ' '})
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command_indexes_in_batches(self):
+        UserSearchEntry.objects.all().delete()
+        out = StringIO()
+
+        with self.assertNumQueries(4):  # per batch: users joined with profiles, then one upsert
+            call_command('rebuild_user_search', batch_size=2, stdout=out)
+
+        self.assertIn('3 users indexed', out.getvalue())
+        self.assertEqual(self.search('robert'), ['bob'])
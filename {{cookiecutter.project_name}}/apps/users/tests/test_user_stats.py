@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from apps.base import rollups
+from apps.base.models import DailyRollup, HourlyRollup, Tenant
+from apps.base.tenancy import tenant_context
+from apps.base.utils import TestHelper
+from apps.users.enums import UserMetricEnum, UserRoleEnum
+from apps.users.models import User
+
+
+class UserStatsTest(APITestCase):
+
+    def setUp(self):
+        self.stats_url = reverse('api:users:user-stats')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', role=UserRoleEnum.ADMIN.value, password='Testpass123!'
+            )
+            self.viewer = User.objects.create_user(
+                username='viewer', email='viewer@example.com', password='Testpass123!'
+            )
+
+    def get_stats(self, **params):
+        TestHelper.authenticate_client(self.client, self.admin)
+        resp = self.client.get(self.stats_url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        return resp.data['data']['stats']
+
+    def test_signups_logins_and_soft_deletes_are_rolled_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                reverse('api:users:login'), {'username': 'viewer', 'password': 'Testpass123!'}, format='json'
+            )
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.viewer.soft_delete()
+
+        for granularity in ('day', 'hour'):
+            stats = self.get_stats(granularity=granularity)
+            [signups] = stats['signups']
+            self.assertEqual(signups['total'], 2)
+            self.assertEqual(signups['counts'], {'admin': 1, 'viewer': 1})
+            self.assertEqual(stats['logins'][0]['counts'], {'viewer': 1})
+            self.assertEqual(stats['soft_deletes'][0]['counts'], {'viewer': 1})
+
+    def test_reads_only_the_rollups(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.stats_url, {'granularity': 'hour'})
+        # besides authentication loading the requesting user
+        reads = [query['sql'] for query in queries if 'users_user' not in query['sql']]
+        self.assertEqual(len(reads), 1)
+        self.assertIn('base_hourlyrollup', reads[0])
+
+    def test_window_is_validated(self):
+        TestHelper.authenticate_client(self.client, self.admin)
+        now = timezone.now()
+        resp = self.client.get(self.stats_url, {
+            'granularity': 'hour', 'since': (now - timedelta(days=60)).isoformat(), 'until': now.isoformat(),
+        })
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.client.get(self.stats_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class RollupWriteTest(APITestCase):
+
+    def test_events_are_batched_and_incremented(self):
+        at = timezone.now()
+        with rollups.collect() as buffer:
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    rollups.record('test.events', 'a', at=at)
+                rollups.record('test.events', 'b', at=at - timedelta(hours=1))
+            self.assertEqual(sum(buffer.values()), 4)
+            self.assertFalse(HourlyRollup.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            rollups.record('test.events', 'a', at=at)
+
+        hourly = HourlyRollup.objects.filter(metric='test.events', dimension='a').get()
+        self.assertEqual(hourly.count, 4)
+        daily = {row.dimension: row.count for row in DailyRollup.objects.filter(metric='test.events')}
+        self.assertEqual(daily['a'], 4)
+
+    def test_series_are_scoped_to_the_current_tenant(self):
+        acme = Tenant.objects.create(name='Acme', slug='acme')
+        at = timezone.now()
+        rollups.write({(UserMetricEnum.LOGINS.value, 'viewer', acme.pk, rollups.truncate(at, 'hour')): 2,
+                       (UserMetricEnum.LOGINS.value, 'viewer', 0, rollups.truncate(at, 'hour')): 5})
+        since, until = at - timedelta(days=1), at + timedelta(days=1)
+        metrics = [UserMetricEnum.LOGINS.value]
+        self.assertEqual(rollups.series(metrics, 'day', since, until)['users.logins'][0]['total'], 7)
+        with tenant_context(acme.pk):
+            series = rollups.series(metrics, 'day', since, until)
+        self.assertEqual(series['users.logins'][0]['total'], 2)
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.base.utils import TestHelper
+from apps.users.authentication import StatelessJWTAuthentication
+from apps.users.enums import UserRoleEnum
+from apps.users.models import User, Profile
+from apps.users.views import UserViewSet
+
+
+class UserTokenTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.me_url = reverse("api:users:user-get-me")
+        self.refresh_url = reverse("api:users:refresh")
+        self.user = User.objects.create_user(
+            username='claims', email='claims@example.com', role=UserRoleEnum.EDITOR.value, password='Testpass123!'
+        )
+        Profile.objects.create(user=self.user, first_name='Jane', last_name='Doe', phone_number='09120000000')
+        self.user.refresh_from_db()
+
+    def test_access_token_carries_profile_claims(self):
+        token = AccessToken(TestHelper.get_access_for_user(self.user))
+
+        self.assertEqual(token['username'], 'claims')
+        self.assertEqual(token['email'], 'claims@example.com')
+        self.assertEqual(token['first_name'], 'Jane')
+        self.assertEqual(token['last_name'], 'Doe')
+        self.assertNotIn('phone_number', token)
+        self.assertNotIn('has_profile', token)
+
+    def test_stateless_get_me_does_not_query_the_database(self):
+        TestHelper.authenticate_client(self.client, self.user)
+        resp = self.client.get(self.me_url)  # warms the cached user version
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        with mock.patch.object(UserViewSet, 'authentication_classes', [StatelessJWTAuthentication]):
+            with self.assertNumQueries(0):
+                resp = self.client.get(self.me_url)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['data']['user']['id'], self.user.id)
+        self.assertEqual(resp.data['data']['user']['email'], 'claims@example.com')
+        self.assertEqual(
+            resp.data['data']['user']['profile'], {'first_name': 'Jane', 'last_name': 'Doe', 'phone_number': None},
+        )
+
+    def test_token_is_stale_after_the_user_changes(self):
+        TestHelper.login_and_authenticate(self.client, 'claims', 'Testpass123!')
+        self.user.email = 'changed@example.com'
+        self.user.save()
+
+        for authentication_classes in (UserViewSet.authentication_classes, [StatelessJWTAuthentication]):
+            with mock.patch.object(UserViewSet, 'authentication_classes', authentication_classes):
+                resp = self.client.get(self.me_url)
+                self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_issues_current_claims(self):
+        login = self.client.post(
+            reverse(TestHelper.LOGIN_URL_NAME), {'username': 'claims', 'password': 'Testpass123!'}, format='json'
+        )
+        self.user.role = UserRoleEnum.ADMIN.value
+        self.user.save()
+
+        resp = self.client.post(self.refresh_url, {'refresh': login.data['refresh']}, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        token = AccessToken(resp.data['access'])
+        self.assertEqual(token['role'], UserRoleEnum.ADMIN.value)
+        self.assertEqual(token['caps'], UserRoleEnum.ADMIN.capabilities)
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..base import rollups
+from ..base.permissions import CAPABILITIES_CLAIM
+from ..base.tenancy import TENANT_CLAIM
+from .activity import touch
+from .enums import UserMetricEnum
+from .models import User
+from .revocation import use_refresh_token
+
+VERSION_CLAIM = 'ver'
+# the profile fields copied into tokens, contact details stay out of them
+PROFILE_CLAIMS = ('first_name', 'last_name')
+USER_VERSION_CACHE_KEY = 'users:version:{}'
+
+
+def get_user_version(user: User) -> int:
+    """The user's ``updated_at`` in microseconds, any change to the row issues a new version."""
+    return int(user.updated_at.timestamp() * 1_000_000)
+
+
+def cache_user_version(user_id, version: int | None) -> None:
+    # A deleted or deactivated user is cached as 0 so none of their tokens match.
+    cache.set(USER_VERSION_CACHE_KEY.format(user_id), version or 0, settings.CACHE_TTL)
+
+
+def get_cached_user_version(user_id) -> int:
+    version = cache.get(USER_VERSION_CACHE_KEY.format(user_id))
+    if version is None:
+        user = User.objects.filter(pk=user_id, is_active=True).only('updated_at').first()
+        version = get_user_version(user) if user is not None else 0
+        cache_user_version(user_id, version)
+    return version
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token carrying the user's profile claims; access tokens copy them over."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token[TENANT_CLAIM] = user.tenant_id
+        token[CAPABILITIES_CLAIM] = user.capabilities
+        token['username'] = user.username
+        token['email'] = user.email
+        token['created'] = int(user.created_at.timestamp() * 1_000_000)
+        token[VERSION_CLAIM] = get_user_version(user)
+        try:
+            profile = user.profile
+        except ObjectDoesNotExist:
+            profile = None
+        for claim in PROFILE_CLAIMS:
+            token[claim] = getattr(profile, claim, None)
+        return token
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = UserRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        rollups.record(UserMetricEnum.LOGINS.value, self.user.role, self.user.tenant_id)
+        touch(self.user.pk, login=True)
+        return data
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Issues the new access token from the current user row so its claims are never stale. With
+    ROTATE_REFRESH_TOKENS the presented refresh token is spent before the new pair is issued.
+    """
+
+    def validate(self, attrs):
+        if not use_refresh_token(self.token_class(attrs['refresh'])):
+            raise InvalidToken('Token has been revoked')
+        data = super().validate(attrs)
+        refresh = self.token_class(data.get('refresh', attrs['refresh']))
+        user = User.objects.select_related('profile').filter(
+            pk=refresh[api_settings.USER_ID_CLAIM], is_active=True
+        ).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        data['access'] = str(UserRefreshToken.for_user(user).access_token)
+        return data
@@ -1,10 +1,11 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from apps.base.routers import FlatRouter
+
 from .views import UserViewSet
 
-router = DefaultRouter()
+router = FlatRouter()
 router.register(r'', UserViewSet, basename='user')
 urlpatterns = [
     path('login', TokenObtainPairView.as_view(), name='login'),
@@ -1,48 +1,103 @@
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.tokens import Token
 
-from ..base.permissions import IsAdmin, IsViewer, IsEditor
+from ..base.registry import resolve
 from ..base.services import BaseService
 from ..base.views import BaseViewSet
 from ..base.responses import Response
-from .serializers import UserSerializer
+from .enums import UserCapabilityEnum
+from .serializers import LogoutSerializer, UserSerializer, UserStatsQuerySerializer
 from .services import UserService
 
 
 class UserViewSet(BaseViewSet):
+    SEARCH_LIMIT = 50
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    action_capabilities = {
+        'list': UserCapabilityEnum.VIEW_USERS,
+        'search': UserCapabilityEnum.VIEW_USERS,
+        'stats': UserCapabilityEnum.VIEW_USERS,
+        'retrieve': UserCapabilityEnum.VIEW_USERS,
+        'create': UserCapabilityEnum.CREATE_USERS,
+        'update': UserCapabilityEnum.UPDATE_USERS,
+        'partial_update': UserCapabilityEnum.UPDATE_USERS,
+        'destroy': UserCapabilityEnum.DELETE_USERS,
+        'revoke_tokens': UserCapabilityEnum.UPDATE_USERS,
+    }
+    # list is unpaginated and scans the table
+    action_costs = {
+        'list': 10,
+        'search': 3,
+    }
 
     def _get_service(self) -> BaseService:
-        return UserService()
+        return resolve(UserService)
 
     def list(self, request, *args, **kwargs):
-        self.permission_classes = [IsViewer]
-        self.check_permissions(request)
-
-        data = self._service.get_all()
+        data = self._service.get_all(self.get_query_spec(filters=request.query_params))
         return Response(
             data={
                 'users': self.get_serializer(data, many=True).data
             }, message='list of users', meta={}
         )
 
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This parameter is required.'})
+        users = self._service.search(query, self.SEARCH_LIMIT)
+        return Response(
+            data={
+                'users': self.get_serializer(users, many=True).data
+            }, message='list of users', meta={}
+        )
+
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request, *args, **kwargs):
+        query = UserStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        return Response(
+            data={
+                'stats': self._service.get_stats(params['granularity'], params['since'], params['until'])
+            }, message='user activity', meta={
+                'granularity': params['granularity'], 'since': params['since'], 'until': params['until'],
+            }
+        )
+
+    @action(detail=False, methods=['post'], url_path='logout')
+    def logout(self, request, *args, **kwargs):
+        body = LogoutSerializer(data=request.data, context={'request': request})
+        body.is_valid(raise_exception=True)
+        # the access token of this request, sessions and DRF tokens have none
+        tokens = [request.auth] if isinstance(request.auth, Token) else []
+        if 'refresh' in body.validated_data:
+            tokens.append(body.validated_data['refresh'])
+        self._service.logout(request.user.pk, tokens, body.validated_data['everywhere'])
+        return Response(data={}, message='logged out', status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='revoke-tokens')
+    def revoke_tokens(self, request, *args, **kwargs):
+        self._service.revoke_tokens(kwargs.get('pk'))
+        return Response(data={}, message='tokens revoked', status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'], url_path='me')
     def get_me(self, request, *args, **kwargs):
-        user_id = request.user.id
-        data = self._service.get_by_id(user_id)
+        # request.user is already loaded by authentication, or built from the token claims in stateless mode
         return Response(
             data={
-                'user': self.get_serializer(data).data
+                'user': self.get_serializer(request.user).data
             }, message='the user', meta={}
         )
 
     def retrieve(self, request, *args, **kwargs):
-        self.permission_classes = [IsViewer]
-        self.check_permissions(request)
         id = kwargs.get('pk')
-        data = self._service.get_by_id(id)
+        data = self._service.get_by_id(id, self.get_query_spec())
         return Response(
             data={
                 'user': self.get_serializer(data).data
@@ -50,8 +105,6 @@ class UserViewSet(BaseViewSet):
         )
 
     def create(self, request, *args, **kwargs):
-        self.permission_classes = [IsAdmin]
-        self.check_permissions(request)
         user = self._service.create(request.data)
         return Response(
             data={
@@ -60,10 +113,8 @@ class UserViewSet(BaseViewSet):
         )
 
     def update(self, request, *args, **kwargs):
-        self.permission_classes = [IsEditor]
-        self.check_permissions(request)
         id = kwargs.get('pk')
-        updated_user = self._service.update(id, request.data)
+        updated_user = self._service.update(id, request.data, self.get_query_spec())
         return Response(
             data={
                 'user': self.get_serializer(updated_user).data
@@ -71,9 +122,6 @@ class UserViewSet(BaseViewSet):
         )
 
     def destroy(self, request, *args, **kwargs):
-        self.permission_classes = [IsAdmin]
-        self.check_permissions(request)
-
         id = kwargs.get('pk')
         self._service.delete(id)
         return Response(
@@ -0,0 +1,10 @@
+import multiprocessing
+import os
+
+wsgi_app = '{{cookiecutter.project_slug}}.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Load the application once in the master, which warms it and gc.freeze()s it before forking the workers
+preload_app = True
+os.environ.setdefault('PRELOAD_APP', 'True')
@@ -13,4 +13,38 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', '{{cookiecutter.project_slug}}.settings.local')
 
+{%- if cookiecutter.use_channels == 'y' %}
+
+# initialize Django before importing anything that imports models
+django_asgi_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+{%- if cookiecutter.use_jwt == 'n' %}
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+{%- endif %}
+
+from apps.api.routing import websocket_urlpatterns  # noqa: E402
+{%- if cookiecutter.use_jwt == 'y' %}
+from apps.base.websocket import JWTAuthMiddleware  # noqa: E402
+{%- endif %}
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_application,
+    'websocket': AllowedHostsOriginValidator(
+        {%- if cookiecutter.use_jwt == 'y' %}
+        JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+        {%- else %}
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+        {%- endif %}
+    ),
+})
+{%- else %}
+
 application = get_asgi_application()
+{%- endif %}
+
+# warms shared structures and gc.freeze()s them when PRELOAD_APP is set (gunicorn preload_app master)
+from apps.base.preload import preload  # noqa: E402
+
+preload()
@@ -18,7 +18,7 @@ from ..env import env
 SECRET_KEY = env('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = env('DEBUG_MODE')
+DEBUG = env.bool('DEBUG_MODE', default=False)
 
 ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['*'])
 
@@ -55,6 +55,13 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Warm up and gc.freeze() the application when wsgi.py/asgi.py load it, for pre-forking servers
+# (gunicorn.conf.py sets it) so workers share the warmed memory instead of each building a copy
+PRELOAD_APP = env.bool('PRELOAD_APP', default=False)
+
+# Soft deleted rows older than this are hard deleted by `manage.py purge_soft_deleted`
+SOFT_DELETE_RETENTION_DAYS = env.int('SOFT_DELETE_RETENTION_DAYS', default=30)
+
 # endregion --------------------------------------------------------------------
 
 # region URLS ------------------------------------------------------------------
@@ -62,6 +69,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 ROOT_URLCONF = '{{cookiecutter.project_slug}}.urls'
 WSGI_APPLICATION = '{{cookiecutter.project_slug}}.wsgi.application'
 
+# Whether API routes end with a slash: 'always', 'never' or 'optional', see apps.base.routers.FlatRouter
+API_TRAILING_SLASH = env('API_TRAILING_SLASH', default='always')
+
 # endregion --------------------------------------------------------------------
 
 # region APPS DEFINITION -------------------------------------------------------
@@ -98,6 +108,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    'apps.base',
     'apps.users',
     # custom apps go here
 ]
@@ -108,21 +119,54 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # region MIDDLEWARE ------------------------------------------------------------
 
+# The Web* middleware skip requests under API_PATH_PREFIXES, which need no session, CSRF check, messages or
+# frame options. `manage.py middleware_timing` reports what each middleware costs a request.
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.base.tenancy.TenantMiddleware',
+    'apps.base.middleware.PreflightMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'apps.base.middleware.WebSessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'apps.base.middleware.WebCsrfViewMiddleware',
+    'apps.base.middleware.WebAuthenticationMiddleware',
+    'apps.base.middleware.WebMessageMiddleware',
+    'apps.base.middleware.WebXFrameOptionsMiddleware',
     {%- if cookiecutter.use_auditlog == 'y' %}
-        'auditlog.middleware.AuditlogMiddleware',
+        'apps.base.audit.AuditSinkMiddleware',
     {%- endif %}
 
 ]
 
+{%- if cookiecutter.use_jwt == 'y' %}
+
+# The API authenticates with JWTs only, so its requests skip the session based middleware
+API_PATH_PREFIXES = ['/api/']
+{%- else %}
+
+# Session authentication is enabled for the API, so it needs the session and CSRF middleware too
+API_PATH_PREFIXES = []
+{%- endif %}
+
+# endregion --------------------------------------------------------------------
+
+# region FILES -----------------------------------------------------------------
+
+MEDIA_ROOT = env('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+MEDIA_URL = '/media/'
+
+# Local files are served by nginx from this internal location (X-Accel-Redirect, see docker/nginx/nginx.conf),
+# leave it empty to stream them through Django instead
+FILES_ACCEL_REDIRECT_PREFIX = env('FILES_ACCEL_REDIRECT_PREFIX', default='')
+# Bytes read per chunk when a file is streamed through Django
+FILES_CHUNK_SIZE = env.int('FILES_CHUNK_SIZE', default=64 * 1024)
+# Directory of the storage uploads are written to, in a subdirectory per uploader
+FILES_UPLOAD_TO = env('FILES_UPLOAD_TO', default='uploads')
+# Largest file accepted by an upload, in bytes
+FILES_MAX_UPLOAD_SIZE = env.int('FILES_MAX_UPLOAD_SIZE', default=100 * 1024 * 1024)
+# Lets every authenticated user upload to /api/files/ and read their own uploads, only admins can otherwise
+FILES_USER_ACCESS = env.bool('FILES_USER_ACCESS', default=False)
+
 # endregion --------------------------------------------------------------------
 
 {%- if cookiecutter.use_minio == 'y' %}
@@ -150,26 +194,67 @@ AWS_S3_OBJECT_PARAMETERS = {
 # Optional: avoid ACL issues with modern S3 semantics
 AWS_DEFAULT_ACL = None
 
-# If you want absolute URLs when accessing `file.url`:
-MEDIA_URL = "/media/"  # you can leave this; presigned URLs you generate will override
 MINIO_EXPOSE_URL = os.environ.get("MINIO_EXPOSE_URL", "http://localhost:9000")
-MINIO_EXPIRE_IN = os.environ.get("MINIO_EXPIRE_IN", "http://localhost:9000")
+
+# Seconds a presigned upload/download URL stays valid
+MINIO_EXPIRE_IN = env.int("MINIO_EXPIRE_IN", default=3600)
+
+# Attachments are uploaded straight to the bucket, larger files in parts of ATTACHMENT_PART_SIZE bytes
+ATTACHMENT_MAX_SIZE = env.int("ATTACHMENT_MAX_SIZE", default=5 * 1024 ** 3)
+ATTACHMENT_PART_SIZE = env.int("ATTACHMENT_PART_SIZE", default=64 * 1024 ** 2)
+# endregion --------------------------------------------------------------------
+{%- endif %}
+
+{%- if cookiecutter.use_auditlog == 'y' %}
+# region AUDITLOG --------------------------------------------------------------
+
+# Audit entries are buffered per request and written once the transaction commits.
+# Other backends: apps.base.audit.FileAuditBackend (OPTIONS: path){% if cookiecutter.use_celery == 'y' %},
+# apps.base.audit.CeleryAuditBackend (OPTIONS: queue){% endif %}
+AUDITLOG_SINK = {
+    'BACKEND': env('AUDITLOG_SINK_BACKEND', default='apps.base.audit.DatabaseAuditBackend'),
+    'OPTIONS': {
+        'batch_size': 500,
+        'path': env('AUDITLOG_SINK_PATH', default=str(BASE_DIR / 'audit.jsonl')),
+    },
+}
+
+# Monthly range partitions of the entries table on PostgreSQL, see apps.base.history. Months older than the
+# retention are exported to AUDITLOG_ARCHIVE_DIR as gzipped CSV and dropped by the audit_partitions command.
+{%- if cookiecutter.use_celery == 'y' %}
+# The maintain_audit_partitions task does the same daily.
+{%- endif %}
+AUDITLOG_PARTITIONED = env.bool('AUDITLOG_PARTITIONED', default=False)
+AUDITLOG_PARTITIONS_AHEAD = env.int('AUDITLOG_PARTITIONS_AHEAD', default=3)
+AUDITLOG_RETENTION_MONTHS = env.int('AUDITLOG_RETENTION_MONTHS', default=12)
+AUDITLOG_ARCHIVE_DIR = env('AUDITLOG_ARCHIVE_DIR', default=str(BASE_DIR / 'audit-archive'))
+# the admin lists the entries of the last months only unless a date is picked
+AUDITLOG_ADMIN_MONTHS = env.int('AUDITLOG_ADMIN_MONTHS', default=3)
+
 # endregion --------------------------------------------------------------------
 {%- endif %}
 
 {%- if cookiecutter.use_channels == 'y' %}
 # region CHANNELS ------------------------------------------------------------
-ASGI_APPLICATION = f"{cookiecutter.project_slug}.asgi.application"
+ASGI_APPLICATION = "{{cookiecutter.project_slug}}.asgi.application"
 
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels_redis.core.RedisChannelLayer",
         "CONFIG": {
             "hosts": [("redis", 6379)],
+            # messages for a channel beyond capacity are dropped rather than blocking the publishers
+            "capacity": 1000,
+            "expiry": 10,
         },
     },
 }
 
+# Live feeds (apps.base.websocket.FeedConsumer) merge events per object over this window and keep at most
+# FEED_QUEUE_SIZE objects pending per connection, dropping the oldest
+FEED_COALESCE_SECONDS = 0.5
+FEED_QUEUE_SIZE = 500
+
 # endregion --------------------------------------------------------------------
 {%- endif %}
 
@@ -265,14 +350,51 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.TokenAuthentication',
         {%- else %}
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Stateless mode builds request.user from the token claims instead of loading it from the database
+        'apps.users.authentication.StatelessJWTAuthentication'
+        if env.bool('JWT_STATELESS_USER', default=False)
+        else 'apps.users.authentication.VersionedJWTAuthentication',
         {%- endif %}
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'EXCEPTION_HANDLER': 'apps.base.exception_handler.custom_exception_handler',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.base.throttling.SlidingWindowThrottle',
+    ],
+    # 'ip' applies to every request, 'user' to authenticated ones and '<basename>.<action>' (e.g. 'user.list')
+    # to a single viewset action; requests use their action's `action_costs` units
+    'DEFAULT_THROTTLE_RATES': {
+        'ip': env('THROTTLE_RATE_IP', default='1200/min'),
+        'user': env('THROTTLE_RATE_USER', default='600/min'),
+    },
+    # Reverse proxies in front of Django, docker/nginx is one. The 'ip' scope keys on the address the last of
+    # them appended to X-Forwarded-For, whatever the client sent in the header itself
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=1),
 }
 
+# Share of the handled API errors counted by apps.base.exception_handler.error_metrics
+ERROR_METRICS_SAMPLE_RATE = env.float('ERROR_METRICS_SAMPLE_RATE', default=0.01)
+
+# Cache whose Redis holds the throttle counters, any other cache backend keeps them in process memory
+THROTTLE_CACHE = 'default'
+
+# Responses to requests with an Idempotency-Key are kept this long and replayed to retries. Duplicates sent
+# while the first one runs wait up to IDEMPOTENCY_WAIT_TIMEOUT seconds for its response, a first request that
+# died is taken over once its lock expires after IDEMPOTENCY_LOCK_TIMEOUT seconds
+IDEMPOTENCY_CACHE = 'default'
+IDEMPOTENCY_TTL = env.int('IDEMPOTENCY_TTL', default=24 * 60 * 60)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int('IDEMPOTENCY_LOCK_TIMEOUT', default=30)
+IDEMPOTENCY_WAIT_TIMEOUT = env.int('IDEMPOTENCY_WAIT_TIMEOUT', default=10)
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+
+# Authenticated requests buffer the user's last seen time, at most once per user and process every
+# USER_ACTIVITY_THROTTLE seconds, in the Redis of USER_ACTIVITY_CACHE (process memory for other cache backends).
+# flush_user_activity writes the buffer to the users table in batches.
+USER_ACTIVITY_CACHE = 'default'
+USER_ACTIVITY_THROTTLE = env.int('USER_ACTIVITY_THROTTLE', default=5 * 60)
+
 # Swagger
 
 SPECTACULAR_SETTINGS = {
@@ -281,6 +403,11 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '{{cookiecutter.version}}',
 }
 
+# The schema is rendered once per URLconf and CODE_VERSION (`manage.py generate_schema` at build time)
+# and served from memory, set CODE_VERSION to the release or commit to regenerate it on deploy.
+CODE_VERSION = env('CODE_VERSION', default='{{cookiecutter.version}}')
+SCHEMA_CACHE_DIR = env('SCHEMA_CACHE_DIR', default=str(BASE_DIR / 'schema'))
+
 # endregion --------------------------------------------------------------------
 
 # region CORS ------------------------------------------------------------------
@@ -308,10 +435,11 @@ CACHE_TTL = 60 * 15  # Cache time to live is 15 minutes.
 
 from datetime import timedelta  # noqa
 
+# Access tokens are short lived and refresh tokens single use, see apps.users.revocation for revoking either
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=env.int('ACCESS_TOKEN_LIFETIME_MINUTES', default=15)),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
-    'ROTATE_REFRESH_TOKENS': False,
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -320,8 +448,19 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ['rest_framework_simplejwt.tokens.AccessToken', ],
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.users.tokens.UserTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.tokens.UserTokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'apps.users.authentication.ClaimsUser',
 }
 
+# Revoked token ids and per user "not before" times are kept in the Redis of TOKEN_REVOCATION_CACHE (process
+# memory for other cache backends). Every process checks tokens against its own Bloom filter of them, synced at
+# most every TOKEN_REVOCATION_SYNC_INTERVAL seconds: revocations reach the other processes within that interval.
+TOKEN_REVOCATION_CACHE = 'default'
+TOKEN_REVOCATION_SYNC_INTERVAL = env.int('TOKEN_REVOCATION_SYNC_INTERVAL', default=5)
+TOKEN_REVOCATION_BLOOM_CAPACITY = env.int('TOKEN_REVOCATION_BLOOM_CAPACITY', default=100_000)
+TOKEN_REVOCATION_ERROR_RATE = 0.001
+
 # endregion --------------------------------------------------------------------
 {%- endif %}
 {%- if cookiecutter.use_celery == 'y' %}
@@ -336,5 +475,24 @@ CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 CELERY_TASK_STORE_EAGER_RESULT = True
+
+from datetime import timedelta  # noqa
+
+CELERY_BEAT_SCHEDULE = {
+    'purge-soft-deleted': {
+        'task': 'apps.base.tasks.purge_soft_deleted',
+        'schedule': timedelta(days=1),
+    },
+    'flush-user-activity': {
+        'task': 'apps.users.tasks.flush_user_activity',
+        'schedule': timedelta(minutes=1),
+    },
+{%- if cookiecutter.use_auditlog == 'y' %}
+    'maintain-audit-partitions': {
+        'task': 'apps.base.tasks.maintain_audit_partitions',
+        'schedule': timedelta(days=1),
+    },
+{%- endif %}
+}
 # endregion --------------------------------------------------------------------
 {%- endif %}
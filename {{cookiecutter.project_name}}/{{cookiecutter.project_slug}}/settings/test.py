@@ -25,6 +25,13 @@ PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 
 # endregion --------------------------------------------------------------------
 
+# region REST FRAMEWORK --------------------------------------------------------
+
+# throttling is enabled by the tests that cover it
+REST_FRAMEWORK = {**REST_FRAMEWORK, 'DEFAULT_THROTTLE_CLASSES': []}
+
+# endregion --------------------------------------------------------------------
+
 # region CACHES ----------------------------------------------------------------
 
 CACHES = {
@@ -35,3 +42,15 @@ CACHES = {
 }
 
 # endregion --------------------------------------------------------------------
+{%- if cookiecutter.use_channels == 'y' %}
+
+# region CHANNELS --------------------------------------------------------------
+
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
+# endregion --------------------------------------------------------------------
+{%- endif %}
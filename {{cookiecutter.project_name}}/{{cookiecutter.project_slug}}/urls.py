@@ -17,13 +17,20 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+
+from apps.base.routers import RouteTable
+from apps.base.views import lazy_view
 
 urlpatterns = [
     path('', RedirectView.as_view(url='schema/swagger-ui/'), name='redirect-old-to-new'),
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    # schema tooling is only imported when the docs are first requested
+    path('schema/', lazy_view('apps.base.schema.CachedSpectacularAPIView'), name='schema'),
+    path(
+        'schema/swagger-ui/', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'),
+        name='swagger-ui',
+    ),
+    path('schema/redoc/', lazy_view('drf_spectacular.views.SpectacularRedocView', url_name='schema'), name='redoc'),
     path('admin/', admin.site.urls),
-    path('api/', include(('apps.api.urls', 'api'))),
+    # resolved from a flat table rather than walking the nested includes and routers
+    RouteTable.wrap(path('api/', include(('apps.api.urls', 'api')))),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', '{{cookiecutter.project_slug}}.settings.local')
 
 application = get_wsgi_application()
+
+# warms shared structures and gc.freeze()s them when PRELOAD_APP is set (gunicorn preload_app master)
+from apps.base.preload import preload  # noqa: E402
+
+preload()